@@ -0,0 +1,70 @@
+"""Benchmark formatting 1M table cells with the cached locale formatters.
+
+Amounts, money, dates and timestamps are formatted a column at a time for
+each locale, against calling Babel for every cell (timed on a sample and
+scaled up, as the full run takes minutes). A frame is 1/60 s. Run from the
+repository root:  python benchmarks/bench_formatting.py
+"""
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from babel.dates import format_date, format_datetime
+from babel.numbers import format_currency, format_decimal
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.formatting import get_formatter, LOCALES, DEFAULT_CURRENCY
+
+CELLS = 1_000_000
+ROWS = CELLS // 4  # Amount, money, date and timestamp columns
+BABEL_SAMPLE = 20_000
+FRAME = 1 / 60
+VISIBLE_CELLS = 50 * 10  # A screenful of table
+
+def main():
+    random.seed(1)
+    amounts = [random.uniform(-1_000_000, 10_000_000) for _ in range(ROWS)]
+    start = datetime(2020, 1, 1)
+    timestamps = [start + timedelta(minutes=random.randrange(3_000_000)) for _ in range(ROWS)]
+    dates = [ts.date() for ts in timestamps]
+
+    for language, locale in LOCALES.items():
+        started = time.perf_counter()
+        fmt = get_formatter(language)
+        built = time.perf_counter() - started
+
+        started = time.perf_counter()
+        fmt.numbers(amounts)
+        fmt.currencies(amounts)
+        fmt.dates(dates)
+        fmt.datetimes(timestamps)
+        elapsed = time.perf_counter() - started
+        per_cell = elapsed / CELLS
+
+        n = BABEL_SAMPLE // 4
+        started = time.perf_counter()
+        for amount, day, ts in zip(amounts[:n], dates[:n], timestamps[:n]):
+            format_decimal(amount, '#,##0.00', locale=locale)
+            format_currency(amount, DEFAULT_CURRENCY, locale=locale)
+            format_date(day, 'short', locale=locale)
+            format_datetime(ts, 'short', locale=locale)
+        babel_per_cell = (time.perf_counter() - started) / BABEL_SAMPLE
+
+        print(f"{locale}: formatter built in {built * 1000:.1f} ms; {CELLS:,} cells in {elapsed:.2f} s "
+              f"({per_cell * 1e9:.0f} ns/cell, {FRAME / per_cell:,.0f} cells per frame)")
+        print(f"{'':7}Babel per cell: {babel_per_cell * CELLS:.1f} s ({babel_per_cell * 1e9:,.0f} ns/cell, "
+              f"{FRAME / babel_per_cell:,.0f} cells per frame); "
+              f"a screenful of {VISIBLE_CELLS} cells: {per_cell * VISIBLE_CELLS * 1000:.2f} ms "
+              f"vs {babel_per_cell * VISIBLE_CELLS * 1000:.1f} ms")
+
+    # Cached formatters are reused, not rebuilt
+    started = time.perf_counter()
+    for _ in range(100_000):
+        get_formatter()
+    print(f"get_formatter: {(time.perf_counter() - started) / 100_000 * 1e9:.0f} ns per call")
+
+if __name__ == '__main__':
+    main()
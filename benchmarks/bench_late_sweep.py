@@ -0,0 +1,60 @@
+"""Benchmark the nightly late-installment sweep over 500k open installments.
+
+Run from the repository root:  python benchmarks/bench_late_sweep.py
+"""
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.database import Base
+import models.customer  # noqa: F401  (PaymentPlan.customer target)
+from services.payment_service import PaymentService
+
+PLANS = 5_000
+INSTALLMENTS = 100
+AS_OF = date(2029, 1, 1)
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        service = PaymentService(db)
+
+        service.create_payment_plans([
+            {
+                'plan_no': f"SWEEP-{i:05d}",
+                'customer_id': i + 1,
+                'title': f"Unit {i}",
+                'total_amount': 2_500_000.0,
+                'down_payment': 250_000.0,
+                'interest_rate': 24.0,
+                'number_of_installments': INSTALLMENTS,
+                'start_date': date(2025 + i % 3, 1 + i % 12, 1),
+                'payment_day': 1 + i % 28
+            }
+            for i in range(PLANS)
+        ])
+
+        started = time.perf_counter()
+        first = service.sweep_late_installments(AS_OF)
+        first_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        second = service.sweep_late_installments(AS_OF)
+        second_elapsed = time.perf_counter() - started
+        db.close()
+
+    print(f"open installments:  {PLANS * INSTALLMENTS:,}")
+    print(f"first sweep:        {first_elapsed:6.2f} s  {first}")
+    print(f"repeat sweep:       {second_elapsed:6.2f} s  {second}")
+
+if __name__ == '__main__':
+    main()
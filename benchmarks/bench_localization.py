@@ -0,0 +1,97 @@
+"""Benchmark translation loading and lookups.
+
+Cold start: parsing every language's JSON (as startup used to) against
+loading only the current language from its cached catalog. Lookups: 1M
+get_text calls and the same keys in bulk, against the nested split-and-walk
+lookup get_text used before the catalogs were compiled. Run from the
+repository root:  python benchmarks/bench_localization.py
+"""
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core import localization
+from core.localization import get_text, get_texts, load_translations
+
+CALLS = 1_000_000
+MODULES = 20
+KEYS_PER_MODULE = 100
+MISS_RATE = 0.2
+CATALOG_MODULES = 200  # 20,000 keys per language for the cold start
+
+def nested_get_text(key, language='tr'):
+    """The lookup get_text did before translations were compiled"""
+    try:
+        value = localization.translations[language]
+        for k in key.split('.'):
+            value = value[k]
+        return value
+    except (KeyError, TypeError):
+        return key
+
+def timed(label, call):
+    started = time.perf_counter()
+    call()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {elapsed:6.3f} s  {elapsed / CALLS * 1e9:6.0f} ns/lookup")
+
+def synthetic_translations(language, modules):
+    return {
+        f"module_{m}": {f"key_{k}": f"{language} text {m}.{k}" for k in range(KEYS_PER_MODULE)}
+        for m in range(modules)
+    }
+
+def use_translations(directory, trees):
+    """Point localization at a directory holding the given translation trees"""
+    localization.TRANSLATIONS_DIR = Path(directory)
+    localization.CATALOG_CACHE_DIR = Path(directory) / '.cache'
+    for language, tree in trees.items():
+        with open(Path(directory) / f"{language}.json", 'w', encoding='utf-8') as f:
+            json.dump(tree, f, ensure_ascii=False)
+
+def cold_start():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_translations(tmp, {language: synthetic_translations(language, CATALOG_MODULES)
+                               for language in localization.LANGUAGES})
+
+        started = time.perf_counter()
+        for language in localization.LANGUAGES:
+            with open(Path(tmp) / f"{language}.json", 'r', encoding='utf-8') as f:
+                json.load(f)
+        print(f"{'parse every language (before)':<34} {(time.perf_counter() - started) * 1000:6.1f} ms")
+
+        for label in ("first start (compile + cache)", "cached start"):
+            started = time.perf_counter()
+            load_translations()
+            print(f"{label:<34} {(time.perf_counter() - started) * 1000:6.1f} ms")
+
+def main():
+    cold_start()
+
+    trees = {language: synthetic_translations(language, MODULES) for language in localization.LANGUAGES}
+    # Indonesian misses some keys and falls back to English
+    del trees['id']['module_0']
+    lookup_dir = tempfile.TemporaryDirectory()
+    use_translations(lookup_dir.name, trees)
+    load_translations()
+    get_text('module_0.key_0', 'id')  # Load the fallback catalog before timing
+
+    random.seed(1)
+    keys = [
+        f"module_{random.randrange(MODULES)}.key_{random.randrange(KEYS_PER_MODULE)}"
+        if random.random() > MISS_RATE else f"missing_{random.randrange(50)}.key"
+        for _ in range(CALLS)
+    ]
+
+    timed("nested lookup (before)", lambda: [nested_get_text(key) for key in keys])
+    timed("get_text", lambda: [get_text(key) for key in keys])
+    timed("get_text, explicit language", lambda: [get_text(key, 'id') for key in keys])
+    timed("get_texts (bulk)", lambda: get_texts(keys))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Benchmark outbox delivery throughput to SMTP, SMS and file sinks.
+
+Runs a minimal SMTP server on localhost so email delivery goes over real
+sockets. Run from the repository root:  python benchmarks/bench_notification_outbox.py
+"""
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.database import Base
+from core.database import bulk_insert
+from models.customer import Customer
+from services.payment_service import PaymentService
+from services.notification_outbox import (
+    NotificationOutboxService, OutboxDispatcher, SmtpSink, SmsGatewaySink, FileDropSink
+)
+
+CUSTOMERS = 2_000
+INSTALLMENTS = 24
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept mail and count it"""
+    def handle(self):
+        self.wfile.write(b"220 localhost ready\r\n")
+        in_data = False
+        for line in self.rfile:
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    self.server.received += 1
+                    self.wfile.write(b"250 OK\r\n")
+                continue
+            command = line[:4].upper()
+            if command == b"DATA":
+                in_data = True
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            elif command == b"EHLO":
+                self.wfile.write(b"250 localhost\r\n")
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+class SmtpServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    received = 0
+
+def main():
+    server = SmtpServer(('127.0.0.1', 0), SmtpHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+
+        bulk_insert(db, Customer.__table__, {
+            'name': [f"Customer {i}" for i in range(CUSTOMERS)],
+            'tax_number': [f"TN{i:08d}" for i in range(CUSTOMERS)],
+            'email': [f"customer{i}@example.com" for i in range(CUSTOMERS)],
+            'phone': [f"+90555{i:07d}" for i in range(CUSTOMERS)]
+        })
+        payments = PaymentService(db)
+        payments.create_payment_plans([
+            {
+                'plan_no': f"NB-{i:05d}",
+                'customer_id': i + 1,
+                'title': f"Unit {i}",
+                'total_amount': 1_200_000.0,
+                'down_payment': 0.0,
+                'interest_rate': 0.0,
+                'number_of_installments': INSTALLMENTS,
+                'start_date': date(2025, 1 + i % 12, 1),
+                'payment_day': 1 + i % 28
+            }
+            for i in range(CUSTOMERS)
+        ])
+        sweep = payments.sweep_late_installments()
+        db.close()
+        print(f"late notifications:  {sweep['notifications_created']:,}")
+
+        sms = SmsGatewaySink(history_size=None)  # Keep all, to count them
+        dispatcher = OutboxDispatcher(
+            {
+                'email': SmtpSink('127.0.0.1', server.server_address[1]),
+                'sms': sms,
+                'file': FileDropSink(f"{tmp}/drop")
+            },
+            workers=8, batch_size=500, session_factory=Session
+        )
+
+        started = time.perf_counter()
+        queued = None
+        while True:
+            result = dispatcher.run_once()
+            queued = queued or result
+            if not result['claimed']:
+                break
+        elapsed = time.perf_counter() - started
+        dispatcher.stop()
+
+        stats = dispatcher.get_stats()
+        db = Session()
+        counts = NotificationOutboxService(db).get_status_counts()
+        db.close()
+        print(f"messages queued:     {queued['messages_created']:,}")
+        print(f"statuses:            {counts}")
+        print(f"smtp received:       {server.received:,}  sms: {len(sms.sent):,}  "
+              f"files: {len(list(Path(tmp, 'drop').iterdir())):,}")
+        print(f"total:               {elapsed:.2f} s")
+        print(f"delivery throughput: {stats['messages_per_second']:,.0f} messages/s")
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
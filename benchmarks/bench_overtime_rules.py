@@ -0,0 +1,57 @@
+"""Benchmark overtime rule evaluation over 1M attendance rows.
+
+Run from the repository root:  python benchmarks/bench_overtime_rules.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from services.overtime_rules import OvertimeRules, totals_by_employee
+
+ROWS = 1_000_000
+EMPLOYEES = 4_000
+
+def make_attendance(rows, employees, seed=42):
+    rng = np.random.default_rng(seed)
+    employee_ids = rng.integers(1, employees + 1, rows)
+    positions = np.array(['Worker', 'Foreman', 'Operator', 'Driver'], dtype=object)[employee_ids % 4]
+    days = np.datetime64('2026-01-01') + rng.integers(0, 365, rows).astype('timedelta64[D]')
+    time_in = days.astype('datetime64[m]') + rng.integers(5 * 60, 22 * 60, rows).astype('timedelta64[m]')
+    time_out = time_in + rng.integers(4 * 60, 13 * 60, rows).astype('timedelta64[m]')
+    hourly_rates = 100 + (employee_ids % 50).astype(float)
+    return employee_ids, positions, time_in, time_out, hourly_rates
+
+def main():
+    columns = make_attendance(ROWS, EMPLOYEES)
+
+    started = time.perf_counter()
+    rules = OvertimeRules({
+        'holidays': ['2026-01-01', '2026-04-23', '2026-05-01', '2026-05-19', '2026-07-15',
+                     '2026-08-30', '2026-10-29'],
+        'night_premium': 0.25,
+        'positions': {
+            'Foreman': {'overtime_multiplier': 2.0},
+            'Driver': {'daily_regular_hours': 9, 'weekly_regular_hours': 48}
+        }
+    })
+    compiled = time.perf_counter()
+
+    result = rules.evaluate(*columns)
+    evaluated = time.perf_counter()
+
+    totals = totals_by_employee(columns[0], result)
+    summed = time.perf_counter()
+
+    print(f"rows:       {ROWS:,}")
+    print(f"compile:    {(compiled - started) * 1000:8.2f} ms")
+    print(f"evaluate:   {(evaluated - compiled) * 1000:8.2f} ms "
+          f"({ROWS / (evaluated - compiled):,.0f} rows/s)")
+    print(f"aggregate:  {(summed - evaluated) * 1000:8.2f} ms ({len(totals):,} employees)")
+    print(f"total paid: {result['total_amount'].sum():,.2f}")
+
+if __name__ == '__main__':
+    main()
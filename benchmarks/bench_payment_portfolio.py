@@ -0,0 +1,64 @@
+"""Benchmark the portfolio payment summary over 1M installments.
+
+Run from the repository root:  python benchmarks/bench_payment_portfolio.py
+"""
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.database import Base
+import models.customer  # noqa: F401  (PaymentPlan.customer target)
+from services.payment_service import PaymentService
+from services.payment_portfolio_service import PaymentPortfolioService
+
+PLANS = 10_000
+INSTALLMENTS = 100
+AS_OF = date(2027, 6, 1)
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+
+        PaymentService(db).create_payment_plans([
+            {
+                'plan_no': f"PF-{i:05d}",
+                'customer_id': i % 3_000 + 1,
+                'title': f"Unit {i}",
+                'project': f"Project {i % 12}",
+                'total_amount': 3_000_000.0,
+                'down_payment': 300_000.0,
+                'interest_rate': 24.0,
+                'number_of_installments': INSTALLMENTS,
+                'start_date': date(2025 + i % 3, 1 + i % 12, 1),
+                'payment_day': 1 + i % 28
+            }
+            for i in range(PLANS)
+        ])
+
+        service = PaymentPortfolioService(db)
+        for group_by, start, end in [
+            (('customer',), None, None),
+            (('project',), None, None),
+            (('month',), None, None),
+            (('project', 'month'), date(2026, 1, 1), date(2026, 12, 31)),
+            (('project', 'month'), None, None),
+            ((), None, None)
+        ]:
+            started = time.perf_counter()
+            rows = service.get_summary(group_by, start, end, AS_OF)
+            elapsed = time.perf_counter() - started
+            period = f"{start.year}" if start else "all"
+            print(f"{'+'.join(group_by) or 'totals':15s} {period:4s} {elapsed * 1000:8.1f} ms  {len(rows):6,} groups")
+        db.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark the month-end penalty interest accrual over 500k installments.
+
+Run from the repository root:  python benchmarks/bench_penalty_accrual.py
+"""
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.database import Base
+import models.customer  # noqa: F401  (PaymentPlan.customer target)
+from services.payment_service import PaymentService
+from services.penalty_service import PenaltyService
+
+PLANS = 5_000
+INSTALLMENTS = 100
+MONTH_END = date(2030, 6, 30)
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+
+        PaymentService(db).create_payment_plans([
+            {
+                'plan_no': f"PA-{i:05d}",
+                'customer_id': i + 1,
+                'title': f"Unit {i}",
+                'total_amount': 2_000_000.0,
+                'down_payment': 200_000.0,
+                'interest_rate': 18.0,
+                'penalty_rate': 24.0 + i % 4 * 6,
+                'number_of_installments': INSTALLMENTS,
+                'start_date': date(2024 + i % 4, 1 + i % 12, 1),
+                'payment_day': 1 + i % 28
+            }
+            for i in range(PLANS)
+        ])
+        db.close()
+
+        db = sessionmaker(bind=engine)()
+        penalties = PenaltyService(db)
+        for label in ('first run', 'rerun'):
+            started = time.perf_counter()
+            result = penalties.accrue_month(MONTH_END)
+            elapsed = time.perf_counter() - started
+            print(f"{label:10s} {elapsed:6.2f} s  {result['installments_accrued']:,} installments  "
+                  f"{result['plans_updated']:,} plans  penalty {result['penalty_amount']:,.2f}")
+        db.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark portfolio analytics over 2,000 properties with three deeds each.
+
+Run from the repository root:  python benchmarks/bench_property_analytics.py
+"""
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.database import Base, bulk_insert
+from models.property import Property, Deed, PropertyType, PropertyStatus, OwnershipType
+from services.property_analytics_service import PropertyAnalyticsService
+from services.property_service import PropertyService
+
+PROPERTIES = 2_000
+DEEDS_PER_PROPERTY = 3
+CITIES = ['İstanbul', 'Ankara', 'İzmir', 'Bursa', 'Antalya', 'Kocaeli']
+
+def timed(label, call):
+    started = time.perf_counter()
+    result = call()
+    print(f"{label:<32} {(time.perf_counter() - started) * 1000:8.1f} ms")
+    return result
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+
+        types, statuses = list(PropertyType), list(PropertyStatus)
+        now = datetime.now()
+        bulk_insert(db, Property.__table__, {
+            'property_no': [f"P-{i:05d}" for i in range(PROPERTIES)],
+            'title': [f"Unit {i}" for i in range(PROPERTIES)],
+            'type': [types[i % len(types)] for i in range(PROPERTIES)],
+            'status': [statuses[i % len(statuses)] for i in range(PROPERTIES)],
+            'address': 'Address',
+            'city': [CITIES[i % len(CITIES)] for i in range(PROPERTIES)],
+            'area': [60.0 + i % 200 for i in range(PROPERTIES)],
+            'current_value': [3_000_000.0 + 1_000 * i for i in range(PROPERTIES)],
+            'monthly_rent': [12_000.0 if i % 3 == 0 else None for i in range(PROPERTIES)],
+            'created_at': now,
+            'updated_at': now
+        })
+        deeds = PROPERTIES * DEEDS_PER_PROPERTY
+        bulk_insert(db, Deed.__table__, {
+            'property_id': [1 + i // DEEDS_PER_PROPERTY for i in range(deeds)],
+            'deed_no': [f"D-{i:06d}" for i in range(deeds)],
+            'registration_date': [date(2010, 1, 1) + timedelta(days=400 * (i % DEEDS_PER_PROPERTY) + i % 365)
+                                  for i in range(deeds)],
+            'ownership_type': OwnershipType.FULL,
+            'owner_name': [f"Owner {i}" for i in range(deeds)],
+            'purchase_price': [1_000_000.0 + 500_000 * (i % DEEDS_PER_PROPERTY) for i in range(deeds)],
+            'is_active': [i % DEEDS_PER_PROPERTY == DEEDS_PER_PROPERTY - 1 for i in range(deeds)]
+        })
+        db.commit()
+
+        analytics = PropertyAnalyticsService(db)
+        timed("summary by city (cold)", lambda: analytics.get_summary(('city',)))
+        timed("summary by city (cached)", lambda: analytics.get_summary(('city',)))
+        timed("summary by city/type/status", lambda: analytics.get_summary(('city', 'type', 'status')))
+        series = timed("yearly series by city", lambda: analytics.get_value_series(('city',)))
+        timed("monthly series by type", lambda: analytics.get_value_series(('type',), frequency='month'))
+
+        PropertyService(db).update_property(1, {'current_value': 4_000_000.0})
+        timed("totals after revaluation", analytics.get_totals)
+        print(f"periods: {len(series['periods'])}, groups: {len(series['groups'])}")
+        db.close()
+
+if __name__ == '__main__':
+    main()
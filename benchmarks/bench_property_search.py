@@ -0,0 +1,86 @@
+"""Benchmark faceted property search over 100,000 properties.
+
+Run from the repository root:  python benchmarks/bench_property_search.py
+"""
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.database import Base, bulk_insert
+from models.property import Property, Deed, PropertyType, PropertyStatus, OwnershipType
+from services.property_service import PropertyService
+from services.property_search_service import PropertySearchService
+
+PROPERTIES = 100_000
+CITIES = ['İstanbul', 'Ankara', 'İzmir', 'Bursa', 'Antalya', 'Kocaeli']
+
+SEARCHES = [
+    {},
+    {'city': 'Ankara'},
+    {'city': ['Ankara', 'İzmir'], 'type': PropertyType.RESIDENTIAL, 'min_area': 120},
+    {'ownership_type': OwnershipType.SHARED, 'max_price': 5_000_000},
+]
+
+def main():
+    random.seed(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+
+        now = datetime.now()
+        types, statuses, ownership = list(PropertyType), list(PropertyStatus), list(OwnershipType)
+        bulk_insert(db, Property.__table__, {
+            'property_no': [f"P-{i:06d}" for i in range(PROPERTIES)],
+            'title': [f"Unit {i}" for i in range(PROPERTIES)],
+            'type': [random.choice(types) for _ in range(PROPERTIES)],
+            'status': [random.choice(statuses) for _ in range(PROPERTIES)],
+            'address': 'Address',
+            'city': [random.choice(CITIES) for _ in range(PROPERTIES)],
+            'district': [f"District {random.randint(1, 30)}" for _ in range(PROPERTIES)],
+            'area': [random.uniform(30, 600) for _ in range(PROPERTIES)],
+            'current_value': [random.uniform(500_000, 30_000_000) for _ in range(PROPERTIES)],
+            'created_at': now,
+            'updated_at': now
+        })
+        bulk_insert(db, Deed.__table__, {
+            'property_id': list(range(1, PROPERTIES + 1)),
+            'deed_no': [f"D-{i:06d}" for i in range(PROPERTIES)],
+            'registration_date': date(2020, 1, 1),
+            'ownership_type': [random.choice(ownership) for _ in range(PROPERTIES)],
+            'owner_name': [f"Owner {i}" for i in range(PROPERTIES)],
+            'is_active': True,
+            'created_at': now,
+            'updated_at': now
+        })
+        db.commit()
+        db.execute(text("ANALYZE"))
+
+        search = PropertySearchService(db)
+        for filters in SEARCHES:
+            started = time.perf_counter()
+            result = search.search(filters, sort='-price')
+            cold = time.perf_counter() - started
+            started = time.perf_counter()
+            search.search(filters, page=2, sort='-price')
+            warm = time.perf_counter() - started
+            print(f"{str(filters)[:70]:<72} {result['total']:>7,} matches  "
+                  f"first {cold * 1000:6.1f} ms  cached {warm * 1000:5.1f} ms")
+
+        PropertyService(db).update_property(1, {'city': 'Ankara'})
+        started = time.perf_counter()
+        result = search.search({'city': 'Ankara'})
+        print(f"after a property write: {result['total']:,} matches in "
+              f"{(time.perf_counter() - started) * 1000:.1f} ms (recounted)")
+        db.close()
+
+if __name__ == '__main__':
+    main()
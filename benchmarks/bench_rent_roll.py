@@ -0,0 +1,77 @@
+"""Benchmark monthly rent billing of 3,000 rented units with yearly escalations.
+
+Run from the repository root:  python benchmarks/bench_rent_roll.py
+"""
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from core.database import Base, bulk_insert
+from models.customer import Customer, CustomerBalance
+from models.property import Property, PropertyType, PropertyStatus
+from models.rent import RentEscalation
+from services.rent_roll_service import RentRollService
+
+UNITS = 3_000
+MONTHS = 12
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+
+        bulk_insert(db, Customer.__table__, {
+            'name': [f"Tenant {i}" for i in range(UNITS)],
+            'tax_number': [f"TN{i:08d}" for i in range(UNITS)]
+        })
+        # Every other tenant already has a balance row
+        bulk_insert(db, CustomerBalance.__table__, {
+            'customer_id': list(range(1, UNITS + 1, 2)),
+            'total_debit': 0.0,
+            'total_credit': 0.0
+        })
+        bulk_insert(db, Property.__table__, {
+            'property_no': [f"U-{i:05d}" for i in range(UNITS)],
+            'title': [f"Unit {i}" for i in range(UNITS)],
+            'type': PropertyType.RESIDENTIAL,
+            'status': PropertyStatus.RENTED,
+            'address': 'Address',
+            'city': 'İstanbul',
+            'monthly_rent': [15_000.0 + 10 * i for i in range(UNITS)],
+            'tenant_id': list(range(1, UNITS + 1))
+        })
+        bulk_insert(db, RentEscalation.__table__, {
+            'property_id': list(range(1, UNITS + 1)),
+            'effective_date': [date(2026, 1 + i % 12, 1) for i in range(UNITS)],
+            'rate': 25.0,
+            'repeat_months': 12
+        })
+        db.commit()
+
+        rent_roll = RentRollService(db)
+        total = 0.0
+        for month in range(1, MONTHS + 1):
+            started = time.perf_counter()
+            result = rent_roll.bill_month(date(2026, month, 1))
+            elapsed = time.perf_counter() - started
+            total += elapsed
+            print(f"2026-{month:02d}: {result['charges_created']:,} charges, "
+                  f"{result['escalations_applied']:,} escalations, {elapsed * 1000:6.1f} ms")
+
+        started = time.perf_counter()
+        again = rent_roll.bill_month(date(2026, MONTHS, 1))
+        print(f"re-run of last month: {again['charges_created']} charges in "
+              f"{(time.perf_counter() - started) * 1000:.1f} ms")
+        print(f"total: {total:.2f} s for {UNITS * MONTHS:,} charges")
+        db.close()
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+import logging
 import os
 from pathlib import Path
 
@@ -14,6 +15,12 @@ def setup_environment():
     
     for dir_name in base_dirs:
         Path(dir_name).mkdir(exist_ok=True)
+
+    logging.basicConfig(
+        filename="logs/app.log",
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
     
     # Set environment variables
     os.environ.setdefault("APP_ENV", "development")
@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine
+from functools import reduce
+import string
+from sqlalchemy import create_engine, inspect, text, select, func, literal, cast, String
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -12,9 +14,137 @@ Base = declarative_base()
 # Create session factory
 SessionLocal = sessionmaker(bind=engine)
 
+# Backfill callbacks keyed by (table, column), run when init_database adds
+# that column to a table created by an older version of the application
+_column_backfills = {}
+
+def on_column_added(table_name, column_name):
+    """Register a backfill to run after a column is added to an existing table"""
+    def decorator(func):
+        _column_backfills[(table_name, column_name)] = func
+        return func
+    return decorator
+
+# Callbacks keyed by table name, run when init_database creates that table
+# in a database made by an older version (e.g. to fill it from existing rows)
+_table_backfills = {}
+
+def on_table_created(table_name):
+    """Register a backfill to run after a table is added to an existing database"""
+    def decorator(func):
+        _table_backfills[table_name] = func
+        return func
+    return decorator
+
+# Callbacks keyed by index name, run before init_database creates that index
+# on an existing table (e.g. to remove rows violating a new unique index)
+_index_preparers = {}
+
+def before_index_created(index_name):
+    """Register a callback to run before an index is added to an existing table"""
+    def decorator(func):
+        _index_preparers[index_name] = func
+        return func
+    return decorator
+
 def init_database():
     """Initialize the database, creating all tables"""
+    existing_tables = set(inspect(engine).get_table_names())
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(existing_tables)
+
+def upgrade_schema(existing_tables):
+    """Add columns missing from tables created by an older schema, and fill newly added tables"""
+    inspector = inspect(engine)
+    added = []
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(
+                    f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                ))
+                added.append((table.name, column.name))
+
+        # Indexes declared after the table was first created
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {i['name'] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in present:
+                    continue
+                prepare = _index_preparers.get(index.name)
+                if prepare:
+                    prepare(connection)
+                index.create(bind=connection)
+
+        for key in added:
+            backfill = _column_backfills.get(key)
+            if backfill:
+                backfill(connection)
+
+        if existing_tables:
+            for table in Base.metadata.sorted_tables:
+                backfill = _table_backfills.get(table.name)
+                if table.name not in existing_tables and backfill:
+                    backfill(connection)
+    return added
+
+def bulk_insert(db, table, columns):
+    """Insert column-oriented rows into a table with one DBAPI executemany.
+
+    `columns` maps column names to equal-length sequences or to a single
+    value shared by every row. Values go through the column type's bind
+    processor once per distinct value rather than once per row, and
+    omitted columns with a Python-side default get it evaluated once.
+    """
+    dialect = db.get_bind().dialect
+    columns = dict(columns)
+    for column in table.columns:
+        default = column.default
+        if column.name in columns or default is None or column.primary_key:
+            continue
+        if default.is_callable:
+            columns[column.name] = default.arg(None)
+        elif default.is_scalar:
+            columns[column.name] = default.arg
+
+    row_count = max((len(v) for v in columns.values() if isinstance(v, (list, tuple))), default=0)
+    if row_count == 0:
+        return 0
+
+    converted = []
+    for name, values in columns.items():
+        processor = table.c[name].type.dialect_impl(dialect).bind_processor(dialect)
+        if not isinstance(values, (list, tuple)):
+            values = [processor(values) if processor else values] * row_count
+        elif processor:
+            cache = {}
+            values = [cache[v] if v in cache else cache.setdefault(v, processor(v)) for v in values]
+        converted.append(values)
+
+    placeholders = ', '.join('?' for _ in columns)
+    sql = f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({placeholders})"
+    db.connection().exec_driver_sql(sql, list(zip(*converted)))
+    return row_count
+
+def table_version(db, *tables):
+    """Fingerprint of the rows in tables with an updated_at column.
+
+    Row count and latest updated_at of each table: any insert, update or
+    delete changes it, so it can key a cache of results derived from them.
+    """
+    version = []
+    for table in tables:
+        row = db.execute(select(func.count(), func.max(table.c.updated_at)).select_from(table)).one()
+        version.append(tuple(row))
+    return tuple(version)
 
 def get_db():
     """Get a database session"""
@@ -22,4 +152,18 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def sql_format(template, **columns):
+    """SQL string expression filling a str.format template with column values.
+
+    For messages written by set-based statements, e.g.
+    sql_format(get_text("notifications.installment_late"), plan_no=plans.c.plan_no).
+    """
+    parts = []
+    for text_part, field, _, _ in string.Formatter().parse(template):
+        if text_part:
+            parts.append(literal(text_part))
+        if field is not None:
+            parts.append(cast(columns[field], String))
+    return reduce(lambda left, right: left + right, parts) if parts else literal('')
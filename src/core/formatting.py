@@ -0,0 +1,161 @@
+from babel import Locale
+from babel.dates import get_date_format, get_time_format, get_datetime_format, tokenize_pattern, format_datetime
+from babel.numbers import (parse_pattern, get_decimal_symbol, get_group_symbol,
+                           get_minus_sign_symbol, get_currency_symbol)
+from core import localization
+
+# Babel locale of each interface language
+LOCALES = {
+    'tr': 'tr_TR',
+    'en': 'en_US',
+    'id': 'id_ID'
+}
+
+DEFAULT_CURRENCY = 'TRY'
+
+# Date pattern fields compiled to str.format fields. Arguments are the value
+# and, when the pattern uses them, its two-digit year, its 12-hour clock
+# hour and its AM/PM marker.
+_DATE_FIELDS = {
+    ('d', 1): '{0.day}', ('d', 2): '{0.day:02d}',
+    ('M', 1): '{0.month}', ('M', 2): '{0.month:02d}',
+    ('y', 1): '{0.year}', ('y', 4): '{0.year:04d}', ('y', 2): '{1:02d}',
+    ('H', 1): '{0.hour}', ('H', 2): '{0.hour:02d}',
+    ('h', 1): '{2}', ('h', 2): '{2:02d}',
+    ('m', 1): '{0.minute}', ('m', 2): '{0.minute:02d}',
+    ('s', 1): '{0.second}', ('s', 2): '{0.second:02d}',
+    ('a', 1): '{3}'
+}
+
+_formatters = {}
+
+class Formatter:
+    """Number, money and date formatting of one locale, built once and reused for every cell.
+
+    Babel is asked for the locale's symbols and patterns when the formatter
+    is built; a cell is then formatted with str.format and translate(). The
+    list methods format a whole column, with "" for None, and format each
+    distinct date in it only once.
+    """
+
+    def __init__(self, locale, currency=DEFAULT_CURRENCY):
+        self.locale = Locale.parse(locale)
+        self.currency_code = currency
+
+        minus = get_minus_sign_symbol(self.locale)
+        # Python's "," and "." grouping and decimal marks, and its minus, to the locale's
+        self._symbols = str.maketrans({
+            ',': get_group_symbol(self.locale),
+            '.': get_decimal_symbol(self.locale),
+            '-': minus
+        })
+        pattern = parse_pattern(self.locale.currency_formats['standard'].pattern)
+        symbol = get_currency_symbol(currency, self.locale)
+        # (prefix, suffix) of positive and negative amounts, e.g. ("₺", "") and ("-₺", "")
+        self._currency_affixes = tuple(
+            (prefix.replace('-', minus).replace('¤', symbol), suffix.replace('-', minus).replace('¤', symbol))
+            for prefix, suffix in zip(pattern.prefix, pattern.suffix)
+        )
+
+        am_pm = self.locale.day_periods['format']['abbreviated']
+        self._am_pm = (am_pm.get('am', 'AM'), am_pm.get('pm', 'PM'))
+        date_pattern = self._full_year(get_date_format('short', self.locale).pattern)
+        time_pattern = get_time_format('short', self.locale).pattern
+        # Babel joins a timestamp's date and time texts the same way
+        self._date_and_time = get_datetime_format('short', self.locale).replace("'", "")
+        datetime_pattern = self._date_and_time.replace('{1}', date_pattern).replace('{0}', time_pattern)
+        self._date = self._compile_date_pattern(date_pattern)
+        self._time = self._compile_date_pattern(time_pattern)
+        self._datetime = self._compile_date_pattern(datetime_pattern)
+
+    @staticmethod
+    def _full_year(pattern):
+        """Show years with all their digits; two-digit years are ambiguous in ledgers"""
+        return pattern.replace('yyyy', 'y').replace('yy', 'y')
+
+    def _compile_date_pattern(self, pattern):
+        """A function formatting a date/time with a pattern, compiled to a str.format call"""
+        parts = []
+        short_year = twelve_hour = False
+        for kind, value in tokenize_pattern(pattern):
+            if kind == 'chars':
+                parts.append(value.replace('{', '{{').replace('}', '}}'))
+            elif value in _DATE_FIELDS:
+                parts.append(_DATE_FIELDS[value])
+                short_year = short_year or value == ('y', 2)
+                twelve_hour = twelve_hour or value[0] in 'ha'
+            else:
+                # A field without a compiled form (e.g. month names): let Babel format it
+                return lambda value: format_datetime(value, pattern, locale=self.locale)
+
+        template = ''.join(parts).format
+        am_pm = self._am_pm
+        if twelve_hour:
+            return lambda value: template(value, value.year % 100 if short_year else None,
+                                          value.hour % 12 or 12, am_pm[value.hour >= 12])
+        if short_year:
+            return lambda value: template(value, value.year % 100)
+        return template
+
+    def number(self, value, digits=2):
+        if value is None:
+            return ""
+        return f"{value:,.{digits}f}".translate(self._symbols)
+
+    def currency(self, value, digits=2):
+        if value is None:
+            return ""
+        prefix, suffix = self._currency_affixes[value < 0]
+        return f"{prefix}{self.number(abs(value), digits)}{suffix}"
+
+    def date(self, value):
+        return self._date(value) if value is not None else ""
+
+    def time(self, value):
+        return self._time(value) if value is not None else ""
+
+    def datetime(self, value):
+        return self._datetime(value) if value is not None else ""
+
+    def numbers(self, values, digits=2):
+        """Format a list of numbers, e.g. a table column"""
+        if not values:
+            return []
+        template = f"{{:,.{digits}f}}".format
+        # One translate() over the joined column is much cheaper than one per cell
+        joined = '\n'.join([template(value) if value is not None else "" for value in values])
+        return joined.translate(self._symbols).split('\n')
+
+    def currencies(self, values, digits=2):
+        """Format a list of money amounts"""
+        affixes = self._currency_affixes
+        return [
+            f"{affixes[value < 0][0]}{text}{affixes[value < 0][1]}" if value is not None else ""
+            for value, text in zip(values, self.numbers([abs(v) if v is not None else None for v in values], digits))
+        ]
+
+    def dates(self, values):
+        """Format a list of dates; each distinct date is formatted once"""
+        texts = {value: self._date(value) for value in set(values) if value is not None}
+        return [texts.get(value, "") for value in values]
+
+    def times(self, values):
+        texts = {value: self._time(value) for value in set(values) if value is not None}
+        return [texts.get(value, "") for value in values]
+
+    def datetimes(self, values):
+        """Format a list of timestamps; their distinct dates and times are formatted once"""
+        present = [value for value in values if value is not None]
+        date_texts = {day: self._date(day) for day in {value.date() for value in present}}
+        time_texts = {clock: self._time(clock) for clock in {value.time() for value in present}}
+        join = self._date_and_time.format
+        return [join(time_texts[value.time()], date_texts[value.date()]) if value is not None else ""
+                for value in values]
+
+def get_formatter(language=None, currency=DEFAULT_CURRENCY):
+    """The formatter of a language's locale, the current language by default; built on first use"""
+    language = language or localization.current_language
+    formatter = _formatters.get((language, currency))
+    if formatter is None:
+        formatter = _formatters[(language, currency)] = Formatter(LOCALES.get(language, 'tr_TR'), currency)
+    return formatter
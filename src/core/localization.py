@@ -1,4 +1,8 @@
 import json
+import os
+import pickle
+import uuid
+import weakref
 from pathlib import Path
 
 # Available languages
@@ -8,37 +12,121 @@ LANGUAGES = {
     'id': 'Bahasa Indonesia'
 }
 
+# Languages tried in order for keys a language does not translate; the
+# key itself is shown when none of them has it
+FALLBACK_LANGUAGES = {
+    'tr': (),
+    'en': ('tr',),
+    'id': ('en', 'tr')
+}
+
+TRANSLATIONS_DIR = Path('translations')
+# Compiled catalogs, rebuilt when a source JSON file changes
+CATALOG_CACHE_DIR = TRANSLATIONS_DIR / '.cache'
+CATALOG_FORMAT = 1
+
 # Current language
 current_language = 'tr'
 
-# Translations dictionary
+# Parsed JSON of the languages compiled in this run
 translations = {}
 
+# Flat "module.key" -> text table per language, with fallbacks merged in,
+# so a lookup is a single dict access. Loaded on first use of a language.
+catalogs = {}
+_current_catalog = {}
+
+# Texts on screen that follow the language, see bind_text:
+# (weak reference to the widget, setter name, setter args) -> key(s)
+_bound_texts = {}
+# Called after the bound texts are updated, for texts built from values
+_language_listeners = []
+
 def load_translations():
-    """Load translation files for all languages"""
-    global translations
-    translations_dir = Path('translations')
-    
-    for lang in LANGUAGES.keys():
-        lang_file = translations_dir / f"{lang}.json"
-        if lang_file.exists():
-            with open(lang_file, 'r', encoding='utf-8') as f:
-                translations[lang] = json.load(f)
+    """Forget loaded catalogs; each language is loaded again on its next use"""
+    global _current_catalog
+    translations.clear()
+    catalogs.clear()
+    _current_catalog = get_catalog(current_language)
+
+def flatten_translations(tree, prefix=''):
+    """Nested translations as {"menu.customers": text}"""
+    flat = {}
+    for name, value in tree.items():
+        key = f"{prefix}{name}"
+        if isinstance(value, dict):
+            flat.update(flatten_translations(value, f"{key}."))
+        else:
+            flat[key] = value
+    return flat
+
+def get_catalog(language):
+    """Flat lookup table of a language, loaded from its cached catalog or compiled on first use"""
+    catalog = catalogs.get(language)
+    if catalog is None:
+        catalog = catalogs[language] = _load_catalog(language)
+    return catalog
+
+def _load_catalog(language):
+    if language not in LANGUAGES:
+        return {}
+    sources = (language,) + FALLBACK_LANGUAGES.get(language, ())
+    stamp = [CATALOG_FORMAT] + [_source_stamp(source) for source in sources]
+    cache_file = CATALOG_CACHE_DIR / f"{language}.pickle"
+    try:
+        with open(cache_file, 'rb') as f:
+            cached = pickle.load(f)
+        if cached['stamp'] == stamp:
+            return cached['catalog']
+    except (OSError, EOFError, KeyError, TypeError, pickle.UnpicklingError):
+        pass  # No cache yet, or from another version
+
+    catalog = compile_catalog(language)
+    # Compiling may have created missing files from the defaults
+    stamp = [CATALOG_FORMAT] + [_source_stamp(source) for source in sources]
+    try:
+        CATALOG_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        temp_file = cache_file.with_name(f"{cache_file.name}.{uuid.uuid4().hex}.tmp")
+        with open(temp_file, 'wb') as f:
+            pickle.dump({'stamp': stamp, 'catalog': catalog}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        pass  # Read-only install; compile again next time
+    return catalog
+
+def _source_stamp(language):
+    """Modification time and size of a language's JSON file, None if it has none"""
+    try:
+        stat = (TRANSLATIONS_DIR / f"{language}.json").stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def compile_catalog(language):
+    """Merge a language's translations over its fallbacks' into one flat table"""
+    catalog = {}
+    # Least preferred first, so the language's own texts win
+    for source in reversed((language,) + FALLBACK_LANGUAGES.get(language, ())):
+        if source not in translations:
+            lang_file = TRANSLATIONS_DIR / f"{source}.json"
+            if not lang_file.exists():
+                create_default_translations([source])
+            if lang_file.exists():
+                with open(lang_file, 'r', encoding='utf-8') as f:
+                    translations[source] = json.load(f)
+        catalog.update(flatten_translations(translations.get(source, {})))
+    return catalog
 
 def setup_translations():
-    """Initialize translation system"""
+    """Initialize translation system, loading only the current language"""
     # Create translations directory if it doesn't exist
-    Path('translations').mkdir(exist_ok=True)
+    TRANSLATIONS_DIR.mkdir(exist_ok=True)
     
-    # Create language files if they don't exist
-    create_default_translations()
-    
-    # Load all translations
     load_translations()
 
-def create_default_translations():
-    """Create default translation files for all supported languages"""
-    translations_dir = Path('translations')
+def create_default_translations(languages=None):
+    """Create missing default translation files, for all supported languages unless given"""
+    translations_dir = TRANSLATIONS_DIR
     
     # Default translations structure
     default_translations = {
@@ -53,6 +141,31 @@ def create_default_translations():
                 'trade': 'Ticaret',
                 'reports': 'Raporlar',
                 'settings': 'Ayarlar'
+            },
+            'notifications': {
+                'installment_late': 'Taksit {installment_no} ({plan_no}) vadesi geçti: {due_date}',
+                'document_expiring': 'Belge süresi doluyor: {title} ({property_no}) bitiş: {expiry_date}',
+                'outbox': {
+                    'line': '- {message}',
+                    'email': {
+                        'subject': 'Ödeme bildirimleri ({count})',
+                        'body': 'Sayın {customer_name},\n\nÖdeme planlarınızla ilgili bildirimler:\n\n{lines}\n\nSaygılarımızla'
+                    },
+                    'sms': {
+                        'subject': '',
+                        'body': 'Sayın {customer_name}, {count} ödeme bildiriminiz var:\n{lines}'
+                    },
+                    'file': {
+                        'subject': 'Ödeme bildirimleri ({count})',
+                        'body': '{customer_name}\n\n{lines}'
+                    }
+                }
+            },
+            'rent_roll': {
+                'charge_description': 'Kira {month} - {property_no}'
+            },
+            'customer_module': {
+                'balance_summary': 'Toplam Borç: {debit} | Toplam Alacak: {credit} | Net Bakiye: {net}'
             }
         },
         'en': {
@@ -66,6 +179,31 @@ def create_default_translations():
                 'trade': 'Trade',
                 'reports': 'Reports',
                 'settings': 'Settings'
+            },
+            'notifications': {
+                'installment_late': 'Installment {installment_no} ({plan_no}) is overdue: {due_date}',
+                'document_expiring': 'Document expiring: {title} ({property_no}) expires: {expiry_date}',
+                'outbox': {
+                    'line': '- {message}',
+                    'email': {
+                        'subject': 'Payment notifications ({count})',
+                        'body': 'Dear {customer_name},\n\nNotifications about your payment plans:\n\n{lines}\n\nKind regards'
+                    },
+                    'sms': {
+                        'subject': '',
+                        'body': 'Dear {customer_name}, you have {count} payment notifications:\n{lines}'
+                    },
+                    'file': {
+                        'subject': 'Payment notifications ({count})',
+                        'body': '{customer_name}\n\n{lines}'
+                    }
+                }
+            },
+            'rent_roll': {
+                'charge_description': 'Rent {month} - {property_no}'
+            },
+            'customer_module': {
+                'balance_summary': 'Total Debit: {debit} | Total Credit: {credit} | Net Balance: {net}'
             }
         },
         'id': {
@@ -79,12 +217,39 @@ def create_default_translations():
                 'trade': 'Perdagangan',
                 'reports': 'Laporan',
                 'settings': 'Pengaturan'
+            },
+            'notifications': {
+                'installment_late': 'Cicilan {installment_no} ({plan_no}) sudah lewat jatuh tempo: {due_date}',
+                'document_expiring': 'Dokumen akan kedaluwarsa: {title} ({property_no}) berakhir: {expiry_date}',
+                'outbox': {
+                    'line': '- {message}',
+                    'email': {
+                        'subject': 'Pemberitahuan pembayaran ({count})',
+                        'body': 'Yth. {customer_name},\n\nPemberitahuan mengenai rencana pembayaran Anda:\n\n{lines}\n\nHormat kami'
+                    },
+                    'sms': {
+                        'subject': '',
+                        'body': 'Yth. {customer_name}, Anda memiliki {count} pemberitahuan pembayaran:\n{lines}'
+                    },
+                    'file': {
+                        'subject': 'Pemberitahuan pembayaran ({count})',
+                        'body': '{customer_name}\n\n{lines}'
+                    }
+                }
+            },
+            'rent_roll': {
+                'charge_description': 'Sewa {month} - {property_no}'
+            },
+            'customer_module': {
+                'balance_summary': 'Total Debit: {debit} | Total Kredit: {credit} | Saldo Bersih: {net}'
             }
         }
     }
     
     # Create translation files
     for lang, trans in default_translations.items():
+        if languages is not None and lang not in languages:
+            continue
         lang_file = translations_dir / f"{lang}.json"
         if not lang_file.exists():
             with open(lang_file, 'w', encoding='utf-8') as f:
@@ -93,22 +258,63 @@ def create_default_translations():
 def get_text(key, language=None):
     """Get translated text for a key in the specified language"""
     if language is None:
-        language = current_language
-    
-    try:
-        # Split the key by dots to support nested translations
-        keys = key.split('.')
-        value = translations[language]
-        for k in keys:
-            value = value[k]
-        return value
-    except (KeyError, TypeError):
-        return key  # Return the key itself if translation not found
+        return _current_catalog.get(key, key)
+    return get_catalog(language).get(key, key)  # The key itself if not translated
+
+def get_texts(keys, language=None):
+    """Translate many keys at once, e.g. a table column"""
+    catalog = _current_catalog if language is None else get_catalog(language)
+    return list(map(catalog.get, keys, keys))
 
 def set_language(language):
-    """Change the current language"""
-    global current_language
+    """Change the current language and retranslate the texts on screen"""
+    global current_language, _current_catalog
     if language in LANGUAGES:
         current_language = language
+        _current_catalog = get_catalog(language)
+        retranslate()
         return True
-    return False
\ No newline at end of file
+    return False
+
+def bind_text(widget, key, setter='setText', *args):
+    """Show a translated text on a widget and keep it in the current language.
+
+    Calls widget.<setter>(*args, text) now and again on every language
+    change, e.g. bind_text(tabs, "menu.reports", 'setTabText', 2). A list of
+    keys passes the list of texts, as table headers take them. Binding the
+    same widget, setter and args again replaces the key. Returns the widget.
+    """
+    texts = get_texts(key) if isinstance(key, list) else get_text(key)
+    getattr(widget, setter)(*args, texts)
+    _bound_texts[(weakref.ref(widget), setter, args)] = key
+    return widget
+
+def on_language_changed(callback):
+    """Call back after every language change; bound methods are held weakly"""
+    if hasattr(callback, '__self__'):
+        _language_listeners.append(weakref.WeakMethod(callback))
+    else:
+        _language_listeners.append(lambda: callback)
+
+def retranslate():
+    """Set every bound text in the current language, dropping closed widgets"""
+    for binding, key in list(_bound_texts.items()):
+        widget_ref, setter, args = binding
+        widget = widget_ref()
+        try:
+            if widget is None:
+                raise RuntimeError
+            texts = get_texts(key) if isinstance(key, list) else _current_catalog.get(key, key)
+            getattr(widget, setter)(*args, texts)
+        except RuntimeError:  # Collected, or its Qt object already deleted
+            del _bound_texts[binding]
+
+    for listener in list(_language_listeners):
+        callback = listener()
+        if callback is None:
+            _language_listeners.remove(listener)
+            continue
+        try:
+            callback()
+        except RuntimeError:
+            _language_listeners.remove(listener)
\ No newline at end of file
@@ -16,6 +16,7 @@ class Customer(Base):
     name = Column(String, index=True)
     tax_number = Column(String, unique=True, index=True)
     phone = Column(String)
+    email = Column(String)
     address = Column(String)
     type = Column(Enum(CustomerType))
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,9 +1,20 @@
 from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Index, event, text
 from sqlalchemy.orm import relationship
-from core.database import Base
+from sqlalchemy.orm.attributes import get_history
+from core.database import Base, on_column_added, before_index_created
 from datetime import datetime
 import enum
 
+# Changing any of these can change how the week's worked time splits
+SPLIT_FIELDS = ('employee_id', 'date', 'time_in', 'time_out')
+
+def count_worked_minutes(time_in, time_out):
+    """Worked minutes of a punch-in/punch-out pair"""
+    if time_in and time_out and time_out > time_in:
+        return int(round((time_out - time_in).total_seconds() / 60))
+    return 0
+
 class EmployeeStatus(enum.Enum):
     ACTIVE = "Active"
     ON_LEAVE = "On Leave"
@@ -35,6 +46,10 @@ class Employee(Base):
 
 class AttendanceRecord(Base):
     __tablename__ = 'attendance_records'
+    __table_args__ = (
+        # One attendance record per employee and day
+        Index('ix_attendance_employee_date', 'employee_id', 'date', unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     employee_id = Column(Integer, ForeignKey('employees.id'), nullable=False)
@@ -42,6 +57,17 @@ class AttendanceRecord(Base):
     time_in = Column(DateTime)
     time_out = Column(DateTime)
     overtime_hours = Column(Float, default=0.0)
+    # Worked time derived from time_in/time_out, kept in sync on insert/update
+    # so hours reports can aggregate with SUM instead of loading every row
+    worked_minutes = Column(Integer, default=0, nullable=False)
+    # Split of the worked time by the overtime rules, as payroll splits it.
+    # A change to a row clears split_version; EmployeeService then splits
+    # the row's whole week again before reporting on it, as does a change
+    # of the rules file.
+    regular_minutes = Column(Integer, default=0, nullable=False)
+    overtime_minutes = Column(Integer, default=0, nullable=False)
+    premium_minutes = Column(Integer, default=0, nullable=False)  # Weekends and public holidays
+    split_version = Column(Float)  # Rules version the split was made with, NULL when stale
     notes = Column(String(500))
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
@@ -62,4 +88,34 @@ class AttendanceRecord(Base):
 
     @property
     def overtime_hours_calculated(self):
-        return max(self.total_hours - 8.0, 0.0) if self.total_hours > 0 else 0.0
\ No newline at end of file
+        return max(self.total_hours - 8.0, 0.0) if self.total_hours > 0 else 0.0
+
+    def compute_minutes(self):
+        """Refresh worked_minutes from time_in and time_out"""
+        self.worked_minutes = count_worked_minutes(self.time_in, self.time_out)
+
+@event.listens_for(AttendanceRecord, 'before_insert')
+def _sync_new_attendance_minutes(mapper, connection, target):
+    target.compute_minutes()
+    target.split_version = None
+
+@event.listens_for(AttendanceRecord, 'before_update')
+def _sync_attendance_minutes(mapper, connection, target):
+    if any(get_history(target, field).has_changes() for field in SPLIT_FIELDS):
+        target.compute_minutes()
+        target.split_version = None
+
+@on_column_added('attendance_records', 'worked_minutes')
+def _backfill_attendance_minutes(connection):
+    # split_version is added NULL, so the rules split these rows on first report
+    worked = ("COALESCE(MAX(CAST(ROUND((julianday(time_out) - julianday(time_in)) * 1440) "
+              "AS INTEGER), 0), 0)")
+    connection.execute(text(f"UPDATE attendance_records SET worked_minutes = {worked}"))
+
+@before_index_created('ix_attendance_employee_date')
+def _dedupe_attendance_records(connection):
+    # Keep the most recently entered record for each employee and day
+    connection.execute(text(
+        "DELETE FROM attendance_records WHERE id NOT IN "
+        "(SELECT MAX(id) FROM attendance_records GROUP BY employee_id, date)"
+    ))
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, Index
+from core.database import Base
+from datetime import datetime
+
+class JobRun(Base):
+    """One execution of a scheduled background job"""
+    __tablename__ = 'job_runs'
+    __table_args__ = (
+        Index('ix_job_runs_name_as_of', 'name', 'as_of'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    as_of = Column(Date, nullable=False)  # Business date the job ran for
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=False)
+    duration_seconds = Column(Float, nullable=False)
+    rows_affected = Column(Integer, default=0)
+    details = Column(Text)  # JSON string of job specific counts
+    created_at = Column(DateTime, default=datetime.now)
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Enum, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from core.database import Base
+from datetime import datetime
+import enum
+
+class OutboxStatus(enum.Enum):
+    PENDING = "Pending"    # Waiting for its first or next delivery attempt
+    SENDING = "Sending"    # Handed to a delivery worker
+    SENT = "Sent"
+    FAILED = "Failed"      # Gave up after the maximum number of attempts
+
+class OutboxMessage(Base):
+    """A rendered message waiting to be delivered to a customer over one channel.
+
+    Each message batches all of a customer's notifications that were queued
+    together. dedupe_key is a hash of channel, recipient and content, so the
+    same message is never queued twice.
+    """
+    __tablename__ = 'outbox_messages'
+    __table_args__ = (
+        Index('ix_outbox_messages_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(Integer, ForeignKey('customers.id'), index=True)
+    channel = Column(String(20), nullable=False)  # email, sms, file
+    recipient = Column(String(200), nullable=False)
+    subject = Column(String(200))
+    body = Column(Text, nullable=False)
+    notification_count = Column(Integer, default=0)
+    dedupe_key = Column(String(64), unique=True, nullable=False)
+
+    status = Column(Enum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.now)
+    last_error = Column(Text)
+    sent_at = Column(DateTime)
+
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    # Relationships
+    customer = relationship("Customer")
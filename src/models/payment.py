@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Index, select, update, func, case, bindparam
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
-from core.database import Base
+from core.database import Base, on_column_added
 from datetime import datetime
 import enum
 
@@ -24,42 +26,66 @@ class PaymentPlan(Base):
     customer_id = Column(Integer, ForeignKey('customers.id'), nullable=False)
     title = Column(String(200), nullable=False)
     description = Column(Text)
+    project = Column(String(200), index=True)  # Construction project the sale belongs to
     
     # Financial details
     total_amount = Column(Float, nullable=False)
     down_payment = Column(Float, default=0.0)
     interest_rate = Column(Float, default=0.0)  # Annual interest rate
+    penalty_rate = Column(Float, default=0.0)  # Annual default interest on overdue installments
     number_of_installments = Column(Integer, nullable=False)
     
     start_date = Column(Date, nullable=False)
     payment_day = Column(Integer, nullable=False)  # Day of month for payments
     
+    # Installment counters, kept up to date by PaymentService so plan lists
+    # and summaries don't have to load the installments
+    paid_amount = Column(Float, default=0.0)
+    paid_count = Column(Integer, default=0)
+    pending_amount = Column(Float, default=0.0)
+    pending_count = Column(Integer, default=0)
+    late_amount = Column(Float, default=0.0)
+    late_count = Column(Integer, default=0)
+    next_due_date = Column(Date)
+    penalty_amount = Column(Float, default=0.0)  # Penalty interest accrued so far
+    
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     
     # Relationships
-    customer = relationship("Customer", back_populates="payment_plans")
+    customer = relationship("Customer", backref="payment_plans")
     installments = relationship("Installment", back_populates="payment_plan")
     
-    @property
+    @hybrid_property
     def remaining_balance(self):
         """Calculate remaining balance"""
-        paid_amount = sum(inst.amount for inst in self.installments if inst.status == PaymentStatus.PAID)
-        return self.total_amount - self.down_payment - paid_amount
+        return self.total_amount - (self.down_payment or 0.0) - (self.paid_amount or 0.0)
     
-    @property
+    @remaining_balance.expression
+    def remaining_balance(cls):
+        return cls.total_amount - func.coalesce(cls.down_payment, 0.0) - func.coalesce(cls.paid_amount, 0.0)
+    
+    @hybrid_property
     def is_completed(self):
         """Check if all installments are paid"""
-        return all(inst.status == PaymentStatus.PAID for inst in self.installments)
+        return self.paid_count == self.number_of_installments
 
 class Installment(Base):
     __tablename__ = 'installments'
+    __table_args__ = (
+        # Open installments by due date, for late sweeps and upcoming lists
+        Index('ix_installments_status_due_date', 'status', 'due_date'),
+        # Covers the portfolio summary scan by due date
+        Index('ix_installments_due_date_summary', 'due_date', 'status', 'amount', 'payment_plan_id'),
+    )
 
     id = Column(Integer, primary_key=True)
-    payment_plan_id = Column(Integer, ForeignKey('payment_plans.id'), nullable=False)
+    payment_plan_id = Column(Integer, ForeignKey('payment_plans.id'), nullable=False, index=True)
     installment_no = Column(Integer, nullable=False)  # 1, 2, 3, etc.
     due_date = Column(Date, nullable=False)
     amount = Column(Float, nullable=False)
+    principal_amount = Column(Float)  # Part of amount repaying the financed balance
+    interest_amount = Column(Float)
     status = Column(SQLEnum(PaymentStatus), default=PaymentStatus.PENDING)
     
     # Payment details (when paid)
@@ -77,8 +103,9 @@ class Installment(Base):
     @property
     def is_late(self):
         """Check if payment is late"""
-        return (self.status == PaymentStatus.PENDING and 
-                self.due_date < datetime.now().date())
+        return (self.status == PaymentStatus.LATE or
+                (self.status == PaymentStatus.PENDING and
+                 self.due_date < datetime.now().date()))
     
     @property
     def days_late(self):
@@ -89,13 +116,129 @@ class Installment(Base):
 
 class PaymentNotification(Base):
     __tablename__ = 'payment_notifications'
+    __table_args__ = (
+        Index('ix_payment_notifications_installment_type', 'installment_id', 'type'),
+    )
 
     id = Column(Integer, primary_key=True)
     installment_id = Column(Integer, ForeignKey('installments.id'), nullable=False)
     type = Column(String(50), nullable=False)  # 'upcoming', 'late', etc.
     message = Column(Text, nullable=False)
     sent_date = Column(DateTime, default=datetime.now)
-    is_read = Column(bool, default=False)
+    is_read = Column(Boolean, default=False)
+    queued_at = Column(DateTime, index=True)  # When the outbox picked it up for delivery
     
     # Relationships
-    installment = relationship("Installment")
\ No newline at end of file
+    installment = relationship("Installment")
+
+class PenaltyAccrual(Base):
+    """Default interest accrued on one overdue installment over one period"""
+    __tablename__ = 'penalty_accruals'
+    __table_args__ = (
+        Index('ix_penalty_accruals_period_installment', 'period_start', 'installment_id', unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    payment_plan_id = Column(Integer, ForeignKey('payment_plans.id'), nullable=False, index=True)
+    installment_id = Column(Integer, ForeignKey('installments.id'), nullable=False)
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)  # Accrued through this date
+    days_late = Column(Integer, nullable=False)  # Overdue days within the period
+    rate = Column(Float, nullable=False)  # Annual penalty rate applied
+    base_amount = Column(Float, nullable=False)
+    amount = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
+
+class PenaltyPeriod(Base):
+    """How far a penalty period has been accrued, also for periods with no accruals"""
+    __tablename__ = 'penalty_periods'
+
+    id = Column(Integer, primary_key=True)
+    period_start = Column(Date, nullable=False, unique=True)
+    accrued_through = Column(Date, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+def plan_counters_update(plan_ids=None):
+    """UPDATE statement recomputing plan counters from their installments.
+
+    Aggregates the installments once, grouped by plan, and applies the
+    totals with UPDATE ... FROM. Plans without installments get zeros.
+    """
+    plans = PaymentPlan.__table__
+    installments = Installment.__table__
+    open_statuses = [PaymentStatus.PENDING, PaymentStatus.LATE]
+
+    def total(statuses, column=None):
+        value = column if column is not None else 1
+        return func.coalesce(func.sum(case((installments.c.status.in_(statuses), value), else_=0)), 0)
+
+    totals = select(
+        plans.c.id.label('plan_id'),
+        total([PaymentStatus.PAID], installments.c.amount).label('paid_amount'),
+        total([PaymentStatus.PAID]).label('paid_count'),
+        total([PaymentStatus.PENDING], installments.c.amount).label('pending_amount'),
+        total([PaymentStatus.PENDING]).label('pending_count'),
+        total([PaymentStatus.LATE], installments.c.amount).label('late_amount'),
+        total([PaymentStatus.LATE]).label('late_count'),
+        func.min(case((installments.c.status.in_(open_statuses), installments.c.due_date)))
+            .label('next_due_date')
+    ).select_from(plans.outerjoin(installments, installments.c.payment_plan_id == plans.c.id))
+    if plan_ids is not None:
+        totals = totals.where(plans.c.id.in_(plan_ids))
+    totals = totals.group_by(plans.c.id).subquery()
+
+    return update(plans).where(plans.c.id == totals.c.plan_id).values(
+        paid_amount=func.round(totals.c.paid_amount, 2),
+        paid_count=totals.c.paid_count,
+        pending_amount=func.round(totals.c.pending_amount, 2),
+        pending_count=totals.c.pending_count,
+        late_amount=func.round(totals.c.late_amount, 2),
+        late_count=totals.c.late_count,
+        next_due_date=totals.c.next_due_date
+    )
+
+@on_column_added('payment_plans', 'paid_amount')
+def _backfill_plan_counters(connection):
+    connection.execute(plan_counters_update())
+
+@on_column_added('installments', 'principal_amount')
+def _backfill_installment_split(connection):
+    """Split the installments of existing plans into principal and interest.
+
+    Older schedules stored only the amount. Each plan's installments are
+    amortized in order over its financed balance (total less down
+    payment) at its rate, and the last one repays whatever principal is
+    left, as build_schedules does for new plans.
+    """
+    plans = PaymentPlan.__table__
+    installments = Installment.__table__
+    rows = connection.execute(
+        select(installments.c.id, installments.c.payment_plan_id, installments.c.amount,
+               plans.c.total_amount - func.coalesce(plans.c.down_payment, 0.0),
+               func.coalesce(plans.c.interest_rate, 0.0))
+        .select_from(installments.join(plans, installments.c.payment_plan_id == plans.c.id))
+        .order_by(installments.c.payment_plan_id, installments.c.installment_no)
+    ).all()
+
+    values = []
+    plan_id = None
+    for index, (installment_id, row_plan_id, amount, principal, annual_rate) in enumerate(rows):
+        if row_plan_id != plan_id:
+            plan_id, balance, rate = row_plan_id, principal, annual_rate / 12 / 100
+        last = index + 1 == len(rows) or rows[index + 1][1] != plan_id
+        if last:
+            principal_part = round(balance, 2)
+            interest = round(amount - principal_part, 2)
+        else:
+            interest = round(balance * rate, 2)
+            principal_part = round(amount - interest, 2)
+        balance -= principal_part
+        values.append({'row_id': installment_id, 'principal': principal_part, 'interest': interest})
+
+    if values:
+        connection.execute(
+            update(installments)
+            .where(installments.c.id == bindparam('row_id'))
+            .values(principal_amount=bindparam('principal'), interest_amount=bindparam('interest')),
+            values
+        )
@@ -0,0 +1,57 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from core.database import Base
+from datetime import datetime
+
+class PayrollRun(Base):
+    __tablename__ = 'payroll_runs'
+    __table_args__ = (
+        UniqueConstraint('period_start', 'period_end', name='uq_payroll_run_period'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+    closed_at = Column(DateTime)  # Closed runs are never recalculated
+    rules_version = Column(Float)  # Overtime rules file the lines were calculated with
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    # Relationships
+    lines = relationship("PayrollLine", back_populates="payroll_run")
+
+    @property
+    def is_closed(self):
+        return self.closed_at is not None
+
+class PayrollLine(Base):
+    __tablename__ = 'payroll_lines'
+    __table_args__ = (
+        UniqueConstraint('payroll_run_id', 'employee_id', name='uq_payroll_line_employee'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    payroll_run_id = Column(Integer, ForeignKey('payroll_runs.id'), nullable=False)
+    employee_id = Column(Integer, ForeignKey('employees.id'), nullable=False)
+
+    # Snapshot of the figures the line was calculated with
+    hourly_rate = Column(Float, default=0.0)
+    regular_hours = Column(Float, default=0.0)
+    overtime_hours = Column(Float, default=0.0)
+    premium_hours = Column(Float, default=0.0)  # Weekend and public holiday hours
+    night_hours = Column(Float, default=0.0)
+    regular_amount = Column(Float, default=0.0)
+    overtime_amount = Column(Float, default=0.0)
+    premium_amount = Column(Float, default=0.0)  # Weekend, holiday and night premiums
+    total_amount = Column(Float, default=0.0)
+
+    # Set when attendance, the hourly rate, the position or the overtime
+    # rules changed since the last calculation
+    is_dirty = Column(Boolean, default=True, nullable=False, index=True)
+    calculated_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    # Relationships
+    payroll_run = relationship("PayrollRun", back_populates="lines")
+    employee = relationship("Employee")
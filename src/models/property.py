@@ -1,8 +1,13 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Enum as SQLEnum, Text, Index
+from sqlalchemy import insert, select, update, case, text, func
 from sqlalchemy.orm import relationship
-from core.database import Base
+from core.database import Base, on_column_added, on_table_created
+import models.customer  # Defines the customers table tenant_id refers to
 from datetime import datetime
+from typing import Any, Dict, Optional
 import enum
+import json
+import re
 
 class PropertyType(enum.Enum):
     LAND = "Land"
@@ -26,38 +31,119 @@ class OwnershipType(enum.Enum):
 
 class Property(Base):
     __tablename__ = 'properties'
+    __table_args__ = (
+        # Search results sorted or filtered by price, see property_price()
+        Index('ix_properties_price', text('coalesce(current_value, purchase_price)')),
+    )
 
     id = Column(Integer, primary_key=True)
     property_no = Column(String(50), unique=True, nullable=False)
     title = Column(String(200), nullable=False)
-    type = Column(SQLEnum(PropertyType), nullable=False)
-    status = Column(SQLEnum(PropertyStatus), default=PropertyStatus.AVAILABLE)
+    type = Column(SQLEnum(PropertyType), nullable=False, index=True)
+    status = Column(SQLEnum(PropertyStatus), default=PropertyStatus.AVAILABLE, index=True)
     
     # Location details
     address = Column(Text, nullable=False)
-    city = Column(String(100), nullable=False)
-    district = Column(String(100))
+    city = Column(String(100), nullable=False, index=True)
+    district = Column(String(100), index=True)
     postal_code = Column(String(20))
     
     # Property details
-    area = Column(Float)  # in square meters
+    area = Column(Float, index=True)  # in square meters
     construction_year = Column(Integer)
-    features = Column(Text)  # JSON string of property features
+    features = Column(Text)  # JSON string of property features, indexed in property_features
     
     # Financial details
     purchase_price = Column(Float)
     current_value = Column(Float)
     monthly_rent = Column(Float)
+    tenant_id = Column(Integer, ForeignKey('customers.id'), index=True)  # Billed the rent while RENTED
     
     created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)  # Keys search caches
     
     # Relationships
     deeds = relationship("Deed", back_populates="property")
     documents = relationship("PropertyDocument", back_populates="property")
+    feature_rows = relationship("PropertyFeature", cascade="all, delete-orphan")
+    tenant = relationship("Customer")
+
+def property_price():
+    """Current value, or the purchase price when the property was never valued"""
+    return func.coalesce(Property.current_value, Property.purchase_price)
+
+LEGACY_FEATURE_KEY = re.compile(r'^feature_\d+$')
+
+def normalize_feature_name(name: Any) -> str:
+    """Lower case with single spaces, so 'Parking ' and 'parking' are one feature"""
+    return ' '.join(str(name).split()).lower()[:100]
+
+def normalize_features(features: Any) -> Dict[str, Optional[str]]:
+    """Feature name -> value (None for plain yes/no features) from any stored form.
+
+    Accepts a dict, a list of names, or text holding either as JSON or as a
+    comma-separated list. The {"feature_1": "parking"} dicts the property
+    form used to save become plain features, and false values are dropped.
+    """
+    if not features:
+        return {}
+    if isinstance(features, str):
+        try:
+            features = json.loads(features)
+        except json.JSONDecodeError:
+            features = features.split(',')
+    if isinstance(features, (list, tuple, set)):
+        features = {name: True for name in features}
+    elif not isinstance(features, dict):
+        features = {features: True}
+
+    normalized = {}
+    for key, value in features.items():
+        if LEGACY_FEATURE_KEY.match(str(key)) and isinstance(value, str):
+            key, value = value, True
+        if value is False:
+            continue
+        name = normalize_feature_name(key)
+        if name:
+            normalized[name] = None if value is True or value is None else str(value)
+    return normalized
+
+class PropertyFeature(Base):
+    """One feature of a property, so properties can be filtered on features in SQL"""
+    __tablename__ = 'property_features'
+    __table_args__ = (
+        # Properties having a feature; also serves feature counts
+        Index('ix_property_features_name_property', 'name', 'property_id', unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    property_id = Column(Integer, ForeignKey('properties.id'), nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    value = Column(String(200))  # None for plain yes/no features
+
+@on_table_created('property_features')
+def _backfill_property_features(connection):
+    rows = connection.execute(text(
+        "SELECT id, features FROM properties WHERE features IS NOT NULL AND features != ''"
+    )).all()
+    features = [
+        {'property_id': property_id, 'name': name, 'value': value}
+        for property_id, stored in rows
+        for name, value in normalize_features(stored).items()
+    ]
+    if features:
+        connection.execute(insert(PropertyFeature.__table__), features)
 
 class Deed(Base):
     __tablename__ = 'deeds'
+    __table_args__ = (
+        # Active deeds of a property, for ownership type filters and counts
+        Index('ix_deeds_property_active', 'property_id', 'is_active', 'ownership_type'),
+        # Owners of a property, or properties of an owner, on a date
+        Index('ix_deeds_property_interval', 'property_id', 'valid_from', 'valid_to'),
+        Index('ix_deeds_owner_id_interval', 'owner_id_number', 'valid_from', 'valid_to'),
+        Index('ix_deeds_owner_name_interval', 'owner_name', 'valid_from', 'valid_to'),
+    )
 
     id = Column(Integer, primary_key=True)
     property_id = Column(Integer, ForeignKey('properties.id'), nullable=False)
@@ -73,13 +159,58 @@ class Deed(Base):
     purchase_price = Column(Float)
     notes = Column(Text)
     
-    is_active = Column(bool, default=True)  # To track current vs historical deeds
+    # Ownership interval: from the registration date up to (not including)
+    # the date the next registration took over; valid_to is None while current
+    valid_from = Column(Date)
+    valid_to = Column(Date)
+    
+    is_active = Column(Boolean, default=True)  # To track current vs historical deeds, same as valid_to is None
     created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)
     
     # Relationships
     property = relationship("Property", back_populates="deeds")
 
+def ownership_interval_update(property_ids=None):
+    """UPDATE rebuilding the ownership intervals of deeds from their registration dates.
+
+    A deed is valid from its registration date until the property's next
+    registration date; deeds registered on the same date are co-owners.
+    A deed with no later registration stays open unless it was
+    deactivated, in which case it keeps its end date or ends on the day
+    it was last updated. Restricted to some properties if ids are given.
+    """
+    deeds = Deed.__table__
+    registrations = select(deeds.c.property_id, deeds.c.registration_date).distinct()
+    if property_ids is not None:
+        registrations = registrations.where(deeds.c.property_id.in_(property_ids))
+    registrations = registrations.subquery()
+    following = select(
+        registrations.c.property_id,
+        registrations.c.registration_date,
+        func.lead(registrations.c.registration_date).over(
+            partition_by=registrations.c.property_id,
+            order_by=registrations.c.registration_date
+        ).label('next_date')
+    ).subquery()
+
+    valid_to = func.coalesce(
+        following.c.next_date,
+        case((deeds.c.is_active == False, func.coalesce(deeds.c.valid_to, func.date(deeds.c.updated_at))))
+    )
+    return update(deeds).where(
+        deeds.c.property_id == following.c.property_id,
+        deeds.c.registration_date == following.c.registration_date
+    ).values(
+        valid_from=deeds.c.registration_date,
+        valid_to=valid_to,
+        is_active=valid_to.is_(None)
+    )
+
+@on_column_added('deeds', 'valid_from')
+def _backfill_ownership_intervals(connection):
+    connection.execute(ownership_interval_update())
+
 class DocumentType(enum.Enum):
     DEED = "Deed"
     BLUEPRINT = "Blueprint"
@@ -91,12 +222,19 @@ class DocumentType(enum.Enum):
 
 class PropertyDocument(Base):
     __tablename__ = 'property_documents'
+    __table_args__ = (
+        # Documents expiring in a date range, across all properties
+        Index('ix_property_documents_expiry_date_type', 'expiry_date', 'type'),
+    )
 
     id = Column(Integer, primary_key=True)
     property_id = Column(Integer, ForeignKey('properties.id'), nullable=False)
     type = Column(SQLEnum(DocumentType), nullable=False)
     title = Column(String(200), nullable=False)
     file_path = Column(String(500), nullable=False)  # Path to stored document
+    content_hash = Column(String(64), index=True)  # SHA-256 of the content, key of its DocumentBlob
+    file_size = Column(Integer)
+    original_name = Column(String(255))  # File name as uploaded
     description = Column(Text)
     issue_date = Column(Date)
     expiry_date = Column(Date)
@@ -105,4 +243,36 @@ class PropertyDocument(Base):
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     
     # Relationships
-    property = relationship("Property", back_populates="documents")
\ No newline at end of file
+    property = relationship("Property", back_populates="documents")
+
+class DocumentExpiryAlert(Base):
+    """Raised once per document and expiry date for each alert level it reaches"""
+    __tablename__ = 'document_expiry_alerts'
+    __table_args__ = (
+        Index('ix_document_expiry_alerts_document_level', 'document_id', 'expiry_date', 'level', unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    document_id = Column(Integer, ForeignKey('property_documents.id'), nullable=False)
+    property_id = Column(Integer, ForeignKey('properties.id'), nullable=False, index=True)
+    type = Column(SQLEnum(DocumentType), nullable=False)
+    expiry_date = Column(Date, nullable=False)
+    level = Column(Integer, nullable=False)  # Days-before-expiry threshold reached, 0 once expired
+    days_left = Column(Integer, nullable=False)  # When the alert was raised
+    message = Column(Text, nullable=False)
+    is_read = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.now)
+
+    # Relationships
+    document = relationship("PropertyDocument")
+
+class DocumentBlob(Base):
+    """One unique document content in the store, shared by every document with that content"""
+    __tablename__ = 'document_blobs'
+
+    id = Column(Integer, primary_key=True)
+    sha256 = Column(String(64), unique=True, nullable=False)
+    size = Column(Integer, nullable=False)
+    path = Column(String(500), nullable=False)
+    ref_count = Column(Integer, default=0)  # PropertyDocuments using this content
+    created_at = Column(DateTime, default=datetime.now)
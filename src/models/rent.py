@@ -0,0 +1,53 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from core.database import Base
+from datetime import datetime
+
+class RentCharge(Base):
+    """A property's rent for one billing month, posted to its tenant as a debit transaction.
+
+    The unique (billing_month, property_id) index is what makes billing a
+    month more than once safe.
+    """
+    __tablename__ = 'rent_charges'
+    __table_args__ = (
+        Index('ix_rent_charges_month_property', 'billing_month', 'property_id', unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    property_id = Column(Integer, ForeignKey('properties.id'), nullable=False, index=True)
+    customer_id = Column(Integer, ForeignKey('customers.id'), nullable=False, index=True)
+    billing_month = Column(Date, nullable=False)  # First day of the month
+    amount = Column(Float, nullable=False)
+    transaction_id = Column(Integer, ForeignKey('transactions.id'), index=True)
+    created_at = Column(DateTime, default=datetime.now)
+
+    # Relationships
+    property = relationship("Property")
+    transaction = relationship("Transaction")
+
+class RentEscalation(Base):
+    """A scheduled change of a property's monthly rent.
+
+    Raises the rent by rate percent, or sets it to new_rent, for billing
+    months starting on or after effective_date. With repeat_months set, the
+    next escalation is scheduled that many months later when this one is
+    applied (e.g. 12 for a yearly increase).
+    """
+    __tablename__ = 'rent_escalations'
+    __table_args__ = (
+        Index('ix_rent_escalations_pending', 'applied_at', 'effective_date'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    property_id = Column(Integer, ForeignKey('properties.id'), nullable=False, index=True)
+    effective_date = Column(Date, nullable=False)
+    rate = Column(Float)  # Percent
+    new_rent = Column(Float)
+    repeat_months = Column(Integer)
+    previous_rent = Column(Float)  # Rent before it was applied
+    applied_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.now)
+
+    # Relationships
+    property = relationship("Property")
@@ -0,0 +1,135 @@
+import csv
+import time
+from datetime import datetime, date
+from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from sqlalchemy.dialects.sqlite import insert
+from models.employee import Employee, AttendanceRecord, count_worked_minutes
+from services.payroll_service import PayrollService
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+
+class AttendanceImportService:
+    """Turns time-clock punch logs into one attendance record per employee and day"""
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def import_file(self,
+                    file_path: str,
+                    delimiter: str = ',',
+                    timestamp_format: Optional[str] = None) -> Dict[str, Any]:
+        """Import a terminal export with `employee_no, timestamp` lines"""
+        punches = []
+        skipped_lines = 0
+        with open(file_path, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f, delimiter=delimiter):
+                punch = self._parse_punch(row, timestamp_format)
+                if punch:
+                    punches.append(punch)
+                elif any(cell.strip() for cell in row):
+                    skipped_lines += 1  # Header or malformed line
+
+        result = self.import_punches(punches)
+        result['skipped_lines'] = skipped_lines
+        return result
+
+    def import_punches(self, punches: Iterable[Tuple[str, datetime]]) -> Dict[str, Any]:
+        """Pair raw punches into daily in/out times and upsert them.
+
+        The first punch of the day becomes time_in and the last one time_out.
+        Days already stored with the same times are left untouched, so
+        importing the same log twice writes nothing the second time.
+        """
+        started = time.perf_counter()
+
+        # Resolve employee numbers once instead of querying per punch
+        employee_ids = dict(self.db.query(Employee.employee_no, Employee.id).all())
+
+        days = {}
+        unknown_employees = set()
+        punch_count = 0
+        for employee_no, timestamp in punches:
+            punch_count += 1
+            employee_id = employee_ids.get(employee_no)
+            if employee_id is None:
+                unknown_employees.add(employee_no)
+                continue
+            key = (employee_id, timestamp.date())
+            span = days.get(key)
+            if span is None:
+                days[key] = [timestamp, timestamp]
+            elif timestamp < span[0]:
+                span[0] = timestamp
+            elif timestamp > span[1]:
+                span[1] = timestamp
+
+        rows = [
+            self._attendance_row(employee_id, day, first, last)
+            for (employee_id, day), (first, last) in days.items()
+        ]
+        changed = []
+        for i in range(0, len(rows), self.BATCH_SIZE):
+            changed.extend(self._upsert(rows[i:i + self.BATCH_SIZE]))
+        PayrollService(self.db).mark_attendance_dirty(changed)
+        self.db.commit()
+
+        elapsed = time.perf_counter() - started
+        return {
+            'punches': punch_count,
+            'days': len(rows),
+            'rows_written': len(changed),
+            'unknown_employees': sorted(unknown_employees),
+            'elapsed_seconds': elapsed,
+            'punches_per_second': punch_count / elapsed if elapsed > 0 else 0.0
+        }
+
+    def _parse_punch(self,
+                     row: List[str],
+                     timestamp_format: Optional[str]) -> Optional[Tuple[str, datetime]]:
+        if len(row) < 2:
+            return None
+        employee_no, raw_timestamp = row[0].strip(), row[1].strip()
+        try:
+            if timestamp_format:
+                timestamp = datetime.strptime(raw_timestamp, timestamp_format)
+            else:
+                timestamp = datetime.fromisoformat(raw_timestamp)
+        except ValueError:
+            return None
+        return employee_no, timestamp
+
+    def _attendance_row(self,
+                        employee_id: int,
+                        day: date,
+                        first: datetime,
+                        last: datetime) -> Dict[str, Any]:
+        time_out = last if last > first else None  # A single punch has no time out yet
+        return {
+            'employee_id': employee_id,
+            'date': day,
+            'time_in': first,
+            'time_out': time_out,
+            'worked_minutes': count_worked_minutes(first, time_out),
+            'split_version': None,  # Split by the overtime rules before reporting
+            'updated_at': datetime.now()
+        }
+
+    def _upsert(self, rows: List[Dict[str, Any]]) -> List[Tuple[int, date]]:
+        """Insert or update a batch on (employee_id, date), returning the days changed"""
+        table = AttendanceRecord.__table__
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.employee_id, table.c.date],
+            set_={
+                name: stmt.excluded[name]
+                for name in ('time_in', 'time_out', 'worked_minutes', 'split_version',
+                             'updated_at')
+            },
+            where=or_(
+                table.c.time_in.is_distinct_from(stmt.excluded.time_in),
+                table.c.time_out.is_distinct_from(stmt.excluded.time_out)
+            )
+        ).returning(table.c.employee_id, table.c.date)
+        return [tuple(row) for row in self.db.execute(stmt, rows)]
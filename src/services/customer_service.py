@@ -2,6 +2,8 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List, Optional
 from models.customer import Customer, Transaction, CustomerBalance, CustomerType, TransactionType
+from models.property import Property
+from models.rent import RentCharge
 
 class CustomerService:
     def __init__(self, db: Session):
@@ -12,12 +14,14 @@ class CustomerService:
                        tax_number: str, 
                        phone: str, 
                        address: str, 
-                       type: CustomerType) -> Customer:
+                       type: CustomerType,
+                       email: Optional[str] = None) -> Customer:
         """Create a new customer record"""
         customer = Customer(
             name=name,
             tax_number=tax_number,
             phone=phone,
+            email=email,
             address=address,
             type=type
         )
@@ -37,7 +41,8 @@ class CustomerService:
                        tax_number: Optional[str] = None,
                        phone: Optional[str] = None,
                        address: Optional[str] = None,
-                       type: Optional[CustomerType] = None) -> Optional[Customer]:
+                       type: Optional[CustomerType] = None,
+                       email: Optional[str] = None) -> Optional[Customer]:
         """Update an existing customer record"""
         customer = self.db.query(Customer).filter(Customer.id == customer_id).first()
         if customer:
@@ -47,6 +52,8 @@ class CustomerService:
                 customer.tax_number = tax_number
             if phone:
                 customer.phone = phone
+            if email:
+                customer.email = email
             if address:
                 customer.address = address
             if type:
@@ -61,9 +68,12 @@ class CustomerService:
         """Delete a customer record"""
         customer = self.db.query(Customer).filter(Customer.id == customer_id).first()
         if customer:
-            # Delete related records
+            # Delete related records; properties they rent are no longer billed to them
             self.db.query(CustomerBalance).filter(CustomerBalance.customer_id == customer_id).delete()
+            self.db.query(RentCharge).filter(RentCharge.customer_id == customer_id).delete()
             self.db.query(Transaction).filter(Transaction.customer_id == customer_id).delete()
+            self.db.query(Property).filter(Property.tenant_id == customer_id)\
+                   .update({Property.tenant_id: None}, synchronize_session=False)
             
             self.db.delete(customer)
             self.db.commit()
@@ -0,0 +1,140 @@
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, func, cast, case, literal, Integer
+from core.database import sql_format
+from core.localization import get_text
+from models.property import Property, PropertyDocument, DocumentType, DocumentExpiryAlert
+from typing import List, Optional, Dict, Any, Iterable
+
+# Days before expiry at which an alert is raised; 0 means expires today or has expired
+ALERT_LEVELS = (90, 30, 7, 0)
+# How long after expiry a document that was never alerted still gets its alert
+EXPIRED_LOOKBACK_DAYS = 30
+
+class DocumentExpiryService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_expiring_documents(self, days: int = 30, as_of: Optional[date] = None,
+                               types: Optional[Iterable[DocumentType]] = None,
+                               include_expired: bool = False) -> List[Dict[str, Any]]:
+        """Documents expiring within `days`, across all properties, grouped by property and type.
+
+        One range query on the (expiry_date, type) index. With
+        include_expired, documents that expired up to `days` ago are
+        included too (with a negative days_left).
+        """
+        as_of = as_of or date.today()
+        documents = PropertyDocument.__table__
+        properties = Property.__table__
+
+        start = as_of - timedelta(days=days) if include_expired else as_of
+        query = select(
+            documents.c.property_id,
+            properties.c.property_no,
+            properties.c.title.label('property_title'),
+            documents.c.type,
+            documents.c.id,
+            documents.c.title,
+            documents.c.issue_date,
+            documents.c.expiry_date
+        ).select_from(documents.join(properties, documents.c.property_id == properties.c.id))\
+         .where(documents.c.expiry_date.between(start, as_of + timedelta(days=days)))
+        if types is not None:
+            query = query.where(documents.c.type.in_(list(types)))
+        rows = self.db.execute(
+            query.order_by(documents.c.property_id, documents.c.type, documents.c.expiry_date)
+        ).all()
+
+        groups = []
+        for (property_id, doc_type), group in groupby(rows, key=lambda r: (r.property_id, r.type)):
+            group = list(group)
+            groups.append({
+                'property_id': property_id,
+                'property_no': group[0].property_no,
+                'property_title': group[0].property_title,
+                'type': doc_type,
+                'count': len(group),
+                'earliest_expiry': group[0].expiry_date,
+                'documents': [
+                    {
+                        'id': r.id,
+                        'title': r.title,
+                        'issue_date': r.issue_date,
+                        'expiry_date': r.expiry_date,
+                        'days_left': (r.expiry_date - as_of).days
+                    }
+                    for r in group
+                ]
+            })
+        return groups
+
+    def write_alerts(self, as_of: Optional[date] = None) -> Dict[str, int]:
+        """Daily job: raise an alert for every document that reached a new alert level.
+
+        A document gets one alert per level and expiry date, so renewing it
+        (moving its expiry date) starts its alerts over. When a document
+        first shows up already past several levels only the most urgent
+        one is written.
+        """
+        as_of = as_of or date.today()
+        now = datetime.now()
+        documents = PropertyDocument.__table__
+        properties = Property.__table__
+        alerts = DocumentExpiryAlert.__table__
+
+        days_left = cast(func.julianday(documents.c.expiry_date) - func.julianday(as_of), Integer)
+        levels = sorted(ALERT_LEVELS)
+        level = case(
+            *[(days_left <= threshold, threshold) for threshold in levels[:-1]],
+            else_=levels[-1]
+        )
+        already_alerted = select(alerts.c.id).where(
+            alerts.c.document_id == documents.c.id,
+            alerts.c.expiry_date == documents.c.expiry_date,
+            alerts.c.level <= level
+        ).exists()
+        message = sql_format(get_text("notifications.document_expiring"),
+                             title=documents.c.title,
+                             property_no=properties.c.property_no,
+                             expiry_date=documents.c.expiry_date)
+
+        alerts_created = self.db.execute(
+            insert(alerts).from_select(
+                ['document_id', 'property_id', 'type', 'expiry_date', 'level', 'days_left',
+                 'message', 'is_read', 'created_at'],
+                select(documents.c.id, documents.c.property_id, documents.c.type,
+                       documents.c.expiry_date, level, days_left, message,
+                       literal(False), literal(now))
+                .select_from(documents.join(properties, documents.c.property_id == properties.c.id))
+                .where(
+                    documents.c.expiry_date.between(as_of - timedelta(days=EXPIRED_LOOKBACK_DAYS),
+                                                    as_of + timedelta(days=levels[-1])),
+                    ~already_alerted
+                )
+            )
+        ).rowcount
+
+        self.db.commit()
+        return {
+            'rows_affected': alerts_created,
+            'alerts_created': alerts_created
+        }
+
+    def get_alerts(self, unread_only: bool = True) -> List[DocumentExpiryAlert]:
+        """Expiry alerts, soonest expiry first"""
+        query = self.db.query(DocumentExpiryAlert)
+        if unread_only:
+            query = query.filter(DocumentExpiryAlert.is_read == False)
+        return query.order_by(DocumentExpiryAlert.expiry_date, DocumentExpiryAlert.id).all()
+
+    def mark_alert_read(self, alert_id: int) -> Optional[DocumentExpiryAlert]:
+        alert = self.db.query(DocumentExpiryAlert)\
+                       .filter(DocumentExpiryAlert.id == alert_id)\
+                       .first()
+        if alert:
+            alert.is_read = True
+            self.db.commit()
+            self.db.refresh(alert)
+        return alert
@@ -0,0 +1,94 @@
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+import hashlib
+import os
+import shutil
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+STORE_ROOT = Path('documents')
+CHUNK_SIZE = 1024 * 1024
+
+# ioctl asking the filesystem for a copy-on-write clone (Btrfs, XFS)
+FICLONE = getattr(fcntl, 'FICLONE', 0x40049409)
+
+# Called with (bytes done, total bytes)
+ProgressCallback = Callable[[int, int], None]
+
+def hash_file(path: str, progress: Optional[ProgressCallback] = None,
+              chunk_size: int = CHUNK_SIZE) -> Tuple[str, int]:
+    """SHA-256 hex digest and size of a file, read in fixed-size chunks"""
+    total = os.path.getsize(path)
+    digest = hashlib.sha256()
+    done = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+    if progress and total == 0:
+        progress(0, 0)
+    return digest.hexdigest(), done
+
+def clone_file(source: str, target: str) -> None:
+    """Copy a file, as a reflink when the filesystem supports it"""
+    if fcntl is not None:
+        try:
+            with open(source, 'rb') as src, open(target, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return
+        except OSError:
+            pass  # Different filesystems or no reflink support
+    shutil.copyfile(source, target)
+
+class DocumentStore:
+    """Content-addressed file store: each distinct content is kept once as a blob.
+
+    Blobs live under <root>/blobs/<first two hash digits>/<hash><suffix>.
+    Documents get their own path under <root>/<property_id>/, hardlinked
+    to the blob where the filesystem allows so the folder stays browsable
+    without storing the content again.
+    """
+
+    def __init__(self, root: Path = STORE_ROOT):
+        self.root = Path(root)
+
+    def blob_path(self, sha256: str, suffix: str = '') -> Path:
+        return self.root / 'blobs' / sha256[:2] / f"{sha256}{suffix.lower()}"
+
+    def add_blob(self, source: str, sha256: str) -> Path:
+        """Copy a file into the store under its hash, unless that blob is already there"""
+        path = self.blob_path(sha256, Path(source).suffix)
+        if path.exists():
+            return path
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{uuid.uuid4().hex}.tmp")
+        try:
+            clone_file(source, str(temp_path))
+            os.replace(temp_path, path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        return path
+
+    def link(self, blob_path: Path, target: Path) -> Path:
+        """Give a document its own path to a blob; falls back to the blob path itself"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(blob_path, target)
+            return target
+        except OSError:
+            return blob_path
+
+    def remove(self, path: str) -> None:
+        if os.path.exists(path):
+            os.remove(path)
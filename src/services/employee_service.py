@@ -1,11 +1,18 @@
 from datetime import datetime, date, timedelta
 from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, update
 from models.employee import Employee, AttendanceRecord, EmployeeStatus
-from typing import List, Optional, Dict, Any
+from services.payroll_service import PayrollService
+from services.overtime_rules import get_overtime_rules, get_rules_version
+from typing import List, Optional, Dict, Any, Tuple
+
+# Employee fields payroll lines are calculated from
+PAYROLL_FIELDS = ('hourly_rate', 'position')
 
 class EmployeeService:
     def __init__(self, db: Session):
         self.db = db
+        self.payroll_service = PayrollService(db)
 
     def create_employee(self, data: Dict[str, Any]) -> Employee:
         employee = Employee(**data)
@@ -17,6 +24,13 @@ class EmployeeService:
     def update_employee(self, employee_id: int, data: Dict[str, Any]) -> Optional[Employee]:
         employee = self.db.query(Employee).filter(Employee.id == employee_id).first()
         if employee:
+            if any(field in data and data[field] != getattr(employee, field) for field in PAYROLL_FIELDS):
+                self.payroll_service.mark_employee_dirty(employee_id)
+            if 'position' in data and data['position'] != employee.position:
+                # Position rules may split the hours differently
+                self.db.query(AttendanceRecord)\
+                    .filter(AttendanceRecord.employee_id == employee_id)\
+                    .update({AttendanceRecord.split_version: None}, synchronize_session=False)
             for key, value in data.items():
                 setattr(employee, key, value)
             self.db.commit()
@@ -44,8 +58,18 @@ class EmployeeService:
         return query.all()
 
     def record_attendance(self, data: Dict[str, Any]) -> AttendanceRecord:
-        record = AttendanceRecord(**data)
-        self.db.add(record)
+        # Records are unique per employee and day, so re-entering a day updates it
+        record = self.db.query(AttendanceRecord).filter(
+            AttendanceRecord.employee_id == data['employee_id'],
+            AttendanceRecord.date == data['date']
+        ).first()
+        if record:
+            for key, value in data.items():
+                setattr(record, key, value)
+        else:
+            record = AttendanceRecord(**data)
+            self.db.add(record)
+        self.payroll_service.mark_attendance_dirty([(record.employee_id, record.date)])
         self.db.commit()
         self.db.refresh(record)
         return record
@@ -53,8 +77,21 @@ class EmployeeService:
     def update_attendance(self, record_id: int, data: Dict[str, Any]) -> Optional[AttendanceRecord]:
         record = self.db.query(AttendanceRecord).filter(AttendanceRecord.id == record_id).first()
         if record:
+            changes = [(record.employee_id, record.date)]
             for key, value in data.items():
                 setattr(record, key, value)
+            changes.append((record.employee_id, record.date))
+            if data.keys() & {'employee_id', 'date', 'time_in', 'time_out'}:
+                self.payroll_service.mark_attendance_dirty(changes)
+            if changes[0] != changes[1]:
+                # The week the record moved out of needs splitting again too
+                employee_id, day = changes[0]
+                week_start = day - timedelta(days=day.weekday())
+                self.db.query(AttendanceRecord).filter(
+                    AttendanceRecord.employee_id == employee_id,
+                    AttendanceRecord.date >= week_start,
+                    AttendanceRecord.date <= week_start + timedelta(days=6)
+                ).update({AttendanceRecord.split_version: None}, synchronize_session=False)
             self.db.commit()
             self.db.refresh(record)
         return record
@@ -75,26 +112,199 @@ class EmployeeService:
             
         return query.order_by(AttendanceRecord.date.desc()).all()
 
+    def list_employee_rows(self, status: Optional[EmployeeStatus] = None) -> List[Tuple]:
+        """Return the employee table columns as plain rows from a single query"""
+        query = self.db.query(
+            Employee.id,
+            Employee.employee_no,
+            Employee.first_name,
+            Employee.last_name,
+            Employee.phone,
+            Employee.email,
+            Employee.hire_date,
+            Employee.position,
+            Employee.hourly_rate,
+            Employee.status
+        )
+        if status:
+            query = query.filter(Employee.status == status)
+        return query.order_by(Employee.first_name, Employee.last_name).all()
+
+    def list_attendance_rows(self,
+                             employee_id: Optional[int] = None,
+                             start_date: Optional[date] = None,
+                             end_date: Optional[date] = None,
+                             skip: int = 0,
+                             limit: int = 500) -> List[Tuple]:
+        """Return one page of attendance rows joined with the employee name.
+
+        Each row carries (id, employee_id, employee_name, date, time_in,
+        time_out, worked_hours, notes), so no record or employee objects
+        are loaded.
+        """
+        query = self.db.query(
+            AttendanceRecord.id,
+            AttendanceRecord.employee_id,
+            (Employee.first_name + ' ' + Employee.last_name).label('employee_name'),
+            AttendanceRecord.date,
+            AttendanceRecord.time_in,
+            AttendanceRecord.time_out,
+            (AttendanceRecord.worked_minutes / 60.0).label('worked_hours'),
+            AttendanceRecord.notes
+        ).join(Employee, AttendanceRecord.employee_id == Employee.id)
+        query = self._filter_attendance(query, employee_id, start_date, end_date)
+
+        return (query.order_by(AttendanceRecord.date.desc(), AttendanceRecord.id.desc())
+                .offset(skip)
+                .limit(limit)
+                .all())
+
+    def count_attendance_rows(self,
+                              employee_id: Optional[int] = None,
+                              start_date: Optional[date] = None,
+                              end_date: Optional[date] = None) -> int:
+        """Number of attendance rows list_attendance_rows pages through"""
+        query = self.db.query(func.count(AttendanceRecord.id))
+        return self._filter_attendance(query, employee_id, start_date, end_date).scalar()
+
+    def _filter_attendance(self, query, employee_id, start_date, end_date):
+        if employee_id:
+            query = query.filter(AttendanceRecord.employee_id == employee_id)
+        if start_date:
+            query = query.filter(AttendanceRecord.date >= start_date)
+        if end_date:
+            query = query.filter(AttendanceRecord.date <= end_date)
+        return query
+
     def calculate_payroll(self, 
                          employee_id: int, 
                          start_date: date,
                          end_date: date) -> Dict[str, float]:
-        records = self.get_employee_attendance(employee_id, start_date, end_date)
         employee = self.get_employee(employee_id)
         
         if not employee:
             return {"regular_hours": 0, "overtime_hours": 0, "total_amount": 0}
             
-        regular_hours = sum(record.regular_hours for record in records)
-        overtime_hours = sum(record.overtime_hours_calculated for record in records)
-        
-        regular_amount = regular_hours * employee.hourly_rate
-        overtime_amount = overtime_hours * (employee.hourly_rate * 1.5)  # 1.5x for overtime
+        totals = self.payroll_service.calculate_employee_totals(
+            [employee_id], start_date, end_date
+        ).get(employee_id, {})
         
         return {
-            "regular_hours": regular_hours,
-            "overtime_hours": overtime_hours,
-            "regular_amount": regular_amount,
-            "overtime_amount": overtime_amount,
-            "total_amount": regular_amount + overtime_amount
-        }
\ No newline at end of file
+            "regular_hours": totals.get('regular_minutes', 0.0) / 60,
+            "overtime_hours": totals.get('overtime_minutes', 0.0) / 60,
+            "premium_hours": (totals.get('weekend_minutes', 0.0) +
+                              totals.get('holiday_minutes', 0.0)) / 60,
+            "night_hours": totals.get('night_minutes', 0.0) / 60,
+            "regular_amount": totals.get('regular_amount', 0.0),
+            "overtime_amount": totals.get('overtime_amount', 0.0),
+            "premium_amount": totals.get('premium_amount', 0.0),
+            "total_amount": totals.get('total_amount', 0.0)
+        }
+
+    def refresh_attendance_splits(self, start_date: date, end_date: date) -> int:
+        """Split the stale attendance weeks overlapping a date range by the overtime rules.
+
+        The weekly limit makes every day of an employee's Monday-based week
+        depend on the others, so a week with any stale row is split again
+        as a whole. Returns the number of rows updated.
+        """
+        version = get_rules_version() or 0.0
+        week_start = func.date(AttendanceRecord.date, 'weekday 0', '-6 days')
+        first = start_date - timedelta(days=start_date.weekday())
+        last = end_date + timedelta(days=6 - end_date.weekday())
+
+        stale = self.db.query(
+            AttendanceRecord.employee_id,
+            week_start.label('week_start')
+        ).filter(
+            AttendanceRecord.date >= first,
+            AttendanceRecord.date <= last,
+            or_(AttendanceRecord.split_version.is_(None),
+                AttendanceRecord.split_version != version)
+        ).distinct().subquery()
+
+        rows = self.db.query(
+            AttendanceRecord.id,
+            AttendanceRecord.employee_id,
+            Employee.position,
+            AttendanceRecord.time_in,
+            AttendanceRecord.time_out,
+            Employee.hourly_rate
+        ).join(Employee, AttendanceRecord.employee_id == Employee.id)\
+         .join(stale, (stale.c.employee_id == AttendanceRecord.employee_id) &
+                      (stale.c.week_start == week_start))\
+         .filter(AttendanceRecord.date >= first, AttendanceRecord.date <= last)\
+         .all()
+        if not rows:
+            return 0
+
+        ids, *columns = zip(*rows)
+        result = get_overtime_rules().evaluate(*columns)
+        premium = result['weekend_minutes'] + result['holiday_minutes']
+        self.db.execute(update(AttendanceRecord), [
+            {
+                'id': record_id,
+                'regular_minutes': int(round(regular)),
+                'overtime_minutes': int(round(overtime)),
+                'premium_minutes': int(round(premium_minutes)),
+                'overtime_hours': overtime / 60,
+                'split_version': version
+            }
+            for record_id, regular, overtime, premium_minutes in zip(
+                ids, result['regular_minutes'].tolist(), result['overtime_minutes'].tolist(),
+                premium.tolist())
+        ])
+        self.db.commit()
+        return len(ids)
+
+    def get_hours_report(self,
+                         start_date: date,
+                         end_date: date,
+                         group_by: str = "employee") -> List[Dict[str, Any]]:
+        """Sum worked, regular, overtime and premium hours by employee, department or month.
+
+        Hours are split by the overtime rules, as payroll splits them.
+        Premium hours are those worked on weekends and public holidays.
+        """
+        if group_by == "employee":
+            keys = [Employee.id, Employee.first_name, Employee.last_name]
+        elif group_by == "department":
+            keys = [Employee.department]
+        elif group_by == "month":
+            keys = [func.strftime('%Y-%m', AttendanceRecord.date)]
+        else:
+            raise ValueError(f"Unknown grouping: {group_by}")
+
+        self.refresh_attendance_splits(start_date, end_date)
+
+        regular = func.sum(AttendanceRecord.regular_minutes)
+        overtime = func.sum(AttendanceRecord.overtime_minutes)
+        premium = func.sum(AttendanceRecord.premium_minutes)
+        rows = self.db.query(
+            *keys,
+            func.count(AttendanceRecord.id),
+            regular,
+            overtime,
+            premium
+        ).join(Employee, AttendanceRecord.employee_id == Employee.id)\
+         .filter(AttendanceRecord.date >= start_date, AttendanceRecord.date <= end_date)\
+         .group_by(*keys)\
+         .order_by(*keys)\
+         .all()
+
+        report = []
+        for row in rows:
+            if group_by == "employee":
+                key = {"employee_id": row[0], "employee_name": f"{row[1]} {row[2]}"}
+            else:
+                key = {group_by: row[0]}
+            days, regular_minutes, overtime_minutes, premium_minutes = row[len(keys):]
+            report.append({
+                **key,
+                "days": days,
+                "worked_hours": (regular_minutes + overtime_minutes + premium_minutes) / 60,
+                "regular_hours": regular_minutes / 60,
+                "overtime_hours": overtime_minutes / 60,
+                "premium_hours": premium_minutes / 60
+            })
+        return report
@@ -0,0 +1,90 @@
+from datetime import datetime, date
+from sqlalchemy.orm import Session
+from models.job import JobRun
+from services.payment_service import PaymentService
+from services.penalty_service import PenaltyService
+from services.document_expiry_service import DocumentExpiryService
+from services.rent_roll_service import RentRollService
+from typing import List, Optional, Dict, Any, Callable
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class JobService:
+    """Runs scheduled jobs at most once per business date and records each run"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        # Job name -> callable(as_of) returning a dict of counts
+        self.jobs: Dict[str, Callable[[date], Dict[str, Any]]] = {}
+
+    def register(self, name: str, job: Callable[[date], Dict[str, Any]]) -> None:
+        self.jobs[name] = job
+
+    def last_run(self, name: str) -> Optional[JobRun]:
+        return self.db.query(JobRun)\
+                      .filter(JobRun.name == name)\
+                      .order_by(JobRun.as_of.desc(), JobRun.id.desc())\
+                      .first()
+
+    def get_runs(self, name: str, limit: int = 30) -> List[JobRun]:
+        return self.db.query(JobRun)\
+                      .filter(JobRun.name == name)\
+                      .order_by(JobRun.started_at.desc())\
+                      .limit(limit)\
+                      .all()
+
+    def is_due(self, name: str, as_of: date) -> bool:
+        last = self.last_run(name)
+        return last is None or last.as_of < as_of
+
+    def run(self, name: str, as_of: Optional[date] = None) -> JobRun:
+        """Run a registered job now and record its duration and counts"""
+        as_of = as_of or date.today()
+        started_at = datetime.now()
+        started = time.perf_counter()
+        result = self.jobs[name](as_of)
+        duration = time.perf_counter() - started
+
+        run = JobRun(
+            name=name,
+            as_of=as_of,
+            started_at=started_at,
+            finished_at=datetime.now(),
+            duration_seconds=duration,
+            rows_affected=result.get('rows_affected', 0),
+            details=json.dumps(result, default=str)
+        )
+        self.db.add(run)
+        self.db.commit()
+        self.db.refresh(run)
+        return run
+
+    def run_due_jobs(self, as_of: Optional[date] = None) -> List[JobRun]:
+        """Run every registered job that has not run for the given date yet.
+
+        A failing job is logged and rolled back; the other jobs still run and
+        it is retried on the next call, as no run was recorded for it.
+        """
+        as_of = as_of or date.today()
+        runs = []
+        for name in self.jobs:
+            if not self.is_due(name, as_of):
+                continue
+            try:
+                runs.append(self.run(name, as_of))
+            except Exception:
+                self.db.rollback()
+                logger.exception("Job %s failed for %s", name, as_of)
+        return runs
+
+def create_job_service(db: Session) -> JobService:
+    """JobService with all of the application's daily jobs registered"""
+    jobs = JobService(db)
+    jobs.register('late_installment_sweep', PaymentService(db).sweep_late_installments)
+    jobs.register('penalty_accrual', PenaltyService(db).run_accruals)
+    jobs.register('document_expiry_alerts', DocumentExpiryService(db).write_alerts)
+    jobs.register('rent_roll', RentRollService(db).run_billing)
+    return jobs
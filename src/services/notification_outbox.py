@@ -0,0 +1,545 @@
+from collections import deque
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from itertools import groupby
+from pathlib import Path
+from sqlalchemy.orm import Session
+from sqlalchemy import update, func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.sqlite import insert
+from core.database import SessionLocal
+from core import localization
+from core.localization import get_text
+from models.customer import Customer
+from models.payment import PaymentPlan, Installment, PaymentNotification, PaymentStatus
+from models.notification import OutboxMessage, OutboxStatus
+from typing import List, Optional, Dict, Any, Iterable, NamedTuple, Tuple
+import hashlib
+import json
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_FILE = Path('config') / 'notification_templates.json'
+
+# Channels with subject and body templates under notifications.outbox;
+# the templates file overrides them
+TEMPLATE_CHANNELS = ('email', 'sms', 'file')
+
+# Customer field each channel delivers to
+RECIPIENT_FIELDS = {'email': 'email', 'sms': 'phone', 'file': 'customer_id'}
+
+# SQLite host parameter limit is 999 on older builds
+CHUNK_SIZE = 500
+
+# Messages SmsGatewaySink keeps for inspection; older ones are dropped
+SMS_HISTORY_SIZE = 1000
+
+_templates = {'templates': None, 'mtime': None, 'language': None}
+
+def default_templates() -> Dict[str, Any]:
+    """Message templates of the current language"""
+    templates = {'line': get_text("notifications.outbox.line")}
+    for channel in TEMPLATE_CHANNELS:
+        templates[channel] = {
+            'subject': get_text(f"notifications.outbox.{channel}.subject"),
+            'body': get_text(f"notifications.outbox.{channel}.body")
+        }
+    return templates
+
+def get_templates() -> Dict[str, Any]:
+    """Message templates, rebuilt when the language or the templates file changes"""
+    mtime = TEMPLATES_FILE.stat().st_mtime if TEMPLATES_FILE.exists() else None
+    language = localization.current_language
+    if _templates['templates'] is None or _templates['mtime'] != mtime or _templates['language'] != language:
+        templates = default_templates()
+        if mtime is not None:
+            with open(TEMPLATES_FILE, 'r', encoding='utf-8') as f:
+                overrides = json.load(f)
+            # Merged per channel, so a file overriding only an email subject
+            # keeps the default body
+            for channel, template in overrides.items():
+                if isinstance(template, dict) and isinstance(templates.get(channel), dict):
+                    templates[channel].update(template)
+                else:
+                    templates[channel] = template
+        _templates['templates'] = templates
+        _templates['mtime'] = mtime
+        _templates['language'] = language
+    return _templates['templates']
+
+def render_message(templates: Dict[str, Any], channel: str, customer_name: str,
+                   messages: List[str]) -> Tuple[str, str]:
+    """Subject and body of one channel's message batching `messages`"""
+    template = templates.get(channel, templates['email'])
+    values = {
+        'customer_name': customer_name or '',
+        'count': len(messages),
+        'lines': "\n".join(templates['line'].format(message=m) for m in messages)
+    }
+    return template['subject'].format(**values), template['body'].format(**values)
+
+class OutgoingMessage(NamedTuple):
+    """What a delivery worker gets: a plain copy of a claimed outbox row"""
+    id: int
+    channel: str
+    recipient: str
+    subject: str
+    body: str
+    dedupe_key: str
+
+class NotificationOutboxService:
+    """Database side of the outbox: queue notifications, claim and settle messages"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue_pending(self, channels: Iterable[str], now: Optional[datetime] = None) -> Dict[str, int]:
+        """Batch unqueued notifications into one outbox message per customer and channel.
+
+        Notifications whose installment is already paid or cancelled are
+        marked queued without being sent. Customers with no recipient on
+        any channel keep theirs unqueued until contact details are added.
+        """
+        now = now or datetime.now()
+        channels = [c for c in channels if c in RECIPIENT_FIELDS]
+        templates = get_templates()
+        rows = self.db.query(
+            PaymentNotification.id,
+            PaymentNotification.message,
+            Installment.status,
+            Customer.id.label('customer_id'),
+            Customer.name,
+            Customer.email,
+            Customer.phone
+        ).join(Installment, PaymentNotification.installment_id == Installment.id)\
+         .join(PaymentPlan, Installment.payment_plan_id == PaymentPlan.id)\
+         .join(Customer, PaymentPlan.customer_id == Customer.id)\
+         .filter(PaymentNotification.queued_at.is_(None))\
+         .order_by(Customer.id, PaymentNotification.id)\
+         .all()
+
+        messages, queued, skipped = [], [], 0
+        for customer_id, group in groupby(rows, key=lambda r: r.customer_id):
+            group = list(group)
+            open_rows = [r for r in group if r.status in (PaymentStatus.PENDING, PaymentStatus.LATE)]
+            skipped += len(group) - len(open_rows)
+            if not open_rows:
+                queued += [r.id for r in group]
+                continue
+
+            notification_ids = ','.join(str(r.id) for r in open_rows)
+            reached = False
+            for channel in channels:
+                recipient = getattr(open_rows[0], RECIPIENT_FIELDS[channel])
+                if not recipient:
+                    continue
+                recipient = str(recipient)
+                subject, body = render_message(templates, channel, open_rows[0].name,
+                                               [r.message for r in open_rows])
+                messages.append({
+                    'customer_id': customer_id,
+                    'channel': channel,
+                    'recipient': recipient,
+                    'subject': subject,
+                    'body': body,
+                    'notification_count': len(open_rows),
+                    # Same notifications to the same recipient are only queued once
+                    'dedupe_key': hashlib.sha256(
+                        f"{channel}\0{recipient}\0{notification_ids}".encode('utf-8')
+                    ).hexdigest(),
+                    'status': OutboxStatus.PENDING,
+                    'attempts': 0,
+                    'next_attempt_at': now,
+                    'created_at': now,
+                    'updated_at': now
+                })
+                reached = True
+            if reached:
+                queued += [r.id for r in group]
+
+        created = 0
+        if messages:
+            created = self.db.execute(
+                insert(OutboxMessage.__table__).on_conflict_do_nothing(index_elements=['dedupe_key']),
+                messages
+            ).rowcount
+        for start in range(0, len(queued), CHUNK_SIZE):
+            self.db.execute(
+                update(PaymentNotification)
+                .where(PaymentNotification.id.in_(queued[start:start + CHUNK_SIZE]))
+                .values(queued_at=now)
+            )
+        self.db.commit()
+        return {
+            'notifications_queued': len(queued),
+            'notifications_skipped': skipped,
+            'messages_created': created,
+            'duplicates': len(messages) - created
+        }
+
+    def claim_due(self, limit: int, now: Optional[datetime] = None) -> List[OutgoingMessage]:
+        """Mark up to `limit` due messages as sending and return them"""
+        now = now or datetime.now()
+        rows = self.db.query(
+            OutboxMessage.id,
+            OutboxMessage.channel,
+            OutboxMessage.recipient,
+            OutboxMessage.subject,
+            OutboxMessage.body,
+            OutboxMessage.dedupe_key
+        ).filter(OutboxMessage.status == OutboxStatus.PENDING,
+                 OutboxMessage.next_attempt_at <= now)\
+         .order_by(OutboxMessage.next_attempt_at, OutboxMessage.id)\
+         .limit(limit)\
+         .all()
+        if rows:
+            self.db.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_([r.id for r in rows]))
+                .values(status=OutboxStatus.SENDING,
+                        attempts=OutboxMessage.attempts + 1,
+                        updated_at=now)
+            )
+            self.db.commit()
+        return [OutgoingMessage(*row) for row in rows]
+
+    def record_results(self, results: Dict[int, Optional[str]], max_attempts: int,
+                       retry_delay: float, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Settle claimed messages from a map of message id to error (None when sent).
+
+        Failed messages are retried with exponential backoff until they
+        reach `max_attempts`.
+        """
+        now = now or datetime.now()
+        sent = [message_id for message_id, error in results.items() if error is None]
+        for start in range(0, len(sent), CHUNK_SIZE):
+            self.db.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_(sent[start:start + CHUNK_SIZE]))
+                .values(status=OutboxStatus.SENT, sent_at=now, last_error=None, updated_at=now)
+            )
+
+        errors = {message_id: error for message_id, error in results.items() if error is not None}
+        retried = failed = 0
+        if errors:
+            values = []
+            for message_id, attempts in self.db.query(OutboxMessage.id, OutboxMessage.attempts)\
+                                               .filter(OutboxMessage.id.in_(list(errors))):
+                if attempts >= max_attempts:
+                    status, next_attempt_at = OutboxStatus.FAILED, None
+                    failed += 1
+                else:
+                    status = OutboxStatus.PENDING
+                    next_attempt_at = now + timedelta(seconds=retry_delay * 2 ** (attempts - 1))
+                    retried += 1
+                values.append({
+                    'id': message_id,
+                    'status': status,
+                    'next_attempt_at': next_attempt_at,
+                    'last_error': errors[message_id][:1000],
+                    'updated_at': now
+                })
+            # Bulk UPDATE by primary key
+            self.db.execute(update(OutboxMessage), values)
+
+        self.db.commit()
+        return {'sent': len(sent), 'retried': retried, 'failed': failed}
+
+    def release_claimed(self) -> int:
+        """Put messages left sending by an interrupted run back in the queue"""
+        released = self.db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.status == OutboxStatus.SENDING)
+            .values(status=OutboxStatus.PENDING)
+        ).rowcount
+        self.db.commit()
+        return released
+
+    def get_status_counts(self) -> Dict[str, int]:
+        """Number of outbox messages in each status"""
+        return {
+            status.value: count
+            for status, count in self.db.query(OutboxMessage.status, func.count(OutboxMessage.id))
+                                        .group_by(OutboxMessage.status)
+        }
+
+class SmtpSink:
+    """Sends email over SMTP, keeping one connection open per worker thread"""
+
+    def __init__(self, host: str = 'localhost', port: int = 25, sender: str = 'noreply@localhost',
+                 username: Optional[str] = None, password: Optional[str] = None,
+                 starttls: bool = False, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self) -> smtplib.SMTP:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                connection.starttls()
+            if self.username:
+                connection.login(self.username, self.password or '')
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def send(self, message: OutgoingMessage) -> None:
+        email = EmailMessage()
+        email['From'] = self.sender
+        email['To'] = message.recipient
+        email['Subject'] = message.subject
+        # Lets the receiving side drop a redelivery after a lost reply
+        email['Message-ID'] = f"<{message.dedupe_key}@{self.host}>"
+        email.set_content(message.body)
+        try:
+            self._connection().send_message(email)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self._local.connection = None
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._connections:
+                try:
+                    connection.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+            self._connections = []
+        self._local = threading.local()
+
+class SmsGatewaySink:
+    """Stand-in for an SMS gateway: records the latest messages that would have been sent"""
+
+    def __init__(self, history_size: int = SMS_HISTORY_SIZE):
+        self.sent = deque(maxlen=history_size)
+
+    def send(self, message: OutgoingMessage) -> None:
+        self.sent.append(message)
+
+    def close(self) -> None:
+        pass
+
+class FileDropSink:
+    """Writes each message to a file named after its dedupe key"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def send(self, message: OutgoingMessage) -> None:
+        path = self.directory / f"{message.dedupe_key}.txt"
+        if path.exists():
+            return  # Already delivered by an earlier attempt
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(f"To: {message.recipient}\nSubject: {message.subject}\n\n{message.body}\n")
+        os.replace(temp_path, path)
+
+    def close(self) -> None:
+        pass
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per second with bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class OutboxDispatcher:
+    """Delivers outbox messages on background threads so callers never wait on a sink.
+
+    A coordinator thread owns the database session: it queues new
+    notifications, claims due messages and records the outcomes. Worker
+    threads only talk to the sinks, each channel throttled by its own rate
+    limiter.
+    """
+
+    def __init__(self, sinks: Dict[str, Any], workers: int = 4,
+                 rate_limits: Optional[Dict[str, float]] = None,
+                 batch_size: int = 200, poll_interval: float = 30.0,
+                 max_attempts: int = 5, retry_delay: float = 60.0,
+                 session_factory=SessionLocal):
+        self.sinks = sinks
+        self.worker_count = workers
+        self.rate_limiters = {channel: RateLimiter(rate) for channel, rate in (rate_limits or {}).items()}
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.session_factory = session_factory
+
+        self._work = queue.Queue()
+        self._results = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._coordinator: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {'sent': 0, 'retried': 0, 'failed': 0, 'delivery_seconds': 0.0}
+
+    def start(self) -> None:
+        """Start the coordinator and worker threads"""
+        if self._coordinator is not None:
+            return
+        self._stopping.clear()
+        db = self.session_factory()
+        try:
+            NotificationOutboxService(db).release_claimed()
+        finally:
+            db.close()
+        self._start_workers()
+        self._coordinator = threading.Thread(target=self._coordinate, name='outbox-coordinator', daemon=True)
+        self._coordinator.start()
+
+    def wake(self) -> None:
+        """Check for new notifications now instead of at the next poll"""
+        self._wake.set()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Finish the batch in flight and stop all threads"""
+        self._stopping.set()
+        self._wake.set()
+        if self._coordinator is not None:
+            self._coordinator.join(timeout)
+            self._coordinator = None
+        for _ in self._workers:
+            self._work.put(None)
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+        for sink in self.sinks.values():
+            sink.close()
+
+    def run_once(self) -> Dict[str, int]:
+        """Queue new notifications, then deliver and settle one batch of due messages"""
+        self._start_workers()
+        db = self.session_factory()
+        try:
+            outbox = NotificationOutboxService(db)
+            result = outbox.enqueue_pending(self.sinks)
+            messages = outbox.claim_due(self.batch_size)
+            result['claimed'] = len(messages)
+            if messages:
+                started = time.perf_counter()
+                for message in messages:
+                    self._work.put(message)
+                results = dict(self._results.get() for _ in messages)
+                settled = outbox.record_results(results, self.max_attempts, self.retry_delay)
+                with self._stats_lock:
+                    for key, value in settled.items():
+                        self._stats[key] += value
+                    self._stats['delivery_seconds'] += time.perf_counter() - started
+                result.update(settled)
+            return result
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Delivery counts and throughput since the dispatcher was created"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        seconds = stats['delivery_seconds']
+        stats['messages_per_second'] = stats['sent'] / seconds if seconds else 0.0
+        return stats
+
+    def _start_workers(self) -> None:
+        while len(self._workers) < self.worker_count:
+            worker = threading.Thread(target=self._deliver, name=f"outbox-worker-{len(self._workers)}",
+                                      daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _coordinate(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                claimed = self.run_once()['claimed']
+            except OperationalError:
+                # Database busy or unavailable, try again at the next poll
+                logger.warning("Outbox poll failed, retrying", exc_info=True)
+                claimed = 0
+            except Exception:
+                logger.exception("Outbox coordinator stopped")
+                raise
+            if not claimed:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _deliver(self) -> None:
+        while True:
+            message = self._work.get()
+            if message is None:
+                return
+            error = None
+            try:
+                sink = self.sinks.get(message.channel)
+                if sink is None:
+                    raise LookupError(f"No sink for channel {message.channel}")
+                limiter = self.rate_limiters.get(message.channel)
+                if limiter:
+                    limiter.acquire()
+                sink.send(message)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            self._results.put((message.id, error))
+
+def create_outbox_dispatcher() -> OutboxDispatcher:
+    """Dispatcher for the channels configured in the environment (.env).
+
+    NOTIFICATION_CHANNELS lists the channels to deliver on (email, sms,
+    file). Email goes to SMTP_HOST:SMTP_PORT, files to
+    NOTIFICATION_DROP_DIR, and NOTIFICATION_<CHANNEL>_RATE caps messages
+    per second on a channel.
+    """
+    channels = [c.strip() for c in os.environ.get('NOTIFICATION_CHANNELS', 'file').split(',') if c.strip()]
+    sinks = {}
+    for channel in channels:
+        if channel == 'email':
+            sinks[channel] = SmtpSink(
+                host=os.environ.get('SMTP_HOST', 'localhost'),
+                port=int(os.environ.get('SMTP_PORT', '1025')),
+                sender=os.environ.get('SMTP_SENDER', 'noreply@localhost'),
+                username=os.environ.get('SMTP_USERNAME'),
+                password=os.environ.get('SMTP_PASSWORD'),
+                starttls=os.environ.get('SMTP_STARTTLS', '0') == '1'
+            )
+        elif channel == 'sms':
+            sinks[channel] = SmsGatewaySink()
+        elif channel == 'file':
+            sinks[channel] = FileDropSink(os.environ.get('NOTIFICATION_DROP_DIR', 'exports/notifications'))
+    rate_limits = {
+        channel: float(os.environ[f"NOTIFICATION_{channel.upper()}_RATE"])
+        for channel in sinks if f"NOTIFICATION_{channel.upper()}_RATE" in os.environ
+    }
+    return OutboxDispatcher(sinks, workers=int(os.environ.get('NOTIFICATION_WORKERS', '4')),
+                            rate_limits=rate_limits)
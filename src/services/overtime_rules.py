@@ -0,0 +1,185 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+import numpy as np
+
+RULES_FILE = Path('config') / 'overtime_rules.json'
+
+DEFAULT_RULES = {
+    'daily_regular_hours': 8.0,
+    'weekly_regular_hours': 45.0,
+    'overtime_multiplier': 1.5,
+    'weekend_days': [5, 6],          # Monday = 0
+    'weekend_multiplier': 1.5,
+    'holidays': [],                  # ISO dates of public holidays
+    'holiday_multiplier': 2.0,
+    'night_start_hour': 20,
+    'night_end_hour': 6,
+    'night_premium': 0.0,            # Extra fraction of the hourly rate per night hour
+    'positions': {}                  # Position name -> overrides of the numeric rules
+}
+
+# Rules that can be overridden per position
+POSITION_RULES = (
+    'daily_regular_hours', 'weekly_regular_hours', 'overtime_multiplier',
+    'weekend_multiplier', 'holiday_multiplier', 'night_premium'
+)
+
+MINUTES_PER_DAY = 24 * 60
+
+class OvertimeRules:
+    """A compiled overtime rule set evaluated over whole columns of attendance.
+
+    Compiling turns the declarative rules into lookup arrays indexed by
+    position code, so evaluation is a fixed number of array operations
+    regardless of how many attendance rows are passed in.
+
+    Weekday minutes up to the daily limit are regular, the rest overtime.
+    Regular minutes beyond the weekly limit (per employee, Monday-based
+    week, in date order) move to overtime as well. Minutes worked on
+    weekend days or public holidays are paid entirely at that day's
+    multiplier. Night minutes earn the night premium on top.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Any]] = None):
+        rules = {**DEFAULT_RULES, **(rules or {})}
+        positions = rules['positions']
+
+        # Code 0 is the default rule set, positions follow in definition order
+        self.position_codes = {name: code for code, name in enumerate(positions, start=1)}
+        self.params = {
+            key: np.array(
+                [float(rules[key])] +
+                [float(positions[name].get(key, rules[key])) for name in positions]
+            )
+            for key in POSITION_RULES
+        }
+
+        self.weekend_mask = np.zeros(7, dtype=bool)
+        self.weekend_mask[list(rules['weekend_days'])] = True
+        self.holidays = np.array(sorted(rules['holidays']), dtype='datetime64[D]').astype(np.int64)
+
+        self.night_start = int(rules['night_start_hour'] * 60)
+        self.night_end = int(rules['night_end_hour'] * 60)
+        if self.night_end <= self.night_start:
+            self.night_end += MINUTES_PER_DAY  # Window runs past midnight
+
+    def evaluate(self,
+                 employee_ids: Sequence[int],
+                 positions: Sequence[Optional[str]],
+                 time_in: Sequence,
+                 time_out: Sequence,
+                 hourly_rates: Sequence[float]) -> Dict[str, np.ndarray]:
+        """Split worked minutes and pay for every attendance row at once"""
+        employee_ids = np.asarray(employee_ids, dtype=np.int64)
+        rates = np.asarray(hourly_rates, dtype=float)
+        pos = self._position_indexes(positions)
+        n = len(employee_ids)
+
+        time_in = np.asarray(time_in, dtype='datetime64[m]')
+        time_out = np.asarray(time_out, dtype='datetime64[m]')
+        valid = ~(np.isnat(time_in) | np.isnat(time_out))
+        start = np.where(valid, time_in.astype(np.int64), 0)
+        end = np.where(valid, time_out.astype(np.int64), 0)
+        worked = np.clip(end - start, 0, None).astype(float)
+
+        day = start // MINUTES_PER_DAY
+        weekday = (day + 3) % 7  # 1970-01-01 was a Thursday
+
+        is_holiday = valid & np.isin(day, self.holidays)
+        is_weekend = valid & self.weekend_mask[weekday] & ~is_holiday
+        weekday_worked = np.where(is_holiday | is_weekend, 0.0, worked)
+
+        daily_regular = np.minimum(weekday_worked, self.params['daily_regular_hours'][pos] * 60)
+        daily_overtime = weekday_worked - daily_regular
+
+        # Weekly limit: running total of regular minutes per employee and week
+        # Sorting by (employee, day) also orders each employee's weeks
+        week = (day + 3) // 7
+        order = np.argsort(employee_ids * (1 << 24) + day, kind='stable')
+        employees_sorted = employee_ids[order]
+        weeks_sorted = week[order]
+        regular_sorted = daily_regular[order]
+        running = np.cumsum(regular_sorted)
+        new_group = np.ones(n, dtype=bool)
+        new_group[1:] = ((employees_sorted[1:] != employees_sorted[:-1]) |
+                         (weeks_sorted[1:] != weeks_sorted[:-1]))
+        group = np.cumsum(new_group) - 1
+        group_offset = (running - regular_sorted)[new_group]
+        running_in_week = running - group_offset[group]
+        weekly_limit = self.params['weekly_regular_hours'][pos][order] * 60
+        excess_sorted = np.minimum(regular_sorted, np.maximum(running_in_week - weekly_limit, 0.0))
+        weekly_excess = np.empty(n)
+        weekly_excess[order] = excess_sorted
+
+        regular = daily_regular - weekly_excess
+        overtime = daily_overtime + weekly_excess
+        weekend = np.where(is_weekend, worked, 0.0)
+        holiday = np.where(is_holiday, worked, 0.0)
+
+        # Overlap with the night windows starting the day before, on, and after time_in
+        night = np.zeros(n)
+        day_start = day * MINUTES_PER_DAY
+        for offset in (-MINUTES_PER_DAY, 0, MINUTES_PER_DAY):
+            window_start = day_start + offset + self.night_start
+            window_end = day_start + offset + self.night_end
+            night += np.clip(np.minimum(end, window_end) - np.maximum(start, window_start), 0, None)
+
+        per_minute = rates / 60
+        regular_amount = regular * per_minute
+        overtime_amount = overtime * per_minute * self.params['overtime_multiplier'][pos]
+        premium_amount = per_minute * (
+            weekend * self.params['weekend_multiplier'][pos] +
+            holiday * self.params['holiday_multiplier'][pos] +
+            night * self.params['night_premium'][pos]
+        )
+
+        return {
+            'regular_minutes': regular,
+            'overtime_minutes': overtime,
+            'weekend_minutes': weekend,
+            'holiday_minutes': holiday,
+            'night_minutes': night,
+            'regular_amount': regular_amount,
+            'overtime_amount': overtime_amount,
+            'premium_amount': premium_amount,
+            'total_amount': regular_amount + overtime_amount + premium_amount
+        }
+
+    def _position_indexes(self, positions: Sequence[Optional[str]]) -> np.ndarray:
+        if not self.position_codes:
+            return np.zeros(len(positions), dtype=np.intp)
+        codes = self.position_codes
+        return np.fromiter((codes.get(name, 0) for name in positions),
+                           dtype=np.intp, count=len(positions))
+
+def totals_by_employee(employee_ids: Sequence[int],
+                       result: Dict[str, np.ndarray]) -> Dict[int, Dict[str, float]]:
+    """Sum evaluated columns per employee"""
+    ids, inverse = np.unique(np.asarray(employee_ids, dtype=np.int64), return_inverse=True)
+    sums = {
+        key: np.bincount(inverse, weights=values, minlength=len(ids))
+        for key, values in result.items()
+    }
+    return {
+        int(employee_id): {key: float(column[i]) for key, column in sums.items()}
+        for i, employee_id in enumerate(ids)
+    }
+
+_compiled = {'mtime': None, 'rules': None}
+
+def get_rules_version() -> Optional[float]:
+    """Modification time of the rules file, None while the defaults apply"""
+    return RULES_FILE.stat().st_mtime if RULES_FILE.exists() else None
+
+def get_overtime_rules() -> OvertimeRules:
+    """Return the configured rule set, compiled once and again only when the file changes"""
+    mtime = get_rules_version()
+    if _compiled['rules'] is None or _compiled['mtime'] != mtime:
+        rules = None
+        if mtime is not None:
+            with open(RULES_FILE, 'r', encoding='utf-8') as f:
+                rules = json.load(f)
+        _compiled['rules'] = OvertimeRules(rules)
+        _compiled['mtime'] = mtime
+    return _compiled['rules']
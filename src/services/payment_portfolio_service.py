@@ -0,0 +1,138 @@
+from datetime import date
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, case, func, select
+from models.customer import Customer
+from models.payment import PaymentPlan, Installment, PaymentStatus
+from typing import List, Optional, Dict, Any, Sequence
+
+class PaymentPortfolioService:
+    """Installment totals across all payment plans, computed with grouped SQL"""
+
+    GROUPINGS = ('customer', 'project', 'month')
+    MEASURES = ('installments', 'scheduled', 'collected', 'late', 'due', 'collected_due')
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_summary(self,
+                    group_by: Sequence[str] = ('customer',),
+                    start_date: Optional[date] = None,
+                    end_date: Optional[date] = None,
+                    as_of: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Scheduled, collected, pending and late amounts per group.
+
+        Groups can combine customer, project and due month, e.g.
+        ('project', 'month'). The date range filters on installment due
+        dates. Unpaid installments due before `as_of` (default today)
+        count as late even if the nightly sweep has not marked them yet.
+        collection_rate is the paid share of the amount due by `as_of`.
+        """
+        unknown = set(group_by) - set(self.GROUPINGS)
+        if unknown:
+            raise ValueError(f"Unknown grouping: {', '.join(sorted(unknown))}")
+
+        totals = self._installment_totals(group_by, start_date, end_date, as_of or date.today())
+        by_plan = 'customer' in group_by or 'project' in group_by
+        # With a month, the first pass already grouped by the plan columns
+        plan_columns = totals.c if 'month' in group_by else PaymentPlan.__table__.c
+
+        keys, labels = [], []
+        for grouping in group_by:
+            if grouping == 'customer':
+                keys += [plan_columns.customer_id, Customer.name]
+                labels += ['customer_id', 'customer_name']
+            elif grouping == 'project':
+                keys.append(plan_columns.project)
+                labels.append('project')
+            elif grouping == 'month':
+                keys.append(totals.c.month if by_plan else func.strftime('%Y-%m', totals.c.due_date))
+                labels.append('month')
+
+        query = select(*keys, *[func.sum(totals.c[measure]) for measure in self.MEASURES])\
+            .select_from(totals)
+        if by_plan and 'month' not in group_by:
+            query = query.join(PaymentPlan, PaymentPlan.id == totals.c.plan_id)
+        if 'customer' in group_by:
+            query = query.outerjoin(Customer, plan_columns.customer_id == Customer.id)
+        if keys:
+            query = query.group_by(*keys).order_by(*keys)
+
+        summary = []
+        for row in self.db.execute(query):
+            count, scheduled, collected, late, due, collected_due = \
+                [value or 0.0 for value in row[len(keys):]]
+            if not count:
+                continue
+            summary.append({
+                **dict(zip(labels, row[:len(keys)])),
+                'installments': count,
+                'scheduled': round(scheduled, 2),
+                'collected': round(collected, 2),
+                'pending': round(scheduled - collected - late, 2),
+                'late': round(late, 2),
+                'due': round(due, 2),
+                'collection_rate': collected_due / due if due else None
+            })
+        return summary
+
+    def get_totals(self,
+                   start_date: Optional[date] = None,
+                   end_date: Optional[date] = None,
+                   as_of: Optional[date] = None) -> Dict[str, Any]:
+        """Portfolio totals over every plan"""
+        rows = self.get_summary((), start_date, end_date, as_of)
+        return rows[0] if rows else {}
+
+    def _installment_totals(self, group_by, start_date, end_date, as_of):
+        """First aggregation pass, straight off the installments table.
+
+        Pre-grouping by due date or by plan lets SQLite walk an index in
+        order instead of sorting a million rows; the outer query then only
+        rolls those partial totals up to months, customers and projects.
+        Months combined with customers or projects are grouped here
+        directly, joined to the plans: every plan has about one
+        installment a month, so pre-grouping by due date and plan would
+        not shrink the rows.
+        """
+        status = Installment.status
+        amount = Installment.amount
+        is_due = Installment.due_date <= as_of
+        is_late = or_(status == PaymentStatus.LATE,
+                      and_(status == PaymentStatus.PENDING, Installment.due_date < as_of))
+
+        def total(condition):
+            return func.sum(case((condition, amount)))
+
+        by_plan = 'customer' in group_by or 'project' in group_by
+        keys = []
+        if 'month' in group_by and by_plan:
+            keys.append(func.strftime('%Y-%m', Installment.due_date).label('month'))
+            if 'customer' in group_by:
+                keys.append(PaymentPlan.customer_id.label('customer_id'))
+            if 'project' in group_by:
+                keys.append(PaymentPlan.project.label('project'))
+        elif 'month' in group_by:
+            keys.append(Installment.due_date.label('due_date'))
+        elif by_plan:
+            keys.append(Installment.payment_plan_id.label('plan_id'))
+
+        # Cancelled installments are out of the schedule altogether, so
+        # pending is whatever is neither collected nor late
+        query = select(
+            *keys,
+            func.count().label('installments'),
+            func.sum(amount).label('scheduled'),
+            total(status == PaymentStatus.PAID).label('collected'),
+            total(is_late).label('late'),
+            total(is_due).label('due'),
+            total(and_(is_due, status == PaymentStatus.PAID)).label('collected_due')
+        ).where(status != PaymentStatus.CANCELLED)
+        if 'month' in group_by and by_plan:
+            query = query.join(PaymentPlan, PaymentPlan.id == Installment.payment_plan_id)
+        if start_date:
+            query = query.where(Installment.due_date >= start_date)
+        if end_date:
+            query = query.where(Installment.due_date <= end_date)
+        if keys:
+            query = query.group_by(*keys)
+        return query.subquery('installment_totals')
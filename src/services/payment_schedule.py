@@ -0,0 +1,101 @@
+from datetime import date
+from typing import Dict, Sequence
+import numpy as np
+
+def first_due_months(start_dates: Sequence[date], payment_days: Sequence[int]) -> np.ndarray:
+    """Month of the first installment for each plan.
+
+    The first installment falls in the start month, or in the next month
+    when the payment day is earlier in the month than the start day.
+    """
+    starts = np.asarray(start_dates, dtype='datetime64[D]')
+    payment_days = np.asarray(payment_days, dtype=np.int64)
+    months = starts.astype('datetime64[M]')
+    start_days = (starts - months.astype('datetime64[D]')).astype(np.int64) + 1
+    return months + (payment_days < start_days).astype(np.int64)
+
+def due_dates(months: np.ndarray, payment_days: np.ndarray) -> np.ndarray:
+    """Payment day of each month, clamped to the month's last day like _add_months"""
+    month_starts = months.astype('datetime64[D]')
+    month_lengths = ((months + 1).astype('datetime64[D]') - month_starts).astype(np.int64)
+    return month_starts + (np.minimum(payment_days, month_lengths) - 1)
+
+def build_schedules(principals: Sequence[float],
+                    annual_rates: Sequence[float],
+                    counts: Sequence[int],
+                    start_dates: Sequence[date],
+                    payment_days: Sequence[int]) -> Dict[str, np.ndarray]:
+    """Amortization schedules for many plans at once, flattened plan after plan.
+
+    Amounts are the PMT annuity (or an even split without interest) rounded
+    to kuruş. The last installment settles whatever rounding left, so each
+    plan's installments add up exactly to principal plus interest. Returns
+    columns plan_index, installment_no, due_date, amount, principal and
+    interest.
+    """
+    principals = np.asarray(principals, dtype=float)
+    rates = np.asarray(annual_rates, dtype=float) / 12 / 100
+    counts = np.asarray(counts, dtype=np.int64)
+    payment_days = np.asarray(payment_days, dtype=np.int64)
+
+    # Per-plan rounded installment amount
+    has_interest = rates > 0
+    safe_rates = np.where(has_interest, rates, 1.0)
+    growth = (1 + safe_rates) ** counts
+    annuity = principals * safe_rates * growth / (growth - 1)
+    amounts = np.round(np.where(has_interest, annuity, principals / np.maximum(counts, 1)), 2)
+
+    # Flatten to one row per installment
+    plan_index = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    k = np.arange(len(plan_index)) - offsets  # 0-based installment position
+    last = k == counts[plan_index] - 1
+
+    rate = rates[plan_index]
+    amount = amounts[plan_index]
+    principal = principals[plan_index]
+    interest_rows = has_interest[plan_index]
+
+    # Balance before installment k after k rounded payments
+    factor = (1 + np.where(interest_rows, rate, 0.0)) ** k
+    paid_growth = np.where(interest_rows, (factor - 1) / np.where(interest_rows, rate, 1.0), k)
+    balance = np.round(principal * factor - amount * paid_growth, 2)
+
+    interest = np.round(balance * rate, 2)
+    amount = np.where(last, np.round(balance + interest, 2), amount)
+    principal_part = np.round(amount - interest, 2)
+
+    # Settle accumulated interest rounding on the final principal
+    repaid = np.bincount(plan_index, weights=np.where(last, 0.0, principal_part),
+                         minlength=len(counts))
+    principal_part = np.where(last, np.round(principal - repaid[plan_index], 2), principal_part)
+    interest = np.where(last, np.round(amount - principal_part, 2), interest)
+
+    months = first_due_months(start_dates, payment_days)[plan_index] + k
+    return {
+        'plan_index': plan_index,
+        'installment_no': k + 1,
+        'due_date': due_dates(months, payment_days[plan_index]),
+        'amount': amount,
+        'principal': principal_part,
+        'interest': interest
+    }
+
+def terms_for_payment(principals: Sequence[float],
+                      annual_rates: Sequence[float],
+                      amounts: Sequence[float]) -> np.ndarray:
+    """Number of installments of (at most) `amounts` needed to repay each principal.
+
+    Inverse of the PMT formula, rounded up; at least one installment.
+    """
+    principals = np.asarray(principals, dtype=float)
+    rates = np.asarray(annual_rates, dtype=float) / 12 / 100
+    amounts = np.asarray(amounts, dtype=float)
+
+    has_interest = rates > 0
+    safe_rates = np.where(has_interest, rates, 1.0)
+    # Payments that do not cover the first month's interest never repay
+    covered = np.clip(1 - safe_rates * principals / amounts, 1e-12, None)
+    annuity_terms = -np.log(covered) / np.log1p(safe_rates)
+    terms = np.where(has_interest, annuity_terms, principals / amounts)
+    return np.maximum(np.ceil(terms - 1e-9), 1).astype(np.int64)
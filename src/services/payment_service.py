@@ -1,79 +1,380 @@
 from datetime import datetime, date, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, select, update, insert, delete, func, literal
+from core.database import bulk_insert, sql_format
+from core.localization import get_text
 from models.payment import PaymentPlan, Installment, PaymentNotification
-from models.payment import PaymentStatus, PaymentType
+from models.payment import PaymentStatus, PaymentType, plan_counters_update
+from services.payment_schedule import build_schedules, first_due_months, terms_for_payment
+from services.penalty_service import PenaltyService
 from typing import List, Optional, Dict, Any
+import numpy as np
 
 class PaymentService:
+    # Plan fields the installment schedule is generated from
+    SCHEDULE_FIELDS = ('total_amount', 'down_payment', 'interest_rate',
+                       'number_of_installments', 'start_date', 'payment_day')
+    
     def __init__(self, db: Session):
         self.db = db
     
     def create_payment_plan(self, data: Dict[str, Any]) -> PaymentPlan:
         """Create a new payment plan with installments"""
-        # Create payment plan
-        payment_plan = PaymentPlan(**{
-            k: v for k, v in data.items() 
-            if k not in ['installments']
+        payment_plan = self.create_payment_plans([data])[0]
+        self.db.refresh(payment_plan)
+        return payment_plan
+    
+    def create_payment_plans(self, plans_data: List[Dict[str, Any]]) -> List[PaymentPlan]:
+        """Create many payment plans, generating all their installments in one pass.
+
+        Besides the PaymentPlan columns, each plan's data may name the
+        `project` the sale belongs to, for the portfolio summary.
+        """
+        plans = [
+            PaymentPlan(**{k: v for k, v in data.items() if k not in ['installments']})
+            for data in plans_data
+        ]
+        for plan in plans:
+            plan.project = self._project_name(plan.project)
+        schedule = self._build_schedules(plans)
+        
+        # Every installment of a new plan is pending
+        pending_amounts = np.bincount(schedule['plan_index'], weights=schedule['amount'],
+                                      minlength=len(plans))
+        first_rows = np.flatnonzero(schedule['installment_no'] == 1)
+        first_due = dict(zip(schedule['plan_index'][first_rows].tolist(),
+                             schedule['due_date'][first_rows].tolist()))
+        for index, plan in enumerate(plans):
+            plan.paid_amount, plan.paid_count = 0.0, 0
+            plan.pending_amount = round(float(pending_amounts[index]), 2)
+            plan.pending_count = plan.number_of_installments
+            plan.late_amount, plan.late_count = 0.0, 0
+            plan.next_due_date = first_due.get(index)
+        
+        self.db.add_all(plans)
+        self.db.flush()  # Get IDs without committing
+        
+        plan_ids = np.array([p.id for p in plans], dtype=np.int64)[schedule['plan_index']]
+        bulk_insert(self.db, Installment.__table__, {
+            'payment_plan_id': plan_ids.tolist(),
+            'installment_no': schedule['installment_no'].tolist(),
+            'due_date': schedule['due_date'].tolist(),
+            'amount': schedule['amount'].tolist(),
+            'principal_amount': schedule['principal'].tolist(),
+            'interest_amount': schedule['interest'].tolist(),
+            'status': PaymentStatus.PENDING
         })
-        self.db.add(payment_plan)
-        self.db.flush()  # Get ID without committing
-        
-        # Calculate and create installments
-        amount_per_installment = (payment_plan.total_amount - payment_plan.down_payment) / payment_plan.number_of_installments
-        
-        # If there's interest, calculate the amount with interest
-        if payment_plan.interest_rate > 0:
-            monthly_rate = payment_plan.interest_rate / 12 / 100
-            # Calculate monthly payment with interest (PMT formula)
-            amount_per_installment = (payment_plan.total_amount - payment_plan.down_payment) * \
-                (monthly_rate * (1 + monthly_rate) ** payment_plan.number_of_installments) / \
-                ((1 + monthly_rate) ** payment_plan.number_of_installments - 1)
-        
-        # Create installments
-        start_date = payment_plan.start_date
-        for i in range(payment_plan.number_of_installments):
-            # Calculate due date (same day each month)
-            if start_date.day != payment_plan.payment_day:
-                # Adjust to specified payment day
-                due_date = start_date.replace(day=payment_plan.payment_day)
-                if payment_plan.payment_day < start_date.day:
-                    # If payment day is earlier in month, move to next month
-                    due_date = self._add_months(due_date, 1)
-            else:
-                due_date = start_date
-            
-            installment = Installment(
-                payment_plan_id=payment_plan.id,
-                installment_no=i + 1,
-                due_date=self._add_months(due_date, i),
-                amount=round(amount_per_installment, 2),
-                status=PaymentStatus.PENDING
-            )
-            self.db.add(installment)
         
         self.db.commit()
-        self.db.refresh(payment_plan)
-        return payment_plan
+        return plans
+    
+    def _build_schedules(self, plans: List[PaymentPlan]) -> Dict[str, np.ndarray]:
+        """Build the plans' installment schedules as arrays"""
+        return build_schedules(
+            [p.total_amount - (p.down_payment or 0.0) for p in plans],
+            [p.interest_rate or 0.0 for p in plans],
+            [p.number_of_installments for p in plans],
+            [p.start_date for p in plans],
+            [p.payment_day for p in plans]
+        )
     
     def update_payment_plan(self, plan_id: int, data: Dict[str, Any]) -> Optional[PaymentPlan]:
         """Update payment plan details"""
         plan = self.db.query(PaymentPlan).filter(PaymentPlan.id == plan_id).first()
         if plan:
             # Only allow updating certain fields if no payments have been made
-            if not any(i.status == PaymentStatus.PAID for i in plan.installments):
+            if not plan.paid_count:
+                old_principal = plan.total_amount - (plan.down_payment or 0.0)
+                schedule_changed = any(
+                    key in self.SCHEDULE_FIELDS and getattr(plan, key) != value
+                    for key, value in data.items()
+                )
                 for key, value in data.items():
                     setattr(plan, key, value)
+                if 'project' in data:
+                    plan.project = self._project_name(data['project'])
+                if schedule_changed:
+                    # Nothing is paid yet, so every unpaid installment is the tail
+                    rows = self._installment_rows(plan.id)
+                    tail = [row for row in rows
+                            if row.status in (PaymentStatus.PENDING, PaymentStatus.LATE)]
+                    principal = sum(row.principal for row in tail) \
+                        + plan.total_amount - (plan.down_payment or 0.0) - old_principal
+                    self._restructure_tail(
+                        plan, rows, tail, principal, plan.interest_rate or 0.0,
+                        plan.number_of_installments,
+                        first_due_months([plan.start_date], [plan.payment_day])[0],
+                        plan.payment_day
+                    )
                 self.db.commit()
                 self.db.refresh(plan)
             else:
-                # If payments exist, only allow updating title and description
+                # If payments exist, only allow updating title, description and
+                # project; schedule changes go through restructure_payment_plan
                 plan.title = data.get('title', plan.title)
                 plan.description = data.get('description', plan.description)
+                if 'project' in data:
+                    plan.project = self._project_name(data['project'])
                 self.db.commit()
                 self.db.refresh(plan)
         return plan
     
+    def assign_project(self, plan_ids: List[int], project: Optional[str]) -> int:
+        """Put existing plans under a project, or take them out of one with None"""
+        if not plan_ids:
+            return 0
+        updated = self.db.execute(
+            update(PaymentPlan)
+            .where(PaymentPlan.id.in_(plan_ids))
+            .values(project=self._project_name(project), updated_at=datetime.now())
+        ).rowcount
+        self.db.commit()
+        return updated
+
+    @staticmethod
+    def _project_name(project: Optional[str]) -> Optional[str]:
+        """Project names are trimmed; blank means no project"""
+        return (project or '').strip() or None
+
+    def restructure_payment_plan(self, plan_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Reschedule the unpaid installments of a plan.
+
+        The pending and late installments are replaced by a new schedule
+        over their outstanding principal. `number_of_installments` is the
+        new remaining term, `interest_rate` the new annual rate and
+        `skip_months` postpones the first unpaid installment; each defaults
+        to the current schedule. The new schedule starts no earlier than the
+        next payment day from today, so overdue installments are moved
+        forward instead of being rescheduled as late again. Paid and
+        cancelled installments are left as they are. Only the installments
+        that actually change are written, all in one transaction.
+        """
+        plan = self.get_payment_plan(plan_id)
+        if not plan:
+            return None
+        
+        rows = self._installment_rows(plan.id)
+        tail = [row for row in rows
+                if row.status in (PaymentStatus.PENDING, PaymentStatus.LATE)]
+        if not tail:
+            raise ValueError("Payment plan has no unpaid installments to restructure")
+        
+        count = data.get('number_of_installments', len(tail))
+        if count < 1:
+            raise ValueError("Restructured plan needs at least one installment")
+        rate = data.get('interest_rate', plan.interest_rate or 0.0)
+        payment_day = data.get('payment_day', plan.payment_day)
+        first_month = max(np.datetime64(min(row.due_date for row in tail), 'M'),
+                          first_due_months([date.today()], [payment_day])[0]) \
+            + data.get('skip_months', 0)
+        
+        plan.interest_rate = rate
+        plan.payment_day = payment_day
+        result = self._restructure_tail(plan, rows, tail, sum(row.principal for row in tail),
+                                        rate, count, first_month, payment_day)
+        self.db.commit()
+        self.db.refresh(plan)
+        return result
+    
+    def simulate_prepayments(self, plan_id: int, scenarios: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """What-if schedules for paying a plan off early or adding lump sums.
+
+        Nothing is written. Each scenario may set:
+          date                    when it takes effect (default today); unpaid
+                                  installments due before it are paid as scheduled
+          lump_sum                extra principal paid on that date
+          payoff_date             settle everything on this date instead
+          number_of_installments  new remaining term
+          interest_rate           new annual rate
+          keep_payment            keep the installment amount and shorten the
+                                  term instead of lowering the installments
+        Returns the current remaining schedule totals and, per scenario, the
+        new schedule with its total payments and interest saving. All
+        re-amortized schedules are built together in one array pass.
+        """
+        plan = self.get_payment_plan(plan_id)
+        if not plan:
+            return None
+        tail = [row for row in self._installment_rows(plan.id)
+                if row.status in (PaymentStatus.PENDING, PaymentStatus.LATE)]
+        if not tail:
+            raise ValueError("Payment plan has no unpaid installments to simulate")
+        
+        due = np.array([row.due_date for row in tail], dtype='datetime64[D]')
+        amounts = np.array([row.amount for row in tail])
+        principals = np.array([row.principal for row in tail])
+        interests = np.array([row.interest for row in tail])
+        baseline_payments = round(float(amounts.sum()), 2)
+        baseline_interest = round(float(interests.sum()), 2)
+        
+        today = np.datetime64(date.today(), 'D')
+        count = len(scenarios)
+        effective = np.array([s.get('payoff_date') or s.get('date') or today for s in scenarios],
+                             dtype='datetime64[D]')
+        lump_sums = np.array([float(s.get('lump_sum') or 0.0) for s in scenarios])
+        rates = np.array([float(s.get('interest_rate', plan.interest_rate or 0.0)) for s in scenarios])
+        payoff = np.array([bool(s.get('payoff_date')) for s in scenarios], dtype=bool)
+        
+        # Installments due before a scenario's date stay as scheduled
+        kept = due[None, :] < effective[:, None]                      # scenarios x installments
+        kept_count = kept.sum(axis=1)
+        kept_payments = (kept * amounts).sum(axis=1)
+        kept_interest = (kept * interests).sum(axis=1)
+        outstanding = ((~kept) * principals).sum(axis=1)
+        lump_sums = np.minimum(lump_sums, outstanding)
+        remaining = np.round(outstanding - lump_sums, 2)
+        
+        # Interest of the running period up to the payoff date, pro rata
+        next_index = np.minimum(kept_count, len(tail) - 1)
+        previous_due = np.where(kept_count > 0, due[np.maximum(kept_count - 1, 0)],
+                                due[0] - np.timedelta64(30, 'D'))
+        period_days = np.maximum((due[next_index] - previous_due).astype(np.int64), 1)
+        elapsed = np.clip((effective - previous_due).astype(np.int64), 0, period_days)
+        accrued = np.where(payoff & (kept_count < len(tail)),
+                           np.round(interests[next_index] * elapsed / period_days, 2), 0.0)
+        
+        # Re-amortize what is left for the scenarios that don't pay off
+        amortize = ~payoff & (remaining > 0)
+        terms = np.array([int(s.get('number_of_installments') or 0) for s in scenarios])
+        terms = np.where(terms > 0, terms, len(tail) - kept_count)
+        keep_payment = np.array([bool(s.get('keep_payment')) for s in scenarios], dtype=bool)
+        current_amount = amounts[next_index]
+        terms = np.where(keep_payment & amortize,
+                         terms_for_payment(remaining, rates, np.maximum(current_amount, 0.01)), terms)
+        terms = np.where(amortize, np.maximum(terms, 1), 0)
+        first_month = np.where(kept_count < len(tail), due[next_index],
+                               effective).astype('datetime64[M]')
+        schedule = build_schedules(remaining[amortize], rates[amortize], terms[amortize],
+                                   first_month[amortize].astype('datetime64[D]').tolist(),
+                                   [plan.payment_day] * int(amortize.sum()))
+        scenario_of = np.flatnonzero(amortize)[schedule['plan_index']]
+        new_payments = np.bincount(scenario_of, weights=schedule['amount'], minlength=count)
+        new_interest = np.bincount(scenario_of, weights=schedule['interest'], minlength=count)
+        
+        payoff_amounts = np.where(payoff, np.round(remaining + accrued, 2), 0.0)
+        total_payments = np.round(kept_payments + lump_sums + new_payments + payoff_amounts, 2)
+        total_interest = np.round(kept_interest + new_interest + accrued, 2)
+        
+        results = []
+        for j, scenario in enumerate(scenarios):
+            rows = np.flatnonzero(scenario_of == j)
+            installments = [
+                {'due_date': due_date, 'amount': amount, 'principal': principal, 'interest': interest}
+                for due_date, amount, principal, interest in zip(
+                    schedule['due_date'][rows].tolist(), schedule['amount'][rows].tolist(),
+                    schedule['principal'][rows].tolist(), schedule['interest'][rows].tolist())
+            ]
+            if installments:
+                last_date = installments[-1]['due_date']
+            elif kept_count[j] == len(tail):
+                last_date = due[-1].item()
+            else:
+                last_date = effective[j].item()  # Paid off by the payoff or lump sum
+            results.append({
+                'name': scenario.get('name', f"Scenario {j + 1}"),
+                'effective_date': effective[j].item(),
+                'installments_paid_as_scheduled': int(kept_count[j]),
+                'lump_sum': round(float(lump_sums[j]), 2),
+                'payoff_amount': round(float(payoff_amounts[j]), 2) if payoff[j] else None,
+                'installments': installments,
+                'installment_amount': installments[0]['amount'] if installments else None,
+                'number_of_installments': len(installments),
+                'final_payment_date': last_date,
+                'total_payments': float(total_payments[j]),
+                'total_interest': float(total_interest[j]),
+                'interest_saving': round(baseline_interest - float(total_interest[j]), 2),
+                'payment_saving': round(baseline_payments - float(total_payments[j]), 2)
+            })
+        
+        return {
+            'plan_id': plan.id,
+            'outstanding_principal': round(float(principals.sum()), 2),
+            'remaining_installments': len(tail),
+            'remaining_payments': baseline_payments,
+            'remaining_interest': baseline_interest,
+            'scenarios': results
+        }
+    
+    def _installment_rows(self, plan_id: int) -> List[Any]:
+        """Flat schedule rows of a plan, in installment order"""
+        return self.db.query(
+            Installment.id,
+            Installment.installment_no,
+            Installment.due_date,
+            Installment.amount,
+            func.coalesce(Installment.principal_amount, Installment.amount).label('principal'),
+            func.coalesce(Installment.interest_amount, 0.0).label('interest'),
+            Installment.status
+        ).filter(Installment.payment_plan_id == plan_id)\
+         .order_by(Installment.installment_no)\
+         .all()
+    
+    def _restructure_tail(self, plan: PaymentPlan, rows: List[Any], tail: List[Any], principal: float,
+                          rate: float, count: int, first_month: np.datetime64,
+                          payment_day: int) -> Dict[str, Any]:
+        """Replace the `tail` of a plan's `rows` with a new schedule, writing only the differences.
+
+        New installments take over the tail's installment numbers in order;
+        extra ones are appended after the plan's last number and leftover
+        tail rows are deleted with their notifications and penalty accruals.
+        Flushes but does not commit.
+        """
+        schedule = build_schedules([round(principal, 2)], [rate], [count],
+                                   [first_month.astype('datetime64[D]').item()], [payment_day])
+        today = date.today()
+        last_no = max(row.installment_no for row in rows)
+        
+        updates, inserts = [], []
+        for k, (due_date, amount, principal_part, interest) in enumerate(zip(
+                schedule['due_date'].tolist(), schedule['amount'].tolist(),
+                schedule['principal'].tolist(), schedule['interest'].tolist())):
+            if k < len(tail) and tail[k].due_date == due_date:
+                status = tail[k].status
+            else:
+                status = PaymentStatus.LATE if due_date < today else PaymentStatus.PENDING
+            values = {
+                'due_date': due_date,
+                'amount': amount,
+                'principal_amount': principal_part,
+                'interest_amount': interest,
+                'status': status
+            }
+            if k < len(tail):
+                row = tail[k]
+                if (row.due_date, row.amount, row.principal, row.interest, row.status) != \
+                        (due_date, amount, principal_part, interest, status):
+                    updates.append({'id': row.id, **values})
+            else:
+                last_no += 1
+                inserts.append({'installment_no': last_no, **values})
+        
+        if updates:
+            # Bulk UPDATE by primary key
+            self.db.execute(update(Installment), updates)
+        if inserts:
+            bulk_insert(self.db, Installment.__table__, {
+                'payment_plan_id': plan.id,
+                **{column: [row[column] for row in inserts] for column in inserts[0]}
+            })
+        removed = [row.id for row in tail[count:]]
+        if removed:
+            self.db.execute(delete(PaymentNotification)
+                            .where(PaymentNotification.installment_id.in_(removed)))
+            PenaltyService(self.db).remove_installment_accruals(removed)
+            self.db.execute(delete(Installment).where(Installment.id.in_(removed)))
+        
+        plan.number_of_installments = len(rows) + len(inserts) - len(removed)
+        self.db.flush()
+        self._refresh_plan_counters([plan.id])
+        return {
+            'outstanding_principal': round(principal, 2),
+            'installments': count,
+            'updated': len(updates),
+            'inserted': len(inserts),
+            'deleted': len(removed),
+            'unchanged': min(count, len(tail)) - len(updates)
+        }
+    
     def get_payment_plan(self, plan_id: int) -> Optional[PaymentPlan]:
         """Get payment plan by ID"""
         return self.db.query(PaymentPlan).filter(PaymentPlan.id == plan_id).first()
@@ -93,6 +394,8 @@ class PaymentService:
             installment.payment_type = data['payment_type']
             installment.payment_reference = data.get('payment_reference')
             installment.notes = data.get('notes')
+            self.db.flush()
+            self._refresh_plan_counters([installment.payment_plan_id])
             
             self.db.commit()
             self.db.refresh(installment)
@@ -105,6 +408,8 @@ class PaymentService:
             installment.status = PaymentStatus.CANCELLED
             if notes:
                 installment.notes = notes
+            self.db.flush()
+            self._refresh_plan_counters([installment.payment_plan_id])
             self.db.commit()
             self.db.refresh(installment)
         return installment
@@ -114,11 +419,75 @@ class PaymentService:
         today = datetime.now().date()
         return self.db.query(Installment)\
                      .filter(and_(
-                         Installment.status == PaymentStatus.PENDING,
+                         Installment.status.in_([PaymentStatus.PENDING, PaymentStatus.LATE]),
                          Installment.due_date < today
                      ))\
                      .all()
     
+    def sweep_late_installments(self, as_of: Optional[date] = None) -> Dict[str, int]:
+        """Mark overdue installments LATE and queue one late notification for each.
+
+        Runs as a few set-based statements: move the overdue amounts from
+        pending to late on the plan counters, flip the statuses with one
+        UPDATE, then insert notifications for LATE installments that have
+        none yet.
+        """
+        as_of = as_of or date.today()
+        now = datetime.now()
+        installments = Installment.__table__
+        plans = PaymentPlan.__table__
+        notifications = PaymentNotification.__table__
+        
+        overdue = and_(installments.c.status == PaymentStatus.PENDING,
+                       installments.c.due_date < as_of)
+        
+        overdue_totals = select(
+            installments.c.payment_plan_id,
+            func.sum(installments.c.amount).label('amount'),
+            func.count(installments.c.id).label('count')
+        ).where(overdue).group_by(installments.c.payment_plan_id).subquery()
+        plans_updated = self.db.execute(
+            update(plans)
+            .where(plans.c.id == overdue_totals.c.payment_plan_id)
+            .values(
+                late_amount=func.round(plans.c.late_amount + overdue_totals.c.amount, 2),
+                late_count=plans.c.late_count + overdue_totals.c.count,
+                pending_amount=func.round(plans.c.pending_amount - overdue_totals.c.amount, 2),
+                pending_count=plans.c.pending_count - overdue_totals.c.count
+            )
+        ).rowcount
+        
+        marked_late = self.db.execute(
+            update(installments)
+            .where(overdue)
+            .values(status=PaymentStatus.LATE, updated_at=now)
+        ).rowcount
+        
+        already_notified = select(notifications.c.id).where(
+            notifications.c.installment_id == installments.c.id,
+            notifications.c.type == 'late'
+        ).exists()
+        message = sql_format(get_text("notifications.installment_late"),
+                             installment_no=installments.c.installment_no,
+                             plan_no=plans.c.plan_no,
+                             due_date=installments.c.due_date)
+        notifications_created = self.db.execute(
+            insert(notifications).from_select(
+                ['installment_id', 'type', 'message', 'sent_date', 'is_read'],
+                select(installments.c.id, literal('late'), message, literal(now), literal(False))
+                .select_from(installments.join(plans, installments.c.payment_plan_id == plans.c.id))
+                .where(installments.c.status == PaymentStatus.LATE, ~already_notified)
+            )
+        ).rowcount
+        
+        self.db.commit()
+        return {
+            'rows_affected': marked_late + notifications_created,
+            'installments_marked_late': marked_late,
+            'plans_updated': plans_updated,
+            'notifications_created': notifications_created
+        }
+    
     def get_upcoming_payments(self, days: int = 7) -> List[Installment]:
         """Get payments due in the next X days"""
         today = datetime.now().date()
@@ -170,25 +539,28 @@ class PaymentService:
                                   31, 30, 31, 30, 31, 31, 30, 31, 30, 31][month - 1])
         return date(year, month, day)
     
+    def _refresh_plan_counters(self, plan_ids: List[int]) -> None:
+        """Recompute the stored installment counters of the given plans"""
+        if plan_ids:
+            self.db.execute(plan_counters_update(plan_ids))
+    
     def calculate_payment_summary(self, plan_id: int) -> Dict[str, Any]:
         """Calculate payment summary for a plan"""
         plan = self.get_payment_plan(plan_id)
         if not plan:
             return {}
-            
-        total_paid = sum(i.amount for i in plan.installments if i.status == PaymentStatus.PAID)
-        total_pending = sum(i.amount for i in plan.installments if i.status == PaymentStatus.PENDING)
-        late_payments = [i for i in plan.installments if i.is_late]
         
         return {
             'total_amount': plan.total_amount,
             'down_payment': plan.down_payment,
-            'total_paid': total_paid,
-            'total_pending': total_pending,
+            'total_paid': plan.paid_amount,
+            'total_pending': plan.pending_amount,
             'number_of_installments': plan.number_of_installments,
-            'completed_installments': len([i for i in plan.installments if i.status == PaymentStatus.PAID]),
-            'pending_installments': len([i for i in plan.installments if i.status == PaymentStatus.PENDING]),
-            'late_payments': len(late_payments),
-            'total_late_amount': sum(i.amount for i in late_payments),
+            'completed_installments': plan.paid_count,
+            'pending_installments': plan.pending_count,
+            'late_payments': plan.late_count,
+            'total_late_amount': plan.late_amount,
+            'next_due_date': plan.next_due_date,
+            'penalty_amount': plan.penalty_amount or 0.0,
             'is_completed': plan.is_completed
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,204 @@
+from datetime import datetime, date
+import calendar
+from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.dialects.sqlite import insert
+from models.employee import Employee, AttendanceRecord, EmployeeStatus
+from models.payroll import PayrollRun, PayrollLine
+from services.overtime_rules import get_overtime_rules, get_rules_version, totals_by_employee
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+
+def month_period(day: date) -> Tuple[date, date]:
+    """First and last day of the pay period (calendar month) containing day"""
+    return day.replace(day=1), day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+def is_pay_period(period_start: date, period_end: date) -> bool:
+    """Whether the range is exactly one pay period"""
+    return month_period(period_start) == (period_start, period_end)
+
+class PayrollService:
+    """Persisted payroll runs, recalculating only lines whose inputs changed"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_payroll_run(self, period_start: date, period_end: date) -> Optional[PayrollRun]:
+        return self.db.query(PayrollRun).filter(
+            PayrollRun.period_start == period_start,
+            PayrollRun.period_end == period_end
+        ).first()
+
+    def calculate_payroll_run(self, period_start: date, period_end: date) -> PayrollRun:
+        """Create the run for a pay period, or bring an existing one up to date.
+
+        Runs exist only for pay periods (calendar months); other ranges are
+        calculated with calculate_employee_totals without storing anything.
+        A new run gets a line for every active employee and everyone with
+        attendance in the period. An existing run only recalculates lines
+        marked dirty since they were last calculated, or all of them if the
+        overtime rules file changed.
+        """
+        if not is_pay_period(period_start, period_end):
+            raise ValueError(f"Not a pay period: {period_start} - {period_end}")
+
+        run = self.get_payroll_run(period_start, period_end)
+        if run is None:
+            run = PayrollRun(period_start=period_start, period_end=period_end)
+            self.db.add(run)
+            self.db.flush()
+
+            active = self.db.query(Employee.id).filter(Employee.status == EmployeeStatus.ACTIVE)
+            attended = self.db.query(AttendanceRecord.employee_id).filter(
+                AttendanceRecord.date >= period_start,
+                AttendanceRecord.date <= period_end
+            )
+            employee_ids = {row[0] for row in active.union(attended).all()}
+            self.db.add_all([
+                PayrollLine(payroll_run_id=run.id, employee_id=employee_id, is_dirty=True)
+                for employee_id in employee_ids
+            ])
+            self.db.flush()
+
+        if not run.is_closed:
+            self._recalculate_dirty_lines(run)
+
+        self.db.commit()
+        self.db.refresh(run)
+        return run
+
+    def get_payroll_lines(self, run_id: int, employee_id: Optional[int] = None) -> List[Tuple]:
+        """Return (employee_id, full name, hours and amounts) rows of a run, or one employee's"""
+        query = self.db.query(
+            PayrollLine.employee_id,
+            (Employee.first_name + ' ' + Employee.last_name).label('employee_name'),
+            PayrollLine.regular_hours,
+            PayrollLine.overtime_hours,
+            PayrollLine.regular_amount,
+            PayrollLine.overtime_amount,
+            PayrollLine.premium_hours,
+            PayrollLine.premium_amount,
+            PayrollLine.total_amount
+        ).join(Employee, PayrollLine.employee_id == Employee.id)\
+         .filter(PayrollLine.payroll_run_id == run_id)
+        if employee_id:
+            query = query.filter(PayrollLine.employee_id == employee_id)
+        return query.order_by(Employee.first_name, Employee.last_name).all()
+
+    def close_payroll_run(self, run_id: int) -> Optional[PayrollRun]:
+        """Freeze a run so later edits no longer change its lines"""
+        run = self.db.query(PayrollRun).filter(PayrollRun.id == run_id).first()
+        if run and not run.is_closed:
+            self._recalculate_dirty_lines(run)
+            run.closed_at = datetime.now()
+            self.db.commit()
+            self.db.refresh(run)
+        return run
+
+    def mark_attendance_dirty(self, changes: Iterable[Tuple[int, date]]) -> None:
+        """Mark lines of open runs covering the changed (employee_id, date) pairs.
+
+        Runs in the caller's transaction; a line is added if the employee
+        had none in that run yet.
+        """
+        changes = list(changes)
+        if not changes:
+            return
+
+        open_runs = self.db.query(PayrollRun.id, PayrollRun.period_start, PayrollRun.period_end)\
+                           .filter(PayrollRun.closed_at.is_(None))\
+                           .all()
+        affected = {
+            (run_id, employee_id)
+            for employee_id, day in changes
+            for run_id, period_start, period_end in open_runs
+            if period_start <= day <= period_end
+        }
+        if not affected:
+            return
+
+        stmt = insert(PayrollLine.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['payroll_run_id', 'employee_id'],
+            set_={'is_dirty': True}
+        )
+        self.db.execute(stmt, [
+            {'payroll_run_id': run_id, 'employee_id': employee_id, 'is_dirty': True}
+            for run_id, employee_id in affected
+        ])
+
+    def mark_employee_dirty(self, employee_id: int) -> None:
+        """Mark all of an employee's lines in open runs, e.g. after a rate or position change"""
+        open_runs = self.db.query(PayrollRun.id).filter(PayrollRun.closed_at.is_(None))
+        self.db.query(PayrollLine)\
+               .filter(PayrollLine.employee_id == employee_id,
+                       PayrollLine.payroll_run_id.in_(open_runs.scalar_subquery()))\
+               .update({PayrollLine.is_dirty: True}, synchronize_session=False)
+
+    def calculate_employee_totals(self,
+                                  employee_ids: Iterable[int],
+                                  period_start: date,
+                                  period_end: date) -> Dict[int, Dict[str, float]]:
+        """Evaluate the overtime rules over the employees' attendance in a period"""
+        employee_ids = list(employee_ids)
+        rows = self.db.query(
+            AttendanceRecord.employee_id,
+            Employee.position,
+            AttendanceRecord.time_in,
+            AttendanceRecord.time_out,
+            Employee.hourly_rate
+        ).join(Employee, AttendanceRecord.employee_id == Employee.id)\
+         .filter(
+            AttendanceRecord.employee_id.in_(employee_ids),
+            AttendanceRecord.date >= period_start,
+            AttendanceRecord.date <= period_end
+         ).all()
+        if not rows:
+            return {}
+
+        columns = list(zip(*rows))
+        result = get_overtime_rules().evaluate(*columns)
+        return totals_by_employee(columns[0], result)
+
+    def _recalculate_dirty_lines(self, run: PayrollRun) -> int:
+        rules_version = get_rules_version()
+        if run.rules_version != rules_version:
+            self.db.query(PayrollLine)\
+                   .filter(PayrollLine.payroll_run_id == run.id)\
+                   .update({PayrollLine.is_dirty: True}, synchronize_session=False)
+            run.rules_version = rules_version
+
+        dirty = dict(self.db.query(PayrollLine.employee_id, PayrollLine.id).filter(
+            PayrollLine.payroll_run_id == run.id,
+            PayrollLine.is_dirty == True
+        ).all())
+        if not dirty:
+            return 0
+
+        totals = self.calculate_employee_totals(dirty, run.period_start, run.period_end)
+        rates = dict(self.db.query(Employee.id, Employee.hourly_rate)
+                            .filter(Employee.id.in_(dirty)).all())
+
+        now = datetime.now()
+        values = []
+        for employee_id, line_id in dirty.items():
+            line_totals = totals.get(employee_id, {})
+            premium_minutes = (line_totals.get('weekend_minutes', 0.0) +
+                               line_totals.get('holiday_minutes', 0.0))
+            values.append({
+                'id': line_id,
+                'hourly_rate': rates.get(employee_id) or 0.0,
+                'regular_hours': line_totals.get('regular_minutes', 0.0) / 60,
+                'overtime_hours': line_totals.get('overtime_minutes', 0.0) / 60,
+                'premium_hours': premium_minutes / 60,
+                'night_hours': line_totals.get('night_minutes', 0.0) / 60,
+                'regular_amount': line_totals.get('regular_amount', 0.0),
+                'overtime_amount': line_totals.get('overtime_amount', 0.0),
+                'premium_amount': line_totals.get('premium_amount', 0.0),
+                'total_amount': line_totals.get('total_amount', 0.0),
+                'is_dirty': False,
+                'calculated_at': now
+            })
+
+        # Bulk UPDATE by primary key
+        self.db.execute(update(PayrollLine), values)
+        return len(values)
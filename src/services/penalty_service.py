@@ -0,0 +1,188 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, select, update, delete, func, cast, Integer
+from sqlalchemy.dialects.sqlite import insert
+from core.database import bulk_insert
+from models.payment import PaymentPlan, Installment, PaymentStatus, PenaltyAccrual, PenaltyPeriod
+from typing import Dict, Any, List, Optional
+import numpy as np
+
+# julianday() of 1970-01-01, to get day numbers numpy reads as datetime64[D]
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+def accrue_penalties(due_days: np.ndarray, paid_days: np.ndarray, amounts: np.ndarray,
+                     annual_rates: np.ndarray, period_start: int, period_end: int):
+    """Overdue days and penalty interest of many installments within one period.
+
+    Days are day numbers (days since 1970-01-01); paid_days is -1 for unpaid
+    installments. An installment is overdue from the day after its due date
+    until the day before it was paid, and accrues amount * rate / 365 for
+    every overdue day between period_start and period_end inclusive.
+    Returns (days_late, penalty) arrays, penalty rounded to kuruş.
+    """
+    first = np.maximum(due_days + 1, period_start)
+    last = np.where(paid_days >= 0, np.minimum(paid_days - 1, period_end), period_end)
+    days = np.maximum(last - first + 1, 0)
+    penalty = np.round(amounts * annual_rates / 100 / 365 * days, 2)
+    return days, penalty
+
+class PenaltyService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def accrue_period(self, period_start: date, period_end: date) -> Dict[str, Any]:
+        """Compute and post penalty interest of every overdue installment for a period.
+
+        Replaces whatever was posted for the period before, so running it
+        again (e.g. later in the same month) is idempotent. Plan penalty
+        totals are refreshed for every plan whose accruals changed, and the
+        period is recorded as accrued through `period_end`.
+        """
+        installments = Installment.__table__
+        plans = PaymentPlan.__table__
+        accruals = PenaltyAccrual.__table__
+
+        def day_number(column):
+            return cast(func.julianday(func.date(column)) - UNIX_EPOCH_JULIAN_DAY, Integer)
+
+        # Open installments due before the period ends, and ones paid late
+        # within the period
+        rows = self.db.execute(
+            select(
+                installments.c.id,
+                installments.c.payment_plan_id,
+                day_number(installments.c.due_date),
+                func.coalesce(day_number(installments.c.payment_date), -1),
+                installments.c.amount,
+                plans.c.penalty_rate
+            ).select_from(installments.join(plans, installments.c.payment_plan_id == plans.c.id))
+            .where(
+                plans.c.penalty_rate > 0,
+                installments.c.due_date < period_end,
+                or_(
+                    installments.c.status.in_([PaymentStatus.PENDING, PaymentStatus.LATE]),
+                    and_(installments.c.status == PaymentStatus.PAID,
+                         installments.c.payment_date >= period_start,
+                         func.date(installments.c.payment_date) > installments.c.due_date)
+                )
+            )
+        ).all()
+
+        if rows:
+            ids, plan_ids, due_days, paid_days, amounts, rates = (np.array(c) for c in zip(*rows))
+        else:
+            ids = plan_ids = due_days = paid_days = np.zeros(0, dtype=np.int64)
+            amounts = rates = np.zeros(0)
+        epoch = np.datetime64('1970-01-01', 'D')
+        days, penalty = accrue_penalties(
+            due_days.astype(np.int64), paid_days.astype(np.int64),
+            amounts.astype(float), rates.astype(float),
+            int((np.datetime64(period_start, 'D') - epoch).astype(np.int64)),
+            int((np.datetime64(period_end, 'D') - epoch).astype(np.int64))
+        )
+        accrued = np.flatnonzero(penalty > 0)
+
+        replaced = self.db.execute(delete(accruals).where(accruals.c.period_start == period_start)).rowcount
+        bulk_insert(self.db, accruals, {
+            'payment_plan_id': plan_ids[accrued].tolist(),
+            'installment_id': ids[accrued].tolist(),
+            'period_start': period_start,
+            'period_end': period_end,
+            'days_late': days[accrued].tolist(),
+            'rate': rates[accrued].tolist(),
+            'base_amount': amounts[accrued].tolist(),
+            'amount': penalty[accrued].tolist()
+        })
+
+        # Plans with a penalty total or an accrual in this period; the
+        # correlated sum walks the payment_plan_id index
+        plans_updated = self.db.execute(
+            update(plans)
+            .where(or_(plans.c.penalty_amount != 0,
+                       plans.c.id.in_(select(accruals.c.payment_plan_id)
+                                      .where(accruals.c.period_start == period_start))))
+            .values(penalty_amount=func.round(
+                select(func.coalesce(func.sum(accruals.c.amount), 0.0))
+                .where(accruals.c.payment_plan_id == plans.c.id)
+                .scalar_subquery(), 2))
+        ).rowcount
+
+        # Recorded even when nothing accrued, so run_accruals sees the period closed
+        marker = insert(PenaltyPeriod.__table__).values(
+            period_start=period_start, accrued_through=period_end, updated_at=datetime.now())
+        self.db.execute(marker.on_conflict_do_update(
+            index_elements=['period_start'],
+            set_={'accrued_through': marker.excluded.accrued_through,
+                  'updated_at': marker.excluded.updated_at}))
+
+        self.db.commit()
+        return {
+            'rows_affected': len(accrued),
+            'period_start': period_start,
+            'period_end': period_end,
+            'installments_accrued': len(accrued),
+            'accruals_replaced': replaced,
+            'plans_updated': plans_updated,
+            'penalty_amount': round(float(penalty[accrued].sum()), 2)
+        }
+
+    def remove_installment_accruals(self, installment_ids: List[int]) -> int:
+        """Delete the accruals of installments being deleted and refresh their plans' penalty totals.
+
+        For schedule changes that drop installments; runs in the caller's
+        transaction and does not commit. Returns the accruals deleted.
+        """
+        if not installment_ids:
+            return 0
+        accruals = PenaltyAccrual.__table__
+        plans = PaymentPlan.__table__
+        plan_ids = self.db.execute(
+            select(accruals.c.payment_plan_id).where(accruals.c.installment_id.in_(installment_ids)).distinct()
+        ).scalars().all()
+        removed = self.db.execute(delete(accruals).where(accruals.c.installment_id.in_(installment_ids))).rowcount
+        if plan_ids:
+            self.db.execute(
+                update(plans)
+                .where(plans.c.id.in_(plan_ids))
+                .values(penalty_amount=func.round(
+                    select(func.coalesce(func.sum(accruals.c.amount), 0.0))
+                    .where(accruals.c.payment_plan_id == plans.c.id)
+                    .scalar_subquery(), 2))
+            )
+        return removed
+
+    def accrue_month(self, as_of: Optional[date] = None) -> Dict[str, Any]:
+        """Accrue the month of `as_of`, through `as_of`"""
+        as_of = as_of or date.today()
+        return self.accrue_period(as_of.replace(day=1), as_of)
+
+    def run_accruals(self, as_of: Optional[date] = None) -> Dict[str, Any]:
+        """Daily job: accrue the month to date, closing last month first if needed.
+
+        If the previous month was not accrued through its final day (the
+        application was not run at month end), it is accrued in full first.
+        """
+        as_of = as_of or date.today()
+        month_start = as_of.replace(day=1)
+        previous_end = month_start - timedelta(days=1)
+        previous_start = previous_end.replace(day=1)
+        posted_through = self.db.query(PenaltyPeriod.accrued_through)\
+                                .filter(PenaltyPeriod.period_start == previous_start)\
+                                .scalar()
+
+        result = {'rows_affected': 0}
+        if posted_through is None or posted_through < previous_end:
+            closed = self.accrue_period(previous_start, previous_end)
+            result['previous_month'] = closed
+            result['rows_affected'] += closed['rows_affected']
+        current = self.accrue_period(month_start, as_of)
+        result['current_month'] = current
+        result['rows_affected'] += current['rows_affected']
+        return result
+
+    def get_plan_accruals(self, plan_id: int):
+        """Posted accruals of a plan, latest period first"""
+        return self.db.query(PenaltyAccrual)\
+                      .filter(PenaltyAccrual.payment_plan_id == plan_id)\
+                      .order_by(PenaltyAccrual.period_start.desc(), PenaltyAccrual.installment_id)\
+                      .all()
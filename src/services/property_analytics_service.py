@@ -0,0 +1,274 @@
+from datetime import date
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from core.database import table_version
+from models.property import Property, Deed
+from typing import List, Optional, Dict, Any, Sequence
+import numpy as np
+
+# Combines a property index and a day number into one sortable key
+DAY_KEY = 1_000_000
+
+# Results by (query, arguments), each stored with the table version it was
+# computed from; shared by every service instance
+_cache: Dict[Any, Any] = {}
+
+def _day_numbers(values) -> np.ndarray:
+    """Days since 1970-01-01 of dates or datetimes"""
+    return np.array(values, dtype='datetime64[D]').astype(np.int64)
+
+def _group_codes(columns: List[np.ndarray], count: int):
+    """Group index of every row and the first row of each group, for grouping by several columns"""
+    if not columns:
+        return np.zeros(count, dtype=np.int64), np.zeros(1 if count else 0, dtype=np.int64)
+    codes, sizes = [], []
+    for column in columns:
+        uniques, inverse = np.unique(column, return_inverse=True)
+        codes.append(inverse)
+        sizes.append(len(uniques))
+    combined = np.ravel_multi_index(codes, sizes)
+    _, first, inverse = np.unique(combined, return_index=True, return_inverse=True)
+    return inverse, first
+
+class PropertyAnalyticsService:
+    """Portfolio value, cost, unrealized gain and rent yield across all properties.
+
+    Properties and deeds are loaded in bulk and the ratios and time series
+    computed with numpy. Results are cached until a property or deed row
+    changes.
+    """
+
+    GROUPINGS = ('city', 'type', 'status')
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_summary(self, group_by: Sequence[str] = ('city',)) -> List[Dict[str, Any]]:
+        """Value, cost, gain and rent per group of properties.
+
+        Groups combine city, type and status, e.g. ('city', 'type'). A
+        property's cost is its purchase price, or the price of its latest
+        deed; its value is the current valuation, or its cost when it was
+        never valued. gain_rate and rent_yield only count properties that
+        have the figures they divide.
+        """
+        group_by = self._check_groupings(group_by)
+        return self._cached(('summary', group_by), lambda data: self._summary(data, group_by))
+
+    def get_totals(self) -> Dict[str, Any]:
+        """Portfolio totals over every property"""
+        summary = self.get_summary(())
+        return summary[0] if summary else self._summary_row({}, 0, *([0.0] * 7))
+
+    def get_value_series(self,
+                         group_by: Sequence[str] = (),
+                         start_date: Optional[date] = None,
+                         end_date: Optional[date] = None,
+                         frequency: str = 'year') -> Dict[str, Any]:
+        """Portfolio value and cost at the end of each year or month.
+
+        A property's value at a date is its latest known figure by then:
+        deed purchase prices at their registration dates, then the current
+        valuation from the date it was last updated. The range defaults to
+        the first deed through today.
+        """
+        if frequency not in ('year', 'month'):
+            raise ValueError(f"Unknown frequency: {frequency}")
+        group_by = self._check_groupings(group_by)
+        key = ('series', group_by, start_date, end_date, frequency)
+        return self._cached(key, lambda data: self._series(data, group_by, start_date, end_date, frequency))
+
+    def _check_groupings(self, group_by: Sequence[str]) -> tuple:
+        if isinstance(group_by, str):
+            group_by = (group_by,)
+        unknown = set(group_by) - set(self.GROUPINGS)
+        if unknown:
+            raise ValueError(f"Unknown grouping: {', '.join(sorted(unknown))}")
+        return tuple(group_by)
+
+    def _cached(self, key, compute):
+        version = table_version(self.db, Property.__table__, Deed.__table__)
+        if key not in _cache or _cache[key][0] != version:
+            loaded = _cache.get('data')
+            if loaded is None or loaded[0] != version:
+                loaded = (version, self._load())
+                _cache.clear()
+                _cache['data'] = loaded
+            _cache[key] = (version, compute(loaded[1]))
+        return _cache[key][1]
+
+    def _load(self) -> Dict[str, np.ndarray]:
+        """Every property and priced deed as column arrays"""
+        properties = Property.__table__
+        deeds = Deed.__table__
+
+        rows = self.db.execute(
+            select(properties.c.id, properties.c.city, properties.c.type, properties.c.status,
+                   properties.c.area, properties.c.purchase_price, properties.c.current_value,
+                   properties.c.monthly_rent, properties.c.created_at, properties.c.updated_at)
+            .order_by(properties.c.id)
+        ).all()
+        ids, cities, types, statuses, areas, purchase, current, rent, created, updated = \
+            (list(c) for c in zip(*rows)) if rows else ([] for _ in range(10))
+
+        deed_rows = self.db.execute(
+            select(deeds.c.property_id, deeds.c.registration_date, deeds.c.purchase_price)
+            .where(deeds.c.purchase_price.isnot(None))
+        ).all()
+        deed_property, deed_date, deed_price = \
+            (list(c) for c in zip(*deed_rows)) if deed_rows else ([], [], [])
+
+        ids = np.array(ids, dtype=np.int64)
+        deed_property = np.array(deed_property, dtype=np.int64)
+        # Deeds left behind by deleted properties are skipped
+        known = np.isin(deed_property, ids)
+
+        def objects(values):
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+            return array
+
+        return {
+            'city': objects(cities),
+            'type': objects(types),
+            'status': objects(statuses),
+            'area': np.array(areas, dtype=float),
+            'purchase_price': np.array(purchase, dtype=float),
+            'current_value': np.array(current, dtype=float),
+            'monthly_rent': np.array(rent, dtype=float),
+            'created_day': _day_numbers(created),
+            'valued_day': _day_numbers(updated),
+            'deed_property': np.searchsorted(ids, deed_property[known]),
+            'deed_day': _day_numbers(deed_date)[known],
+            'deed_price': np.array(deed_price, dtype=float)[known]
+        }
+
+    def _grouping(self, data, group_by):
+        """Group index of each property and the key values of each group"""
+        # Enums have no ordering, so group them by their values
+        columns = [
+            np.array([v.value if v is not None else '' for v in data[g]], dtype=object) if g != 'city'
+            else np.array([v or '' for v in data[g]], dtype=object)
+            for g in group_by
+        ]
+        inverse, first = _group_codes(columns, len(data['area']))
+        keys = [{g: data[g][i] for g in group_by} for i in first]
+        return inverse, keys
+
+    def _latest_deed_price(self, data) -> np.ndarray:
+        """Price of each property's latest priced deed, NaN if it has none"""
+        price = np.full(len(data['area']), np.nan)
+        order = np.lexsort((data['deed_day'], data['deed_property']))
+        deed_property = data['deed_property'][order]
+        # Sorted by property then date, so each property's last row is its latest deed
+        last = np.append(deed_property[1:] != deed_property[:-1], True) if len(order) else order.astype(bool)
+        price[deed_property[last]] = data['deed_price'][order][last]
+        return price
+
+    def _summary(self, data, group_by) -> List[Dict[str, Any]]:
+        count = len(data['area'])
+        if count == 0:
+            return []
+        inverse, keys = self._grouping(data, group_by)
+
+        cost = np.where(np.isnan(data['purchase_price']), self._latest_deed_price(data),
+                        data['purchase_price'])
+        value = np.where(np.isnan(data['current_value']), cost, data['current_value'])
+        annual_rent = np.nan_to_num(data['monthly_rent']) * 12
+        has_gain = ~np.isnan(cost) & ~np.isnan(data['current_value'])
+        has_rent = (annual_rent > 0) & ~np.isnan(value)
+
+        def total(weights, mask=None):
+            weights = np.nan_to_num(weights)
+            if mask is not None:
+                weights = np.where(mask, weights, 0.0)
+            return np.bincount(inverse, weights=weights, minlength=len(keys))
+
+        measures = (
+            np.bincount(inverse, minlength=len(keys)),
+            total(data['area']),
+            total(value),
+            total(cost),
+            total(data['current_value'] - cost, has_gain),
+            total(cost, has_gain),
+            total(annual_rent),
+            total(value, has_rent)
+        )
+        return [self._summary_row(key, *(m[i] for m in measures)) for i, key in enumerate(keys)]
+
+    def _summary_row(self, key, count, area, value, cost, gain, gain_cost, annual_rent, rented_value):
+        return {
+            **key,
+            'properties': int(count),
+            'area': round(float(area), 2),
+            'value': round(float(value), 2),
+            'cost': round(float(cost), 2),
+            'unrealized_gain': round(float(gain), 2),
+            'gain_rate': float(gain / gain_cost) if gain_cost else None,
+            'annual_rent': round(float(annual_rent), 2),
+            'rent_yield': float(annual_rent / rented_value) if rented_value else None,
+            'value_per_m2': round(float(value / area), 2) if area else None
+        }
+
+    def _series(self, data, group_by, start_date, end_date, frequency) -> Dict[str, Any]:
+        count = len(data['area'])
+        end_date = end_date or date.today()
+        if start_date is None:
+            first_day = min(data['deed_day'].min(initial=np.iinfo(np.int64).max),
+                            data['created_day'].min(initial=np.iinfo(np.int64).max))
+            start_date = (np.datetime64(int(first_day), 'D').astype(object)
+                          if count else end_date)
+        unit = 'Y' if frequency == 'year' else 'M'
+        period_ends = np.arange(np.datetime64(start_date, unit), np.datetime64(end_date, unit) + 1) + 1
+        period_days = np.minimum(period_ends.astype('datetime64[D]').astype(np.int64) - 1,
+                                 _day_numbers([end_date])[0])
+        periods = period_days.astype('datetime64[D]').astype(object).tolist()
+        if count == 0:
+            return {'periods': periods, 'groups': []}
+
+        inverse, keys = self._grouping(data, group_by)
+        index = np.arange(count)
+
+        # Cost events: priced deeds, or the purchase price from when the
+        # property was recorded if it has none. Value events add the
+        # current valuation from its last update.
+        latest_deed = self._latest_deed_price(data)
+        own_cost = ~np.isnan(data['purchase_price']) & np.isnan(latest_deed)
+        cost_property = np.concatenate([data['deed_property'], index[own_cost]])
+        cost_day = np.concatenate([data['deed_day'], data['created_day'][own_cost]])
+        cost_amount = np.concatenate([data['deed_price'], data['purchase_price'][own_cost]])
+        valued = ~np.isnan(data['current_value'])
+        value_property = np.concatenate([cost_property, index[valued]])
+        value_day = np.concatenate([cost_day, data['valued_day'][valued]])
+        value_amount = np.concatenate([cost_amount, data['current_value'][valued]])
+
+        def as_of_periods(event_property, event_day, amount):
+            """Latest amount of every property at every period end (properties x periods)"""
+            event_keys = event_property * DAY_KEY + event_day
+            order = np.argsort(event_keys, kind='stable')
+            event_keys, amount = event_keys[order], amount[order]
+            last = np.searchsorted(event_keys, index[:, None] * DAY_KEY + period_days[None, :], side='right') - 1
+            held = (last >= 0) & (event_keys[np.maximum(last, 0)] // DAY_KEY == index[:, None])
+            return np.where(held, amount[np.maximum(last, 0)], 0.0), held
+
+        values, held = as_of_periods(value_property, value_day, value_amount)
+        costs, _ = as_of_periods(cost_property, cost_day, cost_amount)
+
+        def by_group(matrix):
+            totals = np.zeros((len(keys), len(periods)))
+            np.add.at(totals, inverse, matrix)
+            return totals
+
+        value_totals, cost_totals, held_counts = by_group(values), by_group(costs), by_group(held)
+        return {
+            'periods': periods,
+            'groups': [
+                {
+                    **key,
+                    'properties': held_counts[i].astype(int).tolist(),
+                    'value': np.round(value_totals[i], 2).tolist(),
+                    'cost': np.round(cost_totals[i], 2).tolist()
+                }
+                for i, key in enumerate(keys)
+            ]
+        }
@@ -0,0 +1,179 @@
+from collections import OrderedDict
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, case, and_
+from core.database import table_version
+from models.property import Property, Deed, property_price
+from services.property_service import properties_with_features
+from typing import List, Optional, Dict, Any, Tuple
+
+# Lower bounds of the area (m²) and price buckets counted for the range facets
+AREA_BUCKETS = (0, 50, 100, 150, 200, 300, 500)
+PRICE_BUCKETS = (0, 1_000_000, 2_500_000, 5_000_000, 10_000_000, 25_000_000)
+
+# Facet counts and totals by filters, and the property choices, for the
+# table version they were read at; shared by every service instance
+MAX_CACHED_SEARCHES = 256
+_cache: 'OrderedDict[Any, Any]' = OrderedDict()
+_cache_version = {'version': None}
+
+def _as_list(value) -> Optional[list]:
+    if value is None or value == '' or value == []:
+        return None
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+def _bucket(column, bounds):
+    """Index of the bucket a value falls in, by lower bounds"""
+    return case(*[(column >= bound, i) for i, bound in reversed(list(enumerate(bounds)))])
+
+class PropertySearchService:
+    """Faceted property search: a page of matches plus counts for every facet value.
+
+    Each facet is counted with every filter except its own, so the counts
+    show what selecting another value would return. Counts are cached
+    until a property or deed changes.
+    """
+
+    FACETS = ('city', 'district', 'type', 'status', 'ownership_type')
+    RANGES = {'area': AREA_BUCKETS, 'price': PRICE_BUCKETS}
+    SORTS = ('property_no', 'title', 'city', 'area', 'price', 'created_at')
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(self,
+               filters: Optional[Dict[str, Any]] = None,
+               page: int = 1,
+               page_size: int = 50,
+               sort: str = 'property_no') -> Dict[str, Any]:
+        """Matching properties and facet counts.
+
+        Filters: city, district, type, status and ownership_type (of the
+        active deed) take a value or a list of values; min_area, max_area,
+        min_price and max_price bound the area and the current value (the
+        purchase price when there is none); features lists feature names.
+        Sort by any of SORTS, with a leading '-' for descending order.
+        """
+        filters = {k: v for k, v in (filters or {}).items() if _as_list(v) is not None}
+        conditions = self._conditions(filters)
+
+        descending = sort.startswith('-')
+        sort_key = sort.lstrip('-')
+        if sort_key not in self.SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        order = self._price() if sort_key == 'price' else getattr(Property, sort_key)
+
+        items = self.db.query(Property)\
+                       .filter(*conditions.values())\
+                       .order_by(order.desc() if descending else order, Property.id)\
+                       .offset((max(page, 1) - 1) * page_size)\
+                       .limit(page_size)\
+                       .all()
+        counts = self._cached_counts(filters, conditions)
+        return {
+            'items': items,
+            'total': counts['total'],
+            'page': max(page, 1),
+            'page_size': page_size,
+            'facets': counts['facets']
+        }
+
+    def _price(self):
+        return property_price()
+
+    def _active_deed(self, *criteria):
+        return select(Deed.id).where(Deed.property_id == Property.id, Deed.is_active == True, *criteria).exists()
+
+    def _conditions(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """SQL condition of each filter, keyed by the facet it narrows"""
+        conditions = {}
+        for facet in ('city', 'district', 'type', 'status'):
+            if facet in filters:
+                conditions[facet] = getattr(Property, facet).in_(_as_list(filters[facet]))
+        if 'ownership_type' in filters:
+            conditions['ownership_type'] = self._active_deed(
+                Deed.ownership_type.in_(_as_list(filters['ownership_type'])))
+        for name, column in (('area', Property.area), ('price', self._price())):
+            bounds = []
+            if f'min_{name}' in filters:
+                bounds.append(column >= filters[f'min_{name}'])
+            if f'max_{name}' in filters:
+                bounds.append(column <= filters[f'max_{name}'])
+            if bounds:
+                conditions[name] = and_(*bounds)
+        if 'features' in filters:
+            conditions['features'] = Property.id.in_(properties_with_features(_as_list(filters['features'])))
+        return conditions
+
+    def property_choices(self) -> List[Tuple[int, str, str]]:
+        """(id, property_no, title) of every property, for property pickers.
+
+        Cached with the facet counts, so the same list object is returned
+        until a property or deed changes.
+        """
+        return self._cached('property_choices', lambda: [
+            tuple(row) for row in self.db.query(Property.id, Property.property_no, Property.title)
+                                         .order_by(Property.property_no)
+        ])
+
+    def _cached_counts(self, filters: Dict[str, Any], conditions: Dict[str, Any]) -> Dict[str, Any]:
+        key = tuple(sorted((k, tuple(map(str, _as_list(v)))) for k, v in filters.items()))
+        return self._cached(key, lambda: {
+            'total': self.db.query(func.count(Property.id)).filter(*conditions.values()).scalar(),
+            'facets': self._facet_counts(conditions)
+        })
+
+    def _cached(self, key, compute):
+        version = table_version(self.db, Property.__table__, Deed.__table__)
+        if _cache_version['version'] != version:
+            _cache.clear()
+            _cache_version['version'] = version
+
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+        value = _cache[key] = compute()
+        if len(_cache) > MAX_CACHED_SEARCHES:
+            _cache.popitem(last=False)
+        return value
+
+    def _facet_counts(self, conditions: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        def others(facet):
+            return [condition for name, condition in conditions.items() if name != facet]
+
+        facets = {}
+        for facet in ('city', 'district', 'type', 'status'):
+            column = getattr(Property, facet)
+            rows = self.db.query(column, func.count(Property.id))\
+                          .filter(column.isnot(None), *others(facet))\
+                          .group_by(column)\
+                          .order_by(func.count(Property.id).desc())\
+                          .all()
+            facets[facet] = [{'value': value, 'count': count} for value, count in rows if value != '']
+
+        # Shared ownership gives a property several active deeds, so count
+        # distinct properties
+        rows = self.db.query(Deed.ownership_type, func.count(func.distinct(Property.id)))\
+                      .join(Deed, and_(Deed.property_id == Property.id, Deed.is_active == True))\
+                      .filter(*others('ownership_type'))\
+                      .group_by(Deed.ownership_type)\
+                      .order_by(func.count(func.distinct(Property.id)).desc())\
+                      .all()
+        facets['ownership_type'] = [{'value': value, 'count': count} for value, count in rows]
+
+        for name, bounds in self.RANGES.items():
+            column = Property.area if name == 'area' else self._price()
+            bucket = _bucket(column, bounds)
+            rows = dict(self.db.query(bucket, func.count(Property.id))
+                               .filter(column.isnot(None), *others(name))
+                               .group_by(bucket)
+                               .all())
+            facets[name] = [
+                {
+                    'min': bound,
+                    'max': bounds[i + 1] if i + 1 < len(bounds) else None,
+                    'count': rows.get(i, 0)
+                }
+                for i, bound in enumerate(bounds)
+            ]
+        return facets
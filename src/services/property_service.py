@@ -1,23 +1,44 @@
 from datetime import datetime, date
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from models.property import Property, Deed, PropertyDocument
+from pathlib import Path
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import or_, select, update, func, intersect
+from models.property import Property, Deed, PropertyDocument, DocumentBlob, PropertyFeature, DocumentExpiryAlert
+from models.property import normalize_features, normalize_feature_name, ownership_interval_update
 from models.property import PropertyType, PropertyStatus, OwnershipType, DocumentType
-from typing import List, Optional, Dict, Any
+from services.document_store import DocumentStore, ProgressCallback, hash_file
+from services.thumbnail_cache import get_thumbnail_generator
+from typing import List, Optional, Dict, Any, Iterable, Union
 import json
 import os
-import shutil
+
+def properties_with_features(features: Union[Iterable[str], Dict[str, Any]]):
+    """Ids of properties having all of the features: one (name, property_id) index range per feature.
+
+    `features` lists feature names, or maps names to the value they must
+    have (None for any value).
+    """
+    if not isinstance(features, dict):
+        features = {name: None for name in features}
+    having = []
+    for name, value in features.items():
+        query = select(PropertyFeature.property_id)\
+            .where(PropertyFeature.name == normalize_feature_name(name))
+        if value is not None:
+            query = query.where(PropertyFeature.value == str(value))
+        having.append(query)
+    return intersect(*having) if len(having) > 1 else having[0]
 
 class PropertyService:
     def __init__(self, db: Session):
         self.db = db
+        self.document_store = DocumentStore()
         
     def create_property(self, data: Dict[str, Any]) -> Property:
-        # Convert features from dict to JSON string if provided
-        if 'features' in data and isinstance(data['features'], dict):
-            data['features'] = json.dumps(data['features'])
-            
+        data = dict(data)
+        features = data.pop('features', None)
+
         property = Property(**data)
+        self._set_features(property, features)
         self.db.add(property)
         self.db.commit()
         self.db.refresh(property)
@@ -26,9 +47,9 @@ class PropertyService:
     def update_property(self, property_id: int, data: Dict[str, Any]) -> Optional[Property]:
         property = self.db.query(Property).filter(Property.id == property_id).first()
         if property:
-            # Convert features from dict to JSON string if provided
-            if 'features' in data and isinstance(data['features'], dict):
-                data['features'] = json.dumps(data['features'])
+            data = dict(data)
+            if 'features' in data:
+                self._set_features(property, data.pop('features'))
                 
             for key, value in data.items():
                 setattr(property, key, value)
@@ -39,10 +60,14 @@ class PropertyService:
     def delete_property(self, property_id: int) -> bool:
         property = self.db.query(Property).filter(Property.id == property_id).first()
         if property:
-            # Delete associated documents from filesystem
+            # Delete associated documents with their expiry alerts, and their
+            # content once no other document shares it
+            self.db.query(DocumentExpiryAlert)\
+                   .filter(DocumentExpiryAlert.property_id == property_id)\
+                   .delete(synchronize_session=False)
             for doc in property.documents:
-                if os.path.exists(doc.file_path):
-                    os.remove(doc.file_path)
+                self._release_document(doc)
+                self.db.delete(doc)
             
             self.db.delete(property)  # This will cascade delete deeds and documents
             self.db.commit()
@@ -55,28 +80,116 @@ class PropertyService:
     def get_property_by_no(self, property_no: str) -> Optional[Property]:
         return self.db.query(Property).filter(Property.property_no == property_no).first()
     
-    def get_all_properties(self, status: Optional[PropertyStatus] = None) -> List[Property]:
+    def get_all_properties(self,
+                           status: Optional[PropertyStatus] = None,
+                           features: Optional[Union[Iterable[str], Dict[str, Any]]] = None,
+                           min_area: Optional[float] = None,
+                           max_area: Optional[float] = None) -> List[Property]:
+        """Properties, optionally only those having every one of `features` within an area range.
+
+        `features` lists feature names, or maps names to the value they must
+        have (None for any value), e.g. {'parking': None, 'floor': '3'}.
+        """
         query = self.db.query(Property)
         if status:
             query = query.filter(Property.status == status)
+        if features:
+            query = query.filter(Property.id.in_(properties_with_features(features)))
+        if min_area is not None:
+            query = query.filter(Property.area >= min_area)
+        if max_area is not None:
+            query = query.filter(Property.area <= max_area)
         return query.all()
+
+    def get_feature_names(self) -> List[Dict[str, Any]]:
+        """Every feature in use and how many properties have it, most common first"""
+        rows = self.db.query(PropertyFeature.name, func.count(PropertyFeature.property_id))\
+                      .group_by(PropertyFeature.name)\
+                      .order_by(func.count(PropertyFeature.property_id).desc(), PropertyFeature.name)\
+                      .all()
+        return [{'name': name, 'properties': count} for name, count in rows]
+
+    def _set_features(self, property: Property, features: Any) -> None:
+        """Store features as canonical JSON and as property_features rows"""
+        normalized = normalize_features(features)
+        property.features = json.dumps(normalized, ensure_ascii=False) if normalized else None
+        existing = {row.name: row for row in property.feature_rows}
+        for name, row in existing.items():
+            if name not in normalized:
+                property.feature_rows.remove(row)
+        for name, value in normalized.items():
+            if name in existing:
+                existing[name].value = value
+            else:
+                property.feature_rows.append(PropertyFeature(name=name, value=value))
     
     def create_deed(self, data: Dict[str, Any]) -> Deed:
+        """Register a deed and fit it into the property's ownership history.
+
+        The deed is valid from its registration date. Deeds that were
+        current then end on that date, except ones registered the same day
+        (co-owners). A back-dated deed ends where the next registration
+        begins; an inactive one with none after it ends today.
+        """
         deed = Deed(**data)
-        
-        # Deactivate previous deeds for this property if this is a new active deed
-        if deed.is_active:
-            existing_deeds = self.db.query(Deed).filter(
-                and_(Deed.property_id == deed.property_id, Deed.is_active == True)
-            ).all()
-            for existing_deed in existing_deeds:
-                existing_deed.is_active = False
+        deed.valid_from = deed.valid_from or deed.registration_date
+        start = deed.valid_from
+
+        next_start = self.db.query(func.min(Deed.valid_from))\
+                            .filter(Deed.property_id == deed.property_id, Deed.valid_from > start)\
+                            .scalar()
+        if next_start is not None:
+            deed.valid_to = next_start
+        elif deed.is_active is False:
+            deed.valid_to = deed.valid_to or date.today()
+        deed.is_active = deed.valid_to is None
+
+        # End the deeds current at the new registration in one statement
+        self.db.execute(
+            update(Deed)
+            .where(Deed.property_id == deed.property_id,
+                   Deed.valid_from < start,
+                   or_(Deed.valid_to.is_(None), Deed.valid_to > start))
+            .values(valid_to=start, is_active=False)
+        )
         
         self.db.add(deed)
         self.db.commit()
         self.db.refresh(deed)
         return deed
     
+    def get_owners(self, property_id: int, on_date: Optional[date] = None) -> List[Deed]:
+        """Deeds of the owners of a property on a date (default today), largest share first"""
+        on_date = on_date or date.today()
+        return self.db.query(Deed)\
+                      .filter(Deed.property_id == property_id, *self._valid_on(on_date))\
+                      .order_by(Deed.share_ratio.desc(), Deed.id)\
+                      .all()
+    
+    def get_properties_owned_by(self,
+                                owner_id_number: Optional[str] = None,
+                                owner_name: Optional[str] = None,
+                                on_date: Optional[date] = None) -> List[Deed]:
+        """Deeds a person held on a date (default today), found by ID number or else by name"""
+        if not owner_id_number and not owner_name:
+            raise ValueError("owner_id_number or owner_name is required")
+        on_date = on_date or date.today()
+        owner = Deed.owner_id_number == owner_id_number if owner_id_number else Deed.owner_name == owner_name
+        return self.db.query(Deed)\
+                      .options(joinedload(Deed.property))\
+                      .filter(owner, *self._valid_on(on_date))\
+                      .order_by(Deed.property_id)\
+                      .all()
+    
+    def rebuild_ownership_intervals(self, property_ids: Optional[List[int]] = None) -> int:
+        """Recompute deed intervals from registration dates; returns the number of deeds updated"""
+        updated = self.db.execute(ownership_interval_update(property_ids)).rowcount
+        self.db.commit()
+        return updated
+    
+    def _valid_on(self, on_date: date):
+        return [Deed.valid_from <= on_date, or_(Deed.valid_to.is_(None), Deed.valid_to > on_date)]
+    
     def get_property_deeds(self, property_id: int, active_only: bool = False) -> List[Deed]:
         query = self.db.query(Deed).filter(Deed.property_id == property_id)
         if active_only:
@@ -90,24 +203,40 @@ class PropertyService:
                       title: str,
                       description: Optional[str] = None,
                       issue_date: Optional[date] = None,
-                      expiry_date: Optional[date] = None) -> PropertyDocument:
-        """Store a new document and create its database record"""
-        
-        # Create documents directory if it doesn't exist
-        docs_dir = os.path.join("documents", str(property_id))
-        os.makedirs(docs_dir, exist_ok=True)
+                      expiry_date: Optional[date] = None,
+                      progress: Optional[ProgressCallback] = None) -> PropertyDocument:
+        """Store a new document and create its database record.
+
+        The content is hashed and kept once in the document store no matter
+        how many documents use it; the document's own path is a hardlink to
+        it. `progress` is called with (bytes hashed, total bytes).
+        """
+        sha256, size = hash_file(file_path, progress)
+        blob = self.db.query(DocumentBlob).filter(DocumentBlob.sha256 == sha256).first()
+        if blob is None or not os.path.exists(blob.path):
+            blob_path = self.document_store.add_blob(file_path, sha256)
+            if blob is None:
+                blob = DocumentBlob(sha256=sha256, size=size, path=str(blob_path), ref_count=0)
+                self.db.add(blob)
+                self.db.flush()
+            else:
+                blob.path = str(blob_path)
+        self._add_blob_references(blob, 1)
         
-        # Generate unique filename and copy file
+        # Unique, readable name in the property's folder
         filename = f"{doc_type.value.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.path.basename(file_path)}"
-        new_path = os.path.join(docs_dir, filename)
-        shutil.copy2(file_path, new_path)
+        target = self.document_store.root / str(property_id) / filename
+        new_path = self.document_store.link(Path(blob.path), target)
         
         # Create document record
         doc_data = {
             'property_id': property_id,
             'type': doc_type,
             'title': title,
-            'file_path': new_path,
+            'file_path': str(new_path),
+            'content_hash': sha256,
+            'file_size': size,
+            'original_name': os.path.basename(file_path),
             'description': description,
             'issue_date': issue_date,
             'expiry_date': expiry_date
@@ -117,6 +246,9 @@ class PropertyService:
         self.db.add(document)
         self.db.commit()
         self.db.refresh(document)
+        
+        # Render the preview in the background while the user carries on
+        get_thumbnail_generator().request(sha256, blob.path)
         return document
     
     def get_property_documents(self, 
@@ -129,18 +261,46 @@ class PropertyService:
         return query.order_by(PropertyDocument.created_at.desc()).all()
     
     def delete_document(self, document_id: int) -> bool:
-        """Delete a document and its file"""
+        """Delete a document with its expiry alerts, and its content once no other document uses it"""
         document = self.db.query(PropertyDocument).filter(PropertyDocument.id == document_id).first()
         if document:
-            # Delete file from filesystem
-            if os.path.exists(document.file_path):
-                os.remove(document.file_path)
-            
+            self.db.query(DocumentExpiryAlert)\
+                   .filter(DocumentExpiryAlert.document_id == document_id)\
+                   .delete(synchronize_session=False)
+            self._release_document(document)
             self.db.delete(document)
             self.db.commit()
             return True
         return False
     
+    def _release_document(self, document: PropertyDocument) -> None:
+        """Remove a document's file and drop its reference to the shared content"""
+        blob = None
+        if document.content_hash:
+            blob = self.db.query(DocumentBlob)\
+                          .filter(DocumentBlob.sha256 == document.content_hash)\
+                          .first()
+        if blob is None:
+            # Stored before the content store existed: the file is its own copy
+            self.document_store.remove(document.file_path)
+            return
+        
+        if document.file_path != blob.path:
+            self.document_store.remove(document.file_path)
+        self._add_blob_references(blob, -1)
+        if blob.ref_count <= 0:
+            self.document_store.remove(blob.path)
+            self.db.delete(blob)
+    
+    def _add_blob_references(self, blob: DocumentBlob, delta: int) -> None:
+        """Adjust a blob's reference count in SQL, safe against concurrent uploads"""
+        self.db.execute(
+            update(DocumentBlob)
+            .where(DocumentBlob.id == blob.id)
+            .values(ref_count=func.coalesce(DocumentBlob.ref_count, 0) + delta)
+        )
+        self.db.refresh(blob, ['ref_count'])
+    
     def get_property_value_history(self, property_id: int) -> List[Dict[str, Any]]:
         """Get property value history from deed records"""
         deeds = self.db.query(Deed).filter(Deed.property_id == property_id)\
@@ -0,0 +1,205 @@
+from datetime import date, datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update, func, case, literal, cast, String
+from sqlalchemy.dialects.sqlite import insert as upsert
+from core.database import bulk_insert
+from core.localization import get_text
+from models.customer import Customer, Transaction, TransactionType, CustomerBalance
+from models.property import Property, PropertyStatus
+from models.rent import RentCharge, RentEscalation
+from typing import List, Optional, Dict, Any
+
+class RentRollService:
+    """Monthly rent billing: one debit transaction per rented property and month"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def schedule_escalation(self,
+                            property_id: int,
+                            effective_date: date,
+                            rate: Optional[float] = None,
+                            new_rent: Optional[float] = None,
+                            repeat_months: Optional[int] = None) -> RentEscalation:
+        """Schedule a rent increase by `rate` percent, or to `new_rent`"""
+        if (rate is None) == (new_rent is None):
+            raise ValueError("Give either rate or new_rent")
+        escalation = RentEscalation(
+            property_id=property_id,
+            effective_date=effective_date,
+            rate=rate,
+            new_rent=new_rent,
+            repeat_months=repeat_months or None
+        )
+        self.db.add(escalation)
+        self.db.commit()
+        self.db.refresh(escalation)
+        return escalation
+
+    def get_escalations(self, property_id: int) -> List[RentEscalation]:
+        return self.db.query(RentEscalation)\
+                      .filter(RentEscalation.property_id == property_id)\
+                      .order_by(RentEscalation.effective_date, RentEscalation.id)\
+                      .all()
+
+    def apply_escalations(self, through: date) -> Dict[str, int]:
+        """Apply every pending escalation effective on or before a date, oldest first.
+
+        Each round applies the earliest pending escalation of every property
+        with a few set-based statements, and schedules the next one of
+        repeating escalations; a property with several due escalations takes
+        one round for each.
+        """
+        escalations = RentEscalation.__table__
+        properties = Property.__table__
+        applied = scheduled = 0
+
+        while True:
+            pending = select(
+                escalations.c.id,
+                func.row_number().over(
+                    partition_by=escalations.c.property_id,
+                    order_by=(escalations.c.effective_date, escalations.c.id)
+                ).label('position')
+            ).where(escalations.c.applied_at.is_(None), escalations.c.effective_date <= through).subquery()
+            due = self.db.execute(select(pending.c.id).where(pending.c.position == 1)).scalars().all()
+            if not due:
+                break
+
+            now = datetime.now()
+            self.db.execute(
+                update(escalations)
+                .where(escalations.c.id.in_(due), properties.c.id == escalations.c.property_id)
+                .values(previous_rent=properties.c.monthly_rent, applied_at=now)
+            )
+            self.db.execute(
+                update(properties)
+                .where(escalations.c.id.in_(due), properties.c.id == escalations.c.property_id)
+                .values(monthly_rent=func.round(case(
+                    (escalations.c.new_rent.isnot(None), escalations.c.new_rent),
+                    else_=func.coalesce(escalations.c.previous_rent, 0) * (1 + escalations.c.rate / 100)
+                ), 2), updated_at=now)
+            )
+            scheduled += self.db.execute(
+                insert(escalations).from_select(
+                    ['property_id', 'effective_date', 'rate', 'new_rent', 'repeat_months', 'created_at'],
+                    select(
+                        escalations.c.property_id,
+                        func.date(escalations.c.effective_date,
+                                  literal('+') + cast(escalations.c.repeat_months, String) + literal(' months')),
+                        escalations.c.rate,
+                        escalations.c.new_rent,
+                        escalations.c.repeat_months,
+                        literal(now)
+                    ).where(escalations.c.id.in_(due), escalations.c.repeat_months > 0)
+                )
+            ).rowcount
+            applied += len(due)
+
+        return {'escalations_applied': applied, 'escalations_scheduled': scheduled}
+
+    def bill_month(self, billing_month: date) -> Dict[str, Any]:
+        """Post the month's rent of every rented property with a tenant.
+
+        Escalations effective by the first of the month are applied first.
+        Properties already billed for the month, or whose tenant no longer
+        exists, are skipped, so running it again only bills properties
+        rented since. Transactions and charges are inserted in batches and
+        tenant balances raised by this run's charges with one upsert.
+        """
+        billing_month = billing_month.replace(day=1)
+        result = self.apply_escalations(billing_month)
+
+        properties = Property.__table__
+        customers = Customer.__table__
+        charges = RentCharge.__table__
+        balances = CustomerBalance.__table__
+        transactions = Transaction.__table__
+
+        already_billed = select(charges.c.id).where(
+            charges.c.billing_month == billing_month,
+            charges.c.property_id == properties.c.id
+        ).exists()
+        rows = self.db.execute(
+            select(properties.c.id, properties.c.tenant_id, properties.c.monthly_rent, properties.c.property_no)
+            .where(
+                properties.c.status == PropertyStatus.RENTED,
+                properties.c.tenant_id.isnot(None),
+                select(customers.c.id).where(customers.c.id == properties.c.tenant_id).exists(),
+                properties.c.monthly_rent > 0,
+                ~already_billed
+            )
+            .order_by(properties.c.id)
+        ).all()
+
+        if rows:
+            property_ids, tenant_ids, amounts, property_nos = (list(c) for c in zip(*rows))
+            # The ids SQLite gives the transactions, in row order, for the
+            # charges to point at
+            billed_at = datetime.combine(billing_month, datetime.min.time())
+            description = get_text("rent_roll.charge_description")
+            transaction_ids = self.db.execute(
+                insert(transactions).returning(transactions.c.id, sort_by_parameter_order=True),
+                [
+                    {
+                        'customer_id': tenant_id,
+                        'date': billed_at,
+                        'type': TransactionType.DEBIT,
+                        'description': description.format(month=f"{billing_month:%Y-%m}", property_no=no),
+                        'amount': amount
+                    }
+                    for tenant_id, no, amount in zip(tenant_ids, property_nos, amounts)
+                ]
+            ).scalars().all()
+            bulk_insert(self.db, charges, {
+                'property_id': property_ids,
+                'customer_id': tenant_ids,
+                'billing_month': billing_month,
+                'amount': amounts,
+                'transaction_id': transaction_ids
+            })
+
+            # Each tenant's debit total goes up by this run's charges; tenants
+            # without a balance row get one
+            new_totals = {}
+            for tenant_id, amount in zip(tenant_ids, amounts):
+                new_totals[tenant_id] = new_totals.get(tenant_id, 0.0) + amount
+            now = datetime.utcnow()
+            balance_upsert = upsert(balances)
+            self.db.execute(
+                balance_upsert.on_conflict_do_update(
+                    index_elements=['customer_id'],
+                    set_={'total_debit': func.round(func.coalesce(balances.c.total_debit, 0)
+                                                    + balance_upsert.excluded.total_debit, 2),
+                          'last_updated': balance_upsert.excluded.last_updated}
+                ),
+                [
+                    {'customer_id': tenant_id, 'total_debit': round(total, 2), 'total_credit': 0.0,
+                     'last_updated': now}
+                    for tenant_id, total in new_totals.items()
+                ]
+            )
+            result['balances_updated'] = len(new_totals)
+        else:
+            amounts = []
+            result['balances_updated'] = 0
+
+        self.db.commit()
+        result.update({
+            'rows_affected': len(rows),
+            'billing_month': billing_month,
+            'charges_created': len(rows),
+            'amount': round(sum(amounts), 2)
+        })
+        return result
+
+    def run_billing(self, as_of: Optional[date] = None) -> Dict[str, Any]:
+        """Daily job: bill the current month; only newly rented properties get charges after the first run"""
+        return self.bill_month(as_of or date.today())
+
+    def get_rent_roll(self, billing_month: date) -> List[RentCharge]:
+        """Charges posted for a month"""
+        return self.db.query(RentCharge)\
+                      .filter(RentCharge.billing_month == billing_month.replace(day=1))\
+                      .order_by(RentCharge.property_id)\
+                      .all()
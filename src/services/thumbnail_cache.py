@@ -0,0 +1,173 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+import os
+import threading
+import uuid
+
+CACHE_DIR = Path('documents') / 'thumbnails'
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+THUMBNAIL_SIZE = (160, 160)
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tif', '.tiff', '.webp'}
+PDF_SUFFIXES = {'.pdf'}
+
+def render_thumbnail(source_path: str, target_path: str, size=THUMBNAIL_SIZE) -> bool:
+    """Write a PNG thumbnail of an image or of a PDF's first page.
+
+    Runs in a worker process. PDFs need PyMuPDF (in requirements.txt); if
+    it is not installed PDFs, like other file types, get no thumbnail and
+    False is returned.
+    """
+    from PIL import Image
+
+    suffix = Path(source_path).suffix.lower()
+    if suffix in IMAGE_SUFFIXES:
+        with Image.open(source_path) as source:
+            source.draft('RGB', size)  # Lets JPEG decode straight at a reduced scale
+            source.seek(0)
+            image = source.convert('RGB')
+    elif suffix in PDF_SUFFIXES:
+        try:
+            import fitz
+        except ImportError:
+            return False
+        with fitz.open(source_path) as pdf:
+            if pdf.page_count == 0:
+                return False
+            page = pdf[0]
+            zoom = min(size[0] / page.rect.width, size[1] / page.rect.height) * 2
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            image = Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+    else:
+        return False
+
+    image.thumbnail(size)
+    temp_path = f"{target_path}.{uuid.uuid4().hex}.tmp"
+    image.save(temp_path, 'PNG')
+    os.replace(temp_path, target_path)
+    return True
+
+class ThumbnailCache:
+    """Size-bounded disk cache of document thumbnails keyed by content hash.
+
+    A file's modification time records its last use; when the cache grows
+    past max_bytes the least recently used thumbnails are removed.
+    """
+
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._total = None
+        self._lock = threading.Lock()
+
+    def path_for(self, content_hash: str) -> Path:
+        return self.directory / content_hash[:2] / f"{content_hash}.png"
+
+    def get(self, content_hash: str) -> Optional[Path]:
+        """Cached thumbnail path, marked as just used, or None"""
+        path = self.path_for(content_hash)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def add(self, path: Path) -> int:
+        """Account for a newly written thumbnail, evicting if the cache is over its limit.
+
+        The cache size is scanned from disk once, then kept as a running
+        total. Returns the number of bytes freed.
+        """
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._entries())
+            else:
+                try:
+                    self._total += path.stat().st_size
+                except OSError:
+                    pass
+            if self._total <= self.max_bytes:
+                return 0
+
+            freed = 0
+            for _, size, entry in sorted(self._entries()):
+                if self._total - freed <= self.max_bytes:
+                    break
+                try:
+                    entry.unlink()
+                    freed += size
+                except OSError:
+                    pass
+            self._total -= freed
+            return freed
+
+    def _entries(self):
+        for path in self.directory.glob('*/*.png'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            yield stat.st_mtime, stat.st_size, path
+
+class ThumbnailGenerator:
+    """Renders thumbnails in a process pool so decoding never runs in the GUI process's threads"""
+
+    def __init__(self, cache: ThumbnailCache, workers: int = 2):
+        self.cache = cache
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def request(self, content_hash: str, source_path: str,
+                callback: Optional[Callable[[str, Optional[Path]], None]] = None) -> Optional[Future]:
+        """Render a document's thumbnail unless it is cached or already being rendered.
+
+        `callback(content_hash, thumbnail path or None)` runs on a pool
+        thread when rendering finishes.
+        """
+        if self.cache.get(content_hash) is not None:
+            return None
+        suffix = Path(source_path).suffix.lower()
+        if suffix not in IMAGE_SUFFIXES | PDF_SUFFIXES:
+            return None
+
+        with self._lock:
+            future = self._pending.get(content_hash)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                target = self.cache.path_for(content_hash)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                future = self._executor.submit(render_thumbnail, source_path, str(target))
+                self._pending[content_hash] = future
+                future.add_done_callback(lambda f: self._finished(content_hash, f))
+        if callback:
+            future.add_done_callback(
+                lambda f: callback(content_hash, self.cache.path_for(content_hash) if _rendered(f) else None)
+            )
+        return future
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _finished(self, content_hash: str, future: Future) -> None:
+        with self._lock:
+            self._pending.pop(content_hash, None)
+        if _rendered(future):
+            self.cache.add(self.cache.path_for(content_hash))
+
+def _rendered(future: Future) -> bool:
+    return not future.cancelled() and future.exception() is None and bool(future.result())
+
+_generator = {'instance': None}
+
+def get_thumbnail_generator() -> ThumbnailGenerator:
+    """The application's shared thumbnail generator and cache"""
+    if _generator['instance'] is None:
+        _generator['instance'] = ThumbnailGenerator(ThumbnailCache())
+    return _generator['instance']
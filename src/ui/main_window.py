@@ -1,7 +1,11 @@
 from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer, QObject, QThread, Signal
 from PySide6.QtGui import QIcon
-from core.localization import get_text
+from core.localization import bind_text
+from core.database import get_db
+from services.job_service import create_job_service
+from services.notification_outbox import create_outbox_dispatcher
+from services.thumbnail_cache import get_thumbnail_generator
 from ui.modules.customer_module import CustomerModule
 from ui.modules.cheque_module import ChequeModule
 from ui.modules.employee_module import EmployeeModule
@@ -10,11 +14,29 @@ from ui.modules.payment_module import PaymentModule
 from ui.modules.trade_module import TradeModule
 from ui.modules.reports_module import ReportsModule
 from ui.modules.settings_module import SettingsModule
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ScheduledJobsWorker(QObject):
+    """Runs the due daily jobs off the GUI thread, with its own database session"""
+    finished = Signal(bool)  # Whether any job ran
+
+    def run(self):
+        db = next(get_db())
+        ran = False
+        try:
+            ran = bool(create_job_service(db).run_due_jobs())
+        except Exception:
+            logger.exception("Scheduled jobs failed")
+        finally:
+            db.close()
+            self.finished.emit(ran)
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.setWindowTitle(get_text("app_name"))
+        bind_text(self, "app_name", 'setWindowTitle')
         self.setMinimumSize(1200, 800)
         
         # Create central widget and main layout
@@ -32,6 +54,19 @@ class MainWindow(QMainWindow):
         main_layout.addLayout(menu_layout)
         main_layout.addStretch()
         
+        # Run daily jobs (late installment sweep etc.) once the window is up,
+        # then check hourly whether a new business day needs them again
+        self.job_thread = None
+        self.job_worker = None
+        self.job_timer = QTimer(self)
+        self.job_timer.timeout.connect(self.run_scheduled_jobs)
+        self.job_timer.start(60 * 60 * 1000)
+        QTimer.singleShot(0, self.run_scheduled_jobs)
+        
+        # Deliver payment notifications on background threads
+        self.outbox = create_outbox_dispatcher()
+        self.outbox.start()
+        
         # Set modern style
         self.setStyleSheet("""
             QMainWindow {
@@ -64,12 +99,47 @@ class MainWindow(QMainWindow):
         ]
         
         for text_key, slot in modules:
-            button = QPushButton(get_text(text_key))
+            button = bind_text(QPushButton(), text_key)
             button.clicked.connect(slot)
             layout.addWidget(button)
         
         layout.addStretch()
 
+    def run_scheduled_jobs(self):
+        # A long sweep may still be running when the timer fires again
+        if self.job_thread is not None:
+            return
+
+        self.job_thread = QThread(self)
+        self.job_worker = ScheduledJobsWorker()
+        self.job_worker.moveToThread(self.job_thread)
+        self.job_thread.started.connect(self.job_worker.run)
+        self.job_worker.finished.connect(self.on_scheduled_jobs_finished)
+        self.job_worker.finished.connect(self.job_thread.quit)
+        # Each run gets a fresh pair; free it once the thread is done
+        self.job_thread.finished.connect(self.job_worker.deleteLater)
+        self.job_thread.finished.connect(self.job_thread.deleteLater)
+        self.job_thread.finished.connect(self.on_job_thread_finished)
+        self.job_thread.start()
+
+    def on_scheduled_jobs_finished(self, ran: bool):
+        """Deliver the notifications the jobs queued"""
+        if ran:
+            self.outbox.wake()
+
+    def on_job_thread_finished(self):
+        self.job_thread = None
+        self.job_worker = None
+
+    def closeEvent(self, event):
+        self.job_timer.stop()
+        if self.job_thread is not None:
+            self.job_thread.quit()
+            self.job_thread.wait()
+        self.outbox.stop()
+        get_thumbnail_generator().shutdown()
+        super().closeEvent(event)
+
     def open_customer_module(self):
         self.customer_module = CustomerModule()
         self.customer_module.show()
@@ -5,7 +5,8 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, QDate
 from PySide6.QtGui import QColor
-from core.localization import get_text
+from core.localization import get_text, bind_text
+from core.formatting import get_formatter
 from core.database import get_db
 from services.cheque_service import ChequeService
 from models.cheque import ChequeType, ChequeStatus, ChequeDirection
@@ -14,7 +15,7 @@ from datetime import datetime
 class ChequeModule(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.setWindowTitle(get_text("cheque_module.title"))
+        bind_text(self, "cheque_module.title", 'setWindowTitle')
         self.setMinimumSize(1000, 700)
         
         # Initialize database service
@@ -43,16 +44,16 @@ class ChequeModule(QMainWindow):
         # Add table widget for cheques
         self.table = QTableWidget()
         self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels([
-            get_text("cheque_module.cheque_no"),
-            get_text("cheque_module.type"),
-            get_text("cheque_module.direction"),
-            get_text("cheque_module.amount"),
-            get_text("cheque_module.due_date"),
-            get_text("cheque_module.bank"),
-            get_text("cheque_module.drawer"),
-            get_text("cheque_module.status")
-        ])
+        bind_text(self.table, [
+            "cheque_module.cheque_no",
+            "cheque_module.type",
+            "cheque_module.direction",
+            "cheque_module.amount",
+            "cheque_module.due_date",
+            "cheque_module.bank",
+            "cheque_module.drawer",
+            "cheque_module.status"
+        ], 'setHorizontalHeaderLabels')
         
         # Add layouts to main layout
         main_layout.addLayout(form_layout)
@@ -113,87 +114,94 @@ class ChequeModule(QMainWindow):
     def _setup_form_fields(self, layout):
         """Setup the input fields for cheque details"""
         # Cheque Number
-        layout.addWidget(QLabel(get_text("cheque_module.cheque_no")), 0, 0)
+        layout.addWidget(bind_text(QLabel(), "cheque_module.cheque_no"), 0, 0)
         self.cheque_no_input = QLineEdit()
         layout.addWidget(self.cheque_no_input, 0, 1)
 
         # Type
-        layout.addWidget(QLabel(get_text("cheque_module.type")), 0, 2)
+        layout.addWidget(bind_text(QLabel(), "cheque_module.type"), 0, 2)
         self.type_combo = QComboBox()
         self.type_combo.addItems([ct.value for ct in ChequeType])
         layout.addWidget(self.type_combo, 0, 3)
 
         # Direction
-        layout.addWidget(QLabel(get_text("cheque_module.direction")), 0, 4)
+        layout.addWidget(bind_text(QLabel(), "cheque_module.direction"), 0, 4)
         self.direction_combo = QComboBox()
         self.direction_combo.addItems([cd.value for cd in ChequeDirection])
         layout.addWidget(self.direction_combo, 0, 5)
 
         # Amount
-        layout.addWidget(QLabel(get_text("cheque_module.amount")), 1, 0)
+        layout.addWidget(bind_text(QLabel(), "cheque_module.amount"), 1, 0)
         self.amount_input = QLineEdit()
         self.amount_input.setPlaceholderText("0.00")
         layout.addWidget(self.amount_input, 1, 1)
 
         # Due Date
-        layout.addWidget(QLabel(get_text("cheque_module.due_date")), 1, 2)
+        layout.addWidget(bind_text(QLabel(), "cheque_module.due_date"), 1, 2)
         self.due_date_input = QDateEdit()
         self.due_date_input.setCalendarPopup(True)
         self.due_date_input.setDate(QDate.currentDate())
         layout.addWidget(self.due_date_input, 1, 3)
 
         # Bank
-        layout.addWidget(QLabel(get_text("cheque_module.bank")), 1, 4)
+        layout.addWidget(bind_text(QLabel(), "cheque_module.bank"), 1, 4)
         self.bank_input = QLineEdit()
         layout.addWidget(self.bank_input, 1, 5)
 
         # Drawer
-        layout.addWidget(QLabel(get_text("cheque_module.drawer")), 2, 0)
+        layout.addWidget(bind_text(QLabel(), "cheque_module.drawer"), 2, 0)
         self.drawer_input = QLineEdit()
         layout.addWidget(self.drawer_input, 2, 1)
 
     def _setup_buttons(self, layout):
         """Setup action buttons"""
         # Save button
-        self.save_btn = QPushButton(get_text("common.save"))
+        self.save_btn = bind_text(QPushButton(), "common.save")
         self.save_btn.clicked.connect(self.save_cheque)
         layout.addWidget(self.save_btn)
 
         # Clear button
-        clear_btn = QPushButton(get_text("common.clear"))
+        clear_btn = bind_text(QPushButton(), "common.clear")
         clear_btn.clicked.connect(self.clear_form)
         layout.addWidget(clear_btn)
 
         # Change Status button
-        change_status_btn = QPushButton(get_text("cheque_module.change_status"))
+        change_status_btn = bind_text(QPushButton(), "cheque_module.change_status")
         change_status_btn.clicked.connect(self.change_status)
         layout.addWidget(change_status_btn)
 
     def _setup_filters(self, layout):
         """Setup status filter"""
-        layout.addWidget(QLabel(get_text("cheque_module.filter_status")))
+        layout.addWidget(bind_text(QLabel(), "cheque_module.filter_status"))
         self.status_filter = QComboBox()
-        self.status_filter.addItem(get_text("common.all"))
-        self.status_filter.addItems([cs.value for cs in ChequeStatus])
-        self.status_filter.currentTextChanged.connect(self.load_cheques)
+        self.status_filter.addItem("", None)
+        bind_text(self.status_filter, "common.all", 'setItemText', 0)
+        for cs in ChequeStatus:
+            self.status_filter.addItem(cs.value, cs.value)
+        # By index, as renaming the "all" item on a language change changes its text
+        self.status_filter.currentIndexChanged.connect(self.load_cheques)
         layout.addWidget(self.status_filter)
 
     def load_cheques(self):
         """Load cheques into the table"""
         self.table.setRowCount(0)
-        filter_status = self.status_filter.currentText()
+        filter_status = self.status_filter.currentData()
         
         cheques = self.cheque_service.get_all()
-        if filter_status != get_text("common.all"):
-            cheques = [c for c in cheques if c.status == filter_status]
+        if filter_status is not None:
+            status = ChequeStatus(filter_status)
+            cheques = [c for c in cheques if c.status == status]
 
+        fmt = get_formatter()
+        amounts = fmt.numbers([c.amount for c in cheques])
+        due_dates = fmt.dates([c.due_date for c in cheques])
         for row, cheque in enumerate(cheques):
             self.table.insertRow(row)
             self.table.setItem(row, 0, QTableWidgetItem(cheque.cheque_no))
             self.table.setItem(row, 1, QTableWidgetItem(cheque.type))
             self.table.setItem(row, 2, QTableWidgetItem(cheque.direction))
-            self.table.setItem(row, 3, QTableWidgetItem(f"{cheque.amount:.2f}"))
-            self.table.setItem(row, 4, QTableWidgetItem(cheque.due_date.strftime("%Y-%m-%d")))
+            self.table.setItem(row, 3, QTableWidgetItem(amounts[row]))
+            self.table.setItem(row, 4, QTableWidgetItem(due_dates[row]))
             self.table.setItem(row, 5, QTableWidgetItem(cheque.bank))
             self.table.setItem(row, 6, QTableWidgetItem(cheque.drawer))
             self.table.setItem(row, 7, QTableWidgetItem(cheque.status))
@@ -290,8 +298,8 @@ class ChequeModule(QMainWindow):
         layout.addWidget(status_combo)
 
         buttons = QHBoxLayout()
-        ok_button = QPushButton(get_text("common.ok"))
-        cancel_button = QPushButton(get_text("common.cancel"))
+        ok_button = bind_text(QPushButton(), "common.ok")
+        cancel_button = bind_text(QPushButton(), "common.cancel")
         buttons.addWidget(ok_button)
         buttons.addWidget(cancel_button)
         layout.addLayout(buttons)
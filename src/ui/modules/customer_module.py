@@ -2,7 +2,8 @@ from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QTableWidget, QPushButton, QLabel, QLineEdit, QGridLayout,
                              QMessageBox, QTableWidgetItem, QComboBox)
 from PySide6.QtCore import Qt
-from core.localization import get_text
+from core.localization import get_text, get_texts, bind_text, on_language_changed
+from core.formatting import get_formatter
 from core.database import get_db
 from services.customer_service import CustomerService
 from models.customer import CustomerType, TransactionType
@@ -11,7 +12,7 @@ from datetime import datetime
 class CustomerModule(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.setWindowTitle(get_text("customer_module.title"))
+        bind_text(self, "customer_module.title", 'setWindowTitle')
         self.setMinimumSize(1000, 700)
         
         # Initialize database service
@@ -31,38 +32,39 @@ class CustomerModule(QMainWindow):
             ("customer_module.customer_name", "name"),
             ("customer_module.tax_number", "tax_number"),
             ("customer_module.phone", "phone"),
+            ("customer_module.email", "email"),
             ("customer_module.address", "address")
         ]
+        self.optional_inputs = {"email"}  # Only needed for email notifications
         self.inputs = {}
         
         for i, (label_key, input_key) in enumerate(labels):
-            form_layout.addWidget(QLabel(get_text(label_key)), i, 0)
+            form_layout.addWidget(bind_text(QLabel(), label_key), i, 0)
             self.inputs[input_key] = QLineEdit()
             form_layout.addWidget(self.inputs[input_key], i, 1)
         
         # Add customer type combo box
-        form_layout.addWidget(QLabel(get_text("customer_module.type")), len(labels), 0)
+        form_layout.addWidget(bind_text(QLabel(), "customer_module.type"), len(labels), 0)
         self.type_combo = QComboBox()
-        self.type_combo.addItems([
-            get_text("customer_module.type_customer"),
-            get_text("customer_module.type_supplier"),
-            get_text("customer_module.type_both")
-        ])
+        for index, key in enumerate(("customer_module.type_customer",
+                                     "customer_module.type_supplier",
+                                     "customer_module.type_both")):
+            self.type_combo.addItem("")
+            bind_text(self.type_combo, key, 'setItemText', index)
         form_layout.addWidget(self.type_combo, len(labels), 1)
         
         # Add transaction fields
         transaction_layout = QHBoxLayout()
         self.amount_input = QLineEdit()
-        self.amount_input.setPlaceholderText(get_text("customer_module.amount"))
+        bind_text(self.amount_input, "customer_module.amount", 'setPlaceholderText')
         
         self.description_input = QLineEdit()
-        self.description_input.setPlaceholderText(get_text("customer_module.description"))
+        bind_text(self.description_input, "customer_module.description", 'setPlaceholderText')
         
         self.transaction_type_combo = QComboBox()
-        self.transaction_type_combo.addItems([
-            get_text("customer_module.debit"),
-            get_text("customer_module.credit")
-        ])
+        for index, key in enumerate(("customer_module.debit", "customer_module.credit")):
+            self.transaction_type_combo.addItem("")
+            bind_text(self.transaction_type_combo, key, 'setItemText', index)
         
         transaction_layout.addWidget(self.amount_input)
         transaction_layout.addWidget(self.description_input)
@@ -78,28 +80,29 @@ class CustomerModule(QMainWindow):
         ]
         
         for text_key, slot in customer_buttons:
-            button = QPushButton(get_text(text_key))
+            button = bind_text(QPushButton(), text_key)
             button.clicked.connect(slot)
             customer_button_layout.addWidget(button)
             
         # Add transaction button
-        transaction_button = QPushButton(get_text("customer_module.add_transaction"))
+        transaction_button = bind_text(QPushButton(), "customer_module.add_transaction")
         transaction_button.clicked.connect(self.add_transaction)
         transaction_layout.addWidget(transaction_button)
         
         # Add table widget for transactions
         self.table = QTableWidget()
         self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels([
-            get_text("common.date"),
-            get_text("customer_module.transaction_type"),
-            get_text("common.description"),
-            get_text("customer_module.debit"),
-            get_text("customer_module.credit")
-        ])
+        bind_text(self.table, [
+            "common.date",
+            "customer_module.transaction_type",
+            "common.description",
+            "customer_module.debit",
+            "customer_module.credit"
+        ], 'setHorizontalHeaderLabels')
         
         # Add customer info summary
         self.balance_label = QLabel()
+        on_language_changed(self.show_balance)
         self.update_balance_display(0, 0)
         
         # Add layouts to main layout
@@ -111,6 +114,8 @@ class CustomerModule(QMainWindow):
         
         # Initialize state
         self.current_customer_id = None
+        self.transaction_type_keys = []
+        on_language_changed(self.retranslate_transaction_types)
         self.load_customers()
         
         # Set modern style
@@ -159,7 +164,7 @@ class CustomerModule(QMainWindow):
             }
             
             # Validate inputs
-            if not all(customer_data.values()):
+            if not all(v for k, v in customer_data.items() if k not in self.optional_inputs):
                 QMessageBox.warning(
                     self,
                     get_text("common.warning"),
@@ -176,6 +181,7 @@ class CustomerModule(QMainWindow):
                 name=customer_data["name"],
                 tax_number=customer_data["tax_number"],
                 phone=customer_data["phone"],
+                email=customer_data["email"] or None,
                 address=customer_data["address"],
                 type=customer_type
             )
@@ -213,7 +219,7 @@ class CustomerModule(QMainWindow):
             }
             
             # Validate inputs
-            if not all(customer_data.values()):
+            if not all(v for k, v in customer_data.items() if k not in self.optional_inputs):
                 QMessageBox.warning(
                     self,
                     get_text("common.warning"),
@@ -231,6 +237,7 @@ class CustomerModule(QMainWindow):
                 name=customer_data["name"],
                 tax_number=customer_data["tax_number"],
                 phone=customer_data["phone"],
+                email=customer_data["email"] or None,
                 address=customer_data["address"],
                 type=customer_type
             )
@@ -294,24 +301,28 @@ class CustomerModule(QMainWindow):
         self.current_customer_id = None
         self.update_balance_display(0, 0)
         self.table.setRowCount(0)
+        self.transaction_type_keys = []
     
     def load_customers(self):
         try:
             customers = self.customer_service.get_customers()
             self.table.setRowCount(0)
+            self.transaction_type_keys = []  # Rows are customers now
             
-            for customer in customers:
-                balance = self.customer_service.get_customer_balance(customer.id)
+            balances = [self.customer_service.get_customer_balance(customer.id) for customer in customers]
+            fmt = get_formatter()
+            debits = fmt.numbers([b.total_debit if b else 0 for b in balances])
+            credits = fmt.numbers([b.total_credit if b else 0 for b in balances])
+            nets = fmt.numbers([b.total_credit - b.total_debit if b else 0 for b in balances])
+            for customer, debit, credit, net in zip(customers, debits, credits, nets):
                 row = self.table.rowCount()
                 self.table.insertRow(row)
                 
                 self.table.setItem(row, 0, QTableWidgetItem(customer.name))
                 self.table.setItem(row, 1, QTableWidgetItem(customer.tax_number))
-                self.table.setItem(row, 2, QTableWidgetItem(f"{balance.total_debit:.2f}" if balance else "0.00"))
-                self.table.setItem(row, 3, QTableWidgetItem(f"{balance.total_credit:.2f}" if balance else "0.00"))
-                self.table.setItem(row, 4, QTableWidgetItem(
-                    f"{balance.total_credit - balance.total_debit:.2f}" if balance else "0.00"
-                ))
+                self.table.setItem(row, 2, QTableWidgetItem(debit))
+                self.table.setItem(row, 3, QTableWidgetItem(credit))
+                self.table.setItem(row, 4, QTableWidgetItem(net))
         
         except Exception as e:
             QMessageBox.critical(
@@ -382,20 +393,25 @@ class CustomerModule(QMainWindow):
             balance = self.customer_service.get_customer_balance(self.current_customer_id)
             
             self.table.setRowCount(0)
-            for transaction in transactions:
+            self.transaction_type_keys = [f"customer_module.{t.type.value}" for t in transactions]
+            type_names = get_texts(self.transaction_type_keys)
+            fmt = get_formatter()
+            dates = fmt.datetimes([t.date for t in transactions])
+            amounts = fmt.numbers([t.amount for t in transactions])
+            for transaction, type_name, date_text, amount in zip(transactions, type_names, dates, amounts):
                 row = self.table.rowCount()
                 self.table.insertRow(row)
                 
-                self.table.setItem(row, 0, QTableWidgetItem(transaction.date.strftime("%Y-%m-%d %H:%M")))
-                self.table.setItem(row, 1, QTableWidgetItem(get_text(f"customer_module.{transaction.type.value}")))
+                self.table.setItem(row, 0, QTableWidgetItem(date_text))
+                self.table.setItem(row, 1, QTableWidgetItem(type_name))
                 self.table.setItem(row, 2, QTableWidgetItem(transaction.description))
                 
                 if transaction.type == TransactionType.DEBIT:
-                    self.table.setItem(row, 3, QTableWidgetItem(f"{transaction.amount:.2f}"))
+                    self.table.setItem(row, 3, QTableWidgetItem(amount))
                     self.table.setItem(row, 4, QTableWidgetItem(""))
                 else:
                     self.table.setItem(row, 3, QTableWidgetItem(""))
-                    self.table.setItem(row, 4, QTableWidgetItem(f"{transaction.amount:.2f}"))
+                    self.table.setItem(row, 4, QTableWidgetItem(amount))
             
             if balance:
                 self.update_balance_display(balance.total_debit, balance.total_credit)
@@ -407,10 +423,25 @@ class CustomerModule(QMainWindow):
                 str(e)
             )
     
+    def retranslate_transaction_types(self):
+        """Rename the loaded transactions' types without reloading them"""
+        for row, type_name in enumerate(get_texts(self.transaction_type_keys)):
+            self.table.item(row, 1).setText(type_name)
+
     def update_balance_display(self, total_debit: float, total_credit: float):
+        # Kept to rebuild the text when the language changes
+        self.balance_totals = (total_debit, total_credit)
+        self.show_balance()
+
+    def show_balance(self):
+        total_debit, total_credit = self.balance_totals
         net_balance = total_credit - total_debit
-        balance_text = f"Toplam Borç: {total_debit:.2f} | Toplam Alacak: {total_credit:.2f} | Net Bakiye: {net_balance:.2f}"
-        self.balance_label.setText(balance_text)
+        fmt = get_formatter()
+        self.balance_label.setText(get_text("customer_module.balance_summary").format(
+            debit=fmt.currency(total_debit),
+            credit=fmt.currency(total_credit),
+            net=fmt.currency(net_balance)
+        ))
         
         # Set color based on balance
         if net_balance < 0:
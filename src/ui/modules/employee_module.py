@@ -2,24 +2,30 @@ from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
     QPushButton, QLabel, QLineEdit, QDateEdit, QComboBox,
     QTabWidget, QTableWidget, QTableWidgetItem, QMessageBox,
-    QSpinBox, QDoubleSpinBox
+    QSpinBox, QDoubleSpinBox, QFileDialog
 )
 from PySide6.QtCore import Qt, QDate, QDateTime
-from core.localization import get_text
+from core.localization import get_text, bind_text
+from core.formatting import get_formatter
 from core.database import get_db
 from services.employee_service import EmployeeService
+from services.attendance_import_service import AttendanceImportService
+from services.payroll_service import month_period, is_pay_period
 from models.employee import Employee, EmployeeStatus, AttendanceRecord
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+
+ATTENDANCE_PAGE_SIZE = 500
 
 class EmployeeModule(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.setWindowTitle(get_text("employee_module.title"))
+        bind_text(self, "employee_module.title", 'setWindowTitle')
         self.setMinimumSize(1200, 800)
         
         # Initialize database service
         db = next(get_db())
         self.employee_service = EmployeeService(db)
+        self.attendance_import_service = AttendanceImportService(db)
         
         # Create central widget and main layout
         central_widget = QWidget()
@@ -35,9 +41,13 @@ class EmployeeModule(QMainWindow):
         attendance_tab = QWidget()
         payroll_tab = QWidget()
         
-        tabs.addTab(employee_tab, get_text("employee_module.tab_employees"))
-        tabs.addTab(attendance_tab, get_text("employee_module.tab_attendance"))
-        tabs.addTab(payroll_tab, get_text("employee_module.tab_payroll"))
+        tabs.addTab(employee_tab, "")
+        tabs.addTab(attendance_tab, "")
+        tabs.addTab(payroll_tab, "")
+        for index, key in enumerate(("employee_module.tab_employees",
+                                     "employee_module.tab_attendance",
+                                     "employee_module.tab_payroll")):
+            bind_text(tabs, key, 'setTabText', index)
         
         # Setup each tab
         self._setup_employee_tab(employee_tab)
@@ -113,56 +123,56 @@ class EmployeeModule(QMainWindow):
         form = QGridLayout()
         
         # Employee number
-        form.addWidget(QLabel(get_text("employee_module.employee_no")), 0, 0)
+        form.addWidget(bind_text(QLabel(), "employee_module.employee_no"), 0, 0)
         self.emp_no_input = QLineEdit()
         form.addWidget(self.emp_no_input, 0, 1)
         
         # First name
-        form.addWidget(QLabel(get_text("employee_module.first_name")), 0, 2)
+        form.addWidget(bind_text(QLabel(), "employee_module.first_name"), 0, 2)
         self.first_name_input = QLineEdit()
         form.addWidget(self.first_name_input, 0, 3)
         
         # Last name
-        form.addWidget(QLabel(get_text("employee_module.last_name")), 0, 4)
+        form.addWidget(bind_text(QLabel(), "employee_module.last_name"), 0, 4)
         self.last_name_input = QLineEdit()
         form.addWidget(self.last_name_input, 0, 5)
         
         # Phone
-        form.addWidget(QLabel(get_text("employee_module.phone")), 1, 0)
+        form.addWidget(bind_text(QLabel(), "employee_module.phone"), 1, 0)
         self.phone_input = QLineEdit()
         form.addWidget(self.phone_input, 1, 1)
         
         # Email
-        form.addWidget(QLabel(get_text("employee_module.email")), 1, 2)
+        form.addWidget(bind_text(QLabel(), "employee_module.email"), 1, 2)
         self.email_input = QLineEdit()
         form.addWidget(self.email_input, 1, 3)
         
         # Hire date
-        form.addWidget(QLabel(get_text("employee_module.hire_date")), 1, 4)
+        form.addWidget(bind_text(QLabel(), "employee_module.hire_date"), 1, 4)
         self.hire_date_input = QDateEdit()
         self.hire_date_input.setCalendarPopup(True)
         self.hire_date_input.setDate(QDate.currentDate())
         form.addWidget(self.hire_date_input, 1, 5)
         
         # Position
-        form.addWidget(QLabel(get_text("employee_module.position")), 2, 0)
+        form.addWidget(bind_text(QLabel(), "employee_module.position"), 2, 0)
         self.position_input = QLineEdit()
         form.addWidget(self.position_input, 2, 1)
         
         # Department
-        form.addWidget(QLabel(get_text("employee_module.department")), 2, 2)
+        form.addWidget(bind_text(QLabel(), "employee_module.department"), 2, 2)
         self.department_input = QLineEdit()
         form.addWidget(self.department_input, 2, 3)
         
         # Hourly rate
-        form.addWidget(QLabel(get_text("employee_module.hourly_rate")), 2, 4)
+        form.addWidget(bind_text(QLabel(), "employee_module.hourly_rate"), 2, 4)
         self.hourly_rate_input = QDoubleSpinBox()
         self.hourly_rate_input.setRange(0, 999999.99)
         self.hourly_rate_input.setDecimals(2)
         form.addWidget(self.hourly_rate_input, 2, 5)
         
         # Status
-        form.addWidget(QLabel(get_text("employee_module.status")), 3, 0)
+        form.addWidget(bind_text(QLabel(), "employee_module.status"), 3, 0)
         self.status_combo = QComboBox()
         self.status_combo.addItems([status.value for status in EmployeeStatus])
         form.addWidget(self.status_combo, 3, 1)
@@ -172,11 +182,11 @@ class EmployeeModule(QMainWindow):
         # Buttons
         button_layout = QHBoxLayout()
         
-        self.save_btn = QPushButton(get_text("common.save"))
+        self.save_btn = bind_text(QPushButton(), "common.save")
         self.save_btn.clicked.connect(self.save_employee)
         button_layout.addWidget(self.save_btn)
         
-        clear_btn = QPushButton(get_text("common.clear"))
+        clear_btn = bind_text(QPushButton(), "common.clear")
         clear_btn.clicked.connect(self.clear_employee_form)
         button_layout.addWidget(clear_btn)
         
@@ -185,17 +195,17 @@ class EmployeeModule(QMainWindow):
         # Table
         self.employee_table = QTableWidget()
         self.employee_table.setColumnCount(9)
-        self.employee_table.setHorizontalHeaderLabels([
-            get_text("employee_module.employee_no"),
-            get_text("employee_module.first_name"),
-            get_text("employee_module.last_name"),
-            get_text("employee_module.phone"),
-            get_text("employee_module.email"),
-            get_text("employee_module.hire_date"),
-            get_text("employee_module.position"),
-            get_text("employee_module.hourly_rate"),
-            get_text("employee_module.status")
-        ])
+        bind_text(self.employee_table, [
+            "employee_module.employee_no",
+            "employee_module.first_name",
+            "employee_module.last_name",
+            "employee_module.phone",
+            "employee_module.email",
+            "employee_module.hire_date",
+            "employee_module.position",
+            "employee_module.hourly_rate",
+            "employee_module.status"
+        ], 'setHorizontalHeaderLabels')
         layout.addWidget(self.employee_table)
 
     def _setup_attendance_tab(self, tab):
@@ -206,33 +216,33 @@ class EmployeeModule(QMainWindow):
         form = QGridLayout()
         
         # Employee selector
-        form.addWidget(QLabel(get_text("employee_module.select_employee")), 0, 0)
+        form.addWidget(bind_text(QLabel(), "employee_module.select_employee"), 0, 0)
         self.attendance_emp_combo = QComboBox()
         form.addWidget(self.attendance_emp_combo, 0, 1)
         
         # Date
-        form.addWidget(QLabel(get_text("employee_module.date")), 0, 2)
+        form.addWidget(bind_text(QLabel(), "employee_module.date"), 0, 2)
         self.attendance_date = QDateEdit()
         self.attendance_date.setCalendarPopup(True)
         self.attendance_date.setDate(QDate.currentDate())
         form.addWidget(self.attendance_date, 0, 3)
         
         # Time in
-        form.addWidget(QLabel(get_text("employee_module.time_in")), 1, 0)
+        form.addWidget(bind_text(QLabel(), "employee_module.time_in"), 1, 0)
         self.time_in = QDateEdit()
         self.time_in.setCalendarPopup(True)
         self.time_in.setDateTime(QDateTime.currentDateTime())
         form.addWidget(self.time_in, 1, 1)
         
         # Time out
-        form.addWidget(QLabel(get_text("employee_module.time_out")), 1, 2)
+        form.addWidget(bind_text(QLabel(), "employee_module.time_out"), 1, 2)
         self.time_out = QDateEdit()
         self.time_out.setCalendarPopup(True)
         self.time_out.setDateTime(QDateTime.currentDateTime())
         form.addWidget(self.time_out, 1, 3)
         
         # Notes
-        form.addWidget(QLabel(get_text("employee_module.notes")), 2, 0)
+        form.addWidget(bind_text(QLabel(), "employee_module.notes"), 2, 0)
         self.attendance_notes = QLineEdit()
         form.addWidget(self.attendance_notes, 2, 1, 1, 3)
         
@@ -241,28 +251,47 @@ class EmployeeModule(QMainWindow):
         # Buttons
         button_layout = QHBoxLayout()
         
-        save_attendance_btn = QPushButton(get_text("employee_module.record_attendance"))
+        save_attendance_btn = bind_text(QPushButton(), "employee_module.record_attendance")
         save_attendance_btn.clicked.connect(self.save_attendance)
         button_layout.addWidget(save_attendance_btn)
         
-        clear_attendance_btn = QPushButton(get_text("common.clear"))
+        clear_attendance_btn = bind_text(QPushButton(), "common.clear")
         clear_attendance_btn.clicked.connect(self.clear_attendance_form)
         button_layout.addWidget(clear_attendance_btn)
         
+        import_punches_btn = bind_text(QPushButton(), "employee_module.import_punches")
+        import_punches_btn.clicked.connect(self.import_punch_log)
+        button_layout.addWidget(import_punches_btn)
+        
         layout.addLayout(button_layout)
         
         # Table
         self.attendance_table = QTableWidget()
         self.attendance_table.setColumnCount(6)
-        self.attendance_table.setHorizontalHeaderLabels([
-            get_text("employee_module.employee_name"),
-            get_text("employee_module.date"),
-            get_text("employee_module.time_in"),
-            get_text("employee_module.time_out"),
-            get_text("employee_module.total_hours"),
-            get_text("employee_module.notes")
-        ])
+        bind_text(self.attendance_table, [
+            "employee_module.employee_name",
+            "employee_module.date",
+            "employee_module.time_in",
+            "employee_module.time_out",
+            "employee_module.total_hours",
+            "employee_module.notes"
+        ], 'setHorizontalHeaderLabels')
         layout.addWidget(self.attendance_table)
+        
+        # Paging; the table shows one page of the employee's records
+        self.attendance_page = 0
+        self.attendance_page_employee = None
+        paging_layout = QHBoxLayout()
+        self.attendance_prev_btn = bind_text(QPushButton(), "common.previous")
+        self.attendance_prev_btn.clicked.connect(lambda: self.load_attendance_records(self.attendance_page - 1))
+        self.attendance_next_btn = bind_text(QPushButton(), "common.next")
+        self.attendance_next_btn.clicked.connect(lambda: self.load_attendance_records(self.attendance_page + 1))
+        self.attendance_page_label = QLabel()
+        paging_layout.addWidget(self.attendance_prev_btn)
+        paging_layout.addWidget(self.attendance_page_label)
+        paging_layout.addWidget(self.attendance_next_btn)
+        paging_layout.addStretch()
+        layout.addLayout(paging_layout)
 
     def _setup_payroll_tab(self, tab):
         """Setup the payroll calculation tab"""
@@ -272,65 +301,75 @@ class EmployeeModule(QMainWindow):
         form = QGridLayout()
         
         # Employee selector
-        form.addWidget(QLabel(get_text("employee_module.select_employee")), 0, 0)
+        form.addWidget(bind_text(QLabel(), "employee_module.select_employee"), 0, 0)
         self.payroll_emp_combo = QComboBox()
         form.addWidget(self.payroll_emp_combo, 0, 1)
         
         # Date range
-        form.addWidget(QLabel(get_text("employee_module.start_date")), 1, 0)
+        form.addWidget(bind_text(QLabel(), "employee_module.start_date"), 1, 0)
         self.payroll_start_date = QDateEdit()
         self.payroll_start_date.setCalendarPopup(True)
         form.addWidget(self.payroll_start_date, 1, 1)
         
-        form.addWidget(QLabel(get_text("employee_module.end_date")), 1, 2)
+        form.addWidget(bind_text(QLabel(), "employee_module.end_date"), 1, 2)
         self.payroll_end_date = QDateEdit()
         self.payroll_end_date.setCalendarPopup(True)
         form.addWidget(self.payroll_end_date, 1, 3)
+
+        # Open on last month's pay period
+        period_start, period_end = month_period(date.today().replace(day=1) - timedelta(days=1))
+        self.payroll_start_date.setDate(QDate(period_start))
+        self.payroll_end_date.setDate(QDate(period_end))
         
         layout.addLayout(form)
         
         # Calculate button
-        calc_btn = QPushButton(get_text("employee_module.calculate_payroll"))
+        calc_btn = bind_text(QPushButton(), "employee_module.calculate_payroll")
         calc_btn.clicked.connect(self.calculate_payroll)
         layout.addWidget(calc_btn)
         
         # Results table
         self.payroll_table = QTableWidget()
-        self.payroll_table.setColumnCount(6)
-        self.payroll_table.setHorizontalHeaderLabels([
-            get_text("employee_module.employee_name"),
-            get_text("employee_module.regular_hours"),
-            get_text("employee_module.overtime_hours"),
-            get_text("employee_module.regular_amount"),
-            get_text("employee_module.overtime_amount"),
-            get_text("employee_module.total_amount")
-        ])
+        self.payroll_table.setColumnCount(7)
+        bind_text(self.payroll_table, [
+            "employee_module.employee_name",
+            "employee_module.regular_hours",
+            "employee_module.overtime_hours",
+            "employee_module.regular_amount",
+            "employee_module.overtime_amount",
+            "employee_module.premium_amount",
+            "employee_module.total_amount"
+        ], 'setHorizontalHeaderLabels')
         layout.addWidget(self.payroll_table)
 
     def load_employees(self):
         """Load employees into the table and combo boxes"""
         self.employee_table.setRowCount(0)
-        employees = self.employee_service.get_all_employees()
+        employees = self.employee_service.list_employee_rows()
         
         # Clear and reload combo boxes
         self.attendance_emp_combo.clear()
         self.payroll_emp_combo.clear()
         
+        self.employee_table.setRowCount(len(employees))
+        fmt = get_formatter()
+        hire_dates = fmt.dates([e.hire_date for e in employees])
+        hourly_rates = fmt.numbers([e.hourly_rate for e in employees])
         for row, employee in enumerate(employees):
-            self.employee_table.insertRow(row)
             self.employee_table.setItem(row, 0, QTableWidgetItem(employee.employee_no))
             self.employee_table.setItem(row, 1, QTableWidgetItem(employee.first_name))
             self.employee_table.setItem(row, 2, QTableWidgetItem(employee.last_name))
             self.employee_table.setItem(row, 3, QTableWidgetItem(employee.phone))
             self.employee_table.setItem(row, 4, QTableWidgetItem(employee.email))
-            self.employee_table.setItem(row, 5, QTableWidgetItem(str(employee.hire_date)))
+            self.employee_table.setItem(row, 5, QTableWidgetItem(hire_dates[row]))
             self.employee_table.setItem(row, 6, QTableWidgetItem(employee.position))
-            self.employee_table.setItem(row, 7, QTableWidgetItem(f"{employee.hourly_rate:.2f}"))
+            self.employee_table.setItem(row, 7, QTableWidgetItem(hourly_rates[row]))
             self.employee_table.setItem(row, 8, QTableWidgetItem(employee.status.value))
             
             # Add to combo boxes
-            self.attendance_emp_combo.addItem(employee.full_name, employee.id)
-            self.payroll_emp_combo.addItem(employee.full_name, employee.id)
+            full_name = f"{employee.first_name} {employee.last_name}"
+            self.attendance_emp_combo.addItem(full_name, employee.id)
+            self.payroll_emp_combo.addItem(full_name, employee.id)
         
         self.employee_table.resizeColumnsToContents()
 
@@ -418,22 +457,70 @@ class EmployeeModule(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, get_text("common.error"), str(e))
 
-    def load_attendance_records(self):
-        """Load attendance records for the selected employee"""
+    def import_punch_log(self):
+        """Import a time-clock punch log exported by the site terminals"""
+        try:
+            file_path, _ = QFileDialog.getOpenFileName(
+                self,
+                get_text("employee_module.select_punch_log"),
+                "",
+                get_text("employee_module.punch_log_file_types")
+            )
+            if not file_path:
+                return
+
+            result = self.attendance_import_service.import_file(file_path)
+            self.load_attendance_records()
+
+            message = get_text("employee_module.punch_import_result").format(
+                punches=result['punches'],
+                days=result['days'],
+                rows_written=result['rows_written'],
+                seconds=result['elapsed_seconds']
+            )
+            if result['unknown_employees']:
+                message += "\n" + get_text("employee_module.unknown_employees") + \
+                    ": " + ", ".join(result['unknown_employees'])
+            QMessageBox.information(self, get_text("common.success"), message)
+
+        except Exception as e:
+            QMessageBox.critical(self, get_text("common.error"), str(e))
+
+    def load_attendance_records(self, page=None):
+        """Load one page of the selected employee's attendance records, the current page by default"""
         employee_id = self.attendance_emp_combo.currentData()
         if not employee_id:
             return
 
-        self.attendance_table.setRowCount(0)
-        records = self.employee_service.get_employee_attendance(employee_id)
-        
+        if employee_id != self.attendance_page_employee:
+            self.attendance_page, self.attendance_page_employee = 0, employee_id
+        total = self.employee_service.count_attendance_rows(employee_id)
+        last_page = max(total - 1, 0) // ATTENDANCE_PAGE_SIZE
+        page = self.attendance_page if page is None else page
+        self.attendance_page = min(max(page, 0), last_page)
+        records = self.employee_service.list_attendance_rows(
+            employee_id, skip=self.attendance_page * ATTENDANCE_PAGE_SIZE, limit=ATTENDANCE_PAGE_SIZE
+        )
+        
+        first = self.attendance_page * ATTENDANCE_PAGE_SIZE
+        self.attendance_page_label.setText(get_text("employee_module.page_info").format(
+            first=first + 1 if records else 0, last=first + len(records), total=total
+        ))
+        self.attendance_prev_btn.setEnabled(self.attendance_page > 0)
+        self.attendance_next_btn.setEnabled(self.attendance_page < last_page)
+        
+        self.attendance_table.setRowCount(len(records))
+        fmt = get_formatter()
+        dates = fmt.dates([r.date for r in records])
+        times_in = fmt.times([r.time_in for r in records])
+        times_out = fmt.times([r.time_out for r in records])
+        worked_hours = fmt.numbers([r.worked_hours for r in records])
         for row, record in enumerate(records):
-            self.attendance_table.insertRow(row)
-            self.attendance_table.setItem(row, 0, QTableWidgetItem(record.employee.full_name))
-            self.attendance_table.setItem(row, 1, QTableWidgetItem(str(record.date)))
-            self.attendance_table.setItem(row, 2, QTableWidgetItem(record.time_in.strftime("%H:%M")))
-            self.attendance_table.setItem(row, 3, QTableWidgetItem(record.time_out.strftime("%H:%M")))
-            self.attendance_table.setItem(row, 4, QTableWidgetItem(f"{record.total_hours:.2f}"))
+            self.attendance_table.setItem(row, 0, QTableWidgetItem(record.employee_name))
+            self.attendance_table.setItem(row, 1, QTableWidgetItem(dates[row]))
+            self.attendance_table.setItem(row, 2, QTableWidgetItem(times_in[row]))
+            self.attendance_table.setItem(row, 3, QTableWidgetItem(times_out[row]))
+            self.attendance_table.setItem(row, 4, QTableWidgetItem(worked_hours[row]))
             self.attendance_table.setItem(row, 5, QTableWidgetItem(record.notes))
         
         self.attendance_table.resizeColumnsToContents()
@@ -455,16 +542,30 @@ class EmployeeModule(QMainWindow):
                                   get_text("employee_module.invalid_date_range"))
                 return
 
-            result = self.employee_service.calculate_payroll(employee_id, start_date, end_date)
-            employee = self.employee_service.get_employee(employee_id)
+            columns = ('regular_hours', 'overtime_hours', 'regular_amount',
+                       'overtime_amount', 'premium_amount', 'total_amount')
+            if is_pay_period(start_date, end_date):
+                # Reads the stored run, recalculating only lines changed since last time
+                payroll_service = self.employee_service.payroll_service
+                run = payroll_service.calculate_payroll_run(start_date, end_date)
+                lines = [
+                    (line.employee_name, [getattr(line, name) for name in columns])
+                    for line in payroll_service.get_payroll_lines(run.id, employee_id)
+                ]
+            else:
+                # Other ranges are calculated for display only, without storing a run
+                totals = self.employee_service.calculate_payroll(employee_id, start_date, end_date)
+                lines = [(self.payroll_emp_combo.currentText(),
+                          [totals.get(name, 0.0) for name in columns])]
             
-            self.payroll_table.setRowCount(1)
-            self.payroll_table.setItem(0, 0, QTableWidgetItem(employee.full_name))
-            self.payroll_table.setItem(0, 1, QTableWidgetItem(f"{result['regular_hours']:.2f}"))
-            self.payroll_table.setItem(0, 2, QTableWidgetItem(f"{result['overtime_hours']:.2f}"))
-            self.payroll_table.setItem(0, 3, QTableWidgetItem(f"{result['regular_amount']:.2f}"))
-            self.payroll_table.setItem(0, 4, QTableWidgetItem(f"{result['overtime_amount']:.2f}"))
-            self.payroll_table.setItem(0, 5, QTableWidgetItem(f"{result['total_amount']:.2f}"))
+            self.payroll_table.setRowCount(len(lines))
+            fmt = get_formatter()
+            for column in range(len(columns)):
+                texts = fmt.numbers([values[column] for _, values in lines])
+                for row, text in enumerate(texts):
+                    self.payroll_table.setItem(row, column + 1, QTableWidgetItem(text))
+            for row, (employee_name, _) in enumerate(lines):
+                self.payroll_table.setItem(row, 0, QTableWidgetItem(employee_name))
             
             self.payroll_table.resizeColumnsToContents()
 
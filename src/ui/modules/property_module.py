@@ -2,12 +2,17 @@ from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
     QPushButton, QLabel, QLineEdit, QComboBox, QTableWidget,
     QTableWidgetItem, QMessageBox, QFileDialog, QTabWidget,
-    QSpinBox, QDoubleSpinBox, QTextEdit, QDateEdit
+    QSpinBox, QDoubleSpinBox, QTextEdit, QDateEdit, QProgressBar, QCheckBox
 )
-from PySide6.QtCore import Qt, QDate
-from core.localization import get_text
+from PySide6.QtCore import Qt, QDate, QObject, QThread, Signal, QSize
+from PySide6.QtGui import QIcon
+from core.localization import get_text, bind_text, on_language_changed
+from core.formatting import get_formatter
 from core.database import get_db
 from services.property_service import PropertyService
+from services.property_search_service import PropertySearchService
+from services.customer_service import CustomerService
+from services.thumbnail_cache import get_thumbnail_generator, THUMBNAIL_SIZE
 from models.property import (
     Property, Deed, PropertyDocument,
     PropertyType, PropertyStatus, OwnershipType, DocumentType
@@ -16,15 +21,49 @@ import json
 from datetime import datetime
 import os
 
+# Properties listed at once; the count label shows how many matched in all
+PROPERTY_PAGE_SIZE = 500
+
+class DocumentUploadWorker(QObject):
+    """Stores a document off the GUI thread, with its own database session"""
+    progress = Signal(int)  # Percent of the file hashed
+    finished = Signal(int)  # Property id
+    failed = Signal(str)
+
+    def __init__(self, property_id: int, document: dict):
+        super().__init__()
+        self.property_id = property_id
+        self.document = document
+
+    def run(self):
+        db = next(get_db())
+        try:
+            PropertyService(db).store_document(property_id=self.property_id, progress=self._report,
+                                               **self.document)
+            self.finished.emit(self.property_id)
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            db.close()
+
+    def _report(self, done: int, total: int):
+        self.progress.emit(int(done * 100 / total) if total else 100)
+
 class PropertyModule(QMainWindow):
+    thumbnail_ready = Signal(str, str)  # Content hash, thumbnail path
+
     def __init__(self):
         super().__init__()
-        self.setWindowTitle(get_text("property_module.title"))
+        bind_text(self, "property_module.title", 'setWindowTitle')
         self.setMinimumSize(1200, 800)
         
         # Initialize database service
         db = next(get_db())
         self.property_service = PropertyService(db)
+        self.search_service = PropertySearchService(db)
+        self.customer_service = CustomerService(db)
+        # Property picker items last filled in, see load_properties
+        self.property_choices = None
         
         # Create central widget and main layout
         central_widget = QWidget()
@@ -40,9 +79,13 @@ class PropertyModule(QMainWindow):
         deed_tab = QWidget()
         document_tab = QWidget()
         
-        tabs.addTab(property_tab, get_text("property_module.tab_properties"))
-        tabs.addTab(deed_tab, get_text("property_module.tab_deeds"))
-        tabs.addTab(document_tab, get_text("property_module.tab_documents"))
+        tabs.addTab(property_tab, "")
+        tabs.addTab(deed_tab, "")
+        tabs.addTab(document_tab, "")
+        for index, key in enumerate(("property_module.tab_properties",
+                                     "property_module.tab_deeds",
+                                     "property_module.tab_documents")):
+            bind_text(tabs, key, 'setTabText', index)
         
         # Setup each tab
         self._setup_property_tab(property_tab)
@@ -53,6 +96,7 @@ class PropertyModule(QMainWindow):
         self._set_style()
         
         # Load initial data
+        self.load_tenants()
         self.load_properties()
 
     def _set_style(self):
@@ -117,86 +161,91 @@ class PropertyModule(QMainWindow):
         form = QGridLayout()
         
         # Property number
-        form.addWidget(QLabel(get_text("property_module.property_no")), 0, 0)
+        form.addWidget(bind_text(QLabel(), "property_module.property_no"), 0, 0)
         self.property_no_input = QLineEdit()
         form.addWidget(self.property_no_input, 0, 1)
         
         # Title
-        form.addWidget(QLabel(get_text("property_module.title")), 0, 2)
+        form.addWidget(bind_text(QLabel(), "property_module.title"), 0, 2)
         self.title_input = QLineEdit()
         form.addWidget(self.title_input, 0, 3)
         
         # Type
-        form.addWidget(QLabel(get_text("property_module.type")), 0, 4)
+        form.addWidget(bind_text(QLabel(), "property_module.type"), 0, 4)
         self.type_combo = QComboBox()
         self.type_combo.addItems([t.value for t in PropertyType])
         form.addWidget(self.type_combo, 0, 5)
         
         # Status
-        form.addWidget(QLabel(get_text("property_module.status")), 1, 0)
+        form.addWidget(bind_text(QLabel(), "property_module.status"), 1, 0)
         self.status_combo = QComboBox()
         self.status_combo.addItems([s.value for s in PropertyStatus])
         form.addWidget(self.status_combo, 1, 1)
         
         # Address
-        form.addWidget(QLabel(get_text("property_module.address")), 2, 0)
+        form.addWidget(bind_text(QLabel(), "property_module.address"), 2, 0)
         self.address_input = QTextEdit()
         self.address_input.setMaximumHeight(60)
         form.addWidget(self.address_input, 2, 1, 1, 3)
         
         # City
-        form.addWidget(QLabel(get_text("property_module.city")), 3, 0)
+        form.addWidget(bind_text(QLabel(), "property_module.city"), 3, 0)
         self.city_input = QLineEdit()
         form.addWidget(self.city_input, 3, 1)
         
         # District
-        form.addWidget(QLabel(get_text("property_module.district")), 3, 2)
+        form.addWidget(bind_text(QLabel(), "property_module.district"), 3, 2)
         self.district_input = QLineEdit()
         form.addWidget(self.district_input, 3, 3)
         
         # Postal code
-        form.addWidget(QLabel(get_text("property_module.postal_code")), 3, 4)
+        form.addWidget(bind_text(QLabel(), "property_module.postal_code"), 3, 4)
         self.postal_code_input = QLineEdit()
         form.addWidget(self.postal_code_input, 3, 5)
         
         # Area
-        form.addWidget(QLabel(get_text("property_module.area")), 4, 0)
+        form.addWidget(bind_text(QLabel(), "property_module.area"), 4, 0)
         self.area_input = QDoubleSpinBox()
         self.area_input.setRange(0, 999999.99)
         self.area_input.setDecimals(2)
         form.addWidget(self.area_input, 4, 1)
         
         # Construction year
-        form.addWidget(QLabel(get_text("property_module.construction_year")), 4, 2)
+        form.addWidget(bind_text(QLabel(), "property_module.construction_year"), 4, 2)
         self.year_input = QSpinBox()
         self.year_input.setRange(1800, 2100)
         self.year_input.setValue(datetime.now().year)
         form.addWidget(self.year_input, 4, 3)
         
         # Financial details
-        form.addWidget(QLabel(get_text("property_module.purchase_price")), 5, 0)
+        form.addWidget(bind_text(QLabel(), "property_module.purchase_price"), 5, 0)
         self.purchase_price_input = QDoubleSpinBox()
         self.purchase_price_input.setRange(0, 9999999999.99)
         self.purchase_price_input.setDecimals(2)
         form.addWidget(self.purchase_price_input, 5, 1)
         
-        form.addWidget(QLabel(get_text("property_module.current_value")), 5, 2)
+        form.addWidget(bind_text(QLabel(), "property_module.current_value"), 5, 2)
         self.current_value_input = QDoubleSpinBox()
         self.current_value_input.setRange(0, 9999999999.99)
         self.current_value_input.setDecimals(2)
         form.addWidget(self.current_value_input, 5, 3)
         
-        form.addWidget(QLabel(get_text("property_module.monthly_rent")), 5, 4)
+        form.addWidget(bind_text(QLabel(), "property_module.monthly_rent"), 5, 4)
         self.monthly_rent_input = QDoubleSpinBox()
         self.monthly_rent_input.setRange(0, 999999.99)
         self.monthly_rent_input.setDecimals(2)
         form.addWidget(self.monthly_rent_input, 5, 5)
         
+        # Tenant, billed the monthly rent while the property is rented
+        form.addWidget(bind_text(QLabel(), "property_module.tenant"), 6, 0)
+        self.tenant_combo = QComboBox()
+        form.addWidget(self.tenant_combo, 6, 1)
+        
         layout.addLayout(form)
         
         # Features
         features_layout = QHBoxLayout()
-        features_layout.addWidget(QLabel(get_text("property_module.features")))
+        features_layout.addWidget(bind_text(QLabel(), "property_module.features"))
         self.features_input = QTextEdit()
         self.features_input.setMaximumHeight(60)
         features_layout.addWidget(self.features_input)
@@ -205,29 +254,61 @@ class PropertyModule(QMainWindow):
         # Buttons
         button_layout = QHBoxLayout()
         
-        self.save_btn = QPushButton(get_text("common.save"))
+        self.save_btn = bind_text(QPushButton(), "common.save")
         self.save_btn.clicked.connect(self.save_property)
         button_layout.addWidget(self.save_btn)
         
-        clear_btn = QPushButton(get_text("common.clear"))
+        clear_btn = bind_text(QPushButton(), "common.clear")
         clear_btn.clicked.connect(self.clear_property_form)
         button_layout.addWidget(clear_btn)
         
         layout.addLayout(button_layout)
         
+        # Filters; the combos list each value with its number of matches
+        filter_layout = QHBoxLayout()
+        self.city_filter_combo = QComboBox()
+        self.type_filter_combo = QComboBox()
+        self.status_filter_combo = QComboBox()
+        for label_key, combo in (("property_module.city", self.city_filter_combo),
+                                 ("property_module.type", self.type_filter_combo),
+                                 ("property_module.status", self.status_filter_combo)):
+            # _fill_facet_combo keeps "all" as the first item
+            combo.addItem("", None)
+            bind_text(combo, "common.all", 'setItemText', 0)
+            combo.activated.connect(self.load_properties)
+            filter_layout.addWidget(bind_text(QLabel(), label_key))
+            filter_layout.addWidget(combo)
+        filter_layout.addWidget(bind_text(QLabel(), "property_module.filter_features"))
+        self.feature_filter_input = QLineEdit()
+        bind_text(self.feature_filter_input, "property_module.filter_features_hint", 'setPlaceholderText')
+        filter_layout.addWidget(self.feature_filter_input)
+        filter_layout.addWidget(bind_text(QLabel(), "property_module.min_area"))
+        self.min_area_filter = QDoubleSpinBox()
+        self.min_area_filter.setRange(0, 999999.99)
+        self.min_area_filter.setDecimals(2)
+        filter_layout.addWidget(self.min_area_filter)
+        filter_btn = bind_text(QPushButton(), "common.filter")
+        filter_btn.clicked.connect(self.load_properties)
+        filter_layout.addWidget(filter_btn)
+        self.result_count_label = QLabel()
+        self.result_count = None
+        on_language_changed(self.show_result_count)
+        filter_layout.addWidget(self.result_count_label)
+        layout.addLayout(filter_layout)
+        
         # Table
         self.property_table = QTableWidget()
         self.property_table.setColumnCount(8)
-        self.property_table.setHorizontalHeaderLabels([
-            get_text("property_module.property_no"),
-            get_text("property_module.title"),
-            get_text("property_module.type"),
-            get_text("property_module.status"),
-            get_text("property_module.city"),
-            get_text("property_module.area"),
-            get_text("property_module.current_value"),
-            get_text("property_module.monthly_rent")
-        ])
+        bind_text(self.property_table, [
+            "property_module.property_no",
+            "property_module.title",
+            "property_module.type",
+            "property_module.status",
+            "property_module.city",
+            "property_module.area",
+            "property_module.current_value",
+            "property_module.monthly_rent"
+        ], 'setHorizontalHeaderLabels')
         layout.addWidget(self.property_table)
         
         # Connect table selection
@@ -239,7 +320,7 @@ class PropertyModule(QMainWindow):
         
         # Property selector
         selector_layout = QHBoxLayout()
-        selector_layout.addWidget(QLabel(get_text("property_module.select_property")))
+        selector_layout.addWidget(bind_text(QLabel(), "property_module.select_property"))
         self.deed_property_combo = QComboBox()
         selector_layout.addWidget(self.deed_property_combo)
         layout.addLayout(selector_layout)
@@ -248,34 +329,34 @@ class PropertyModule(QMainWindow):
         form = QGridLayout()
         
         # Deed number
-        form.addWidget(QLabel(get_text("property_module.deed_no")), 0, 0)
+        form.addWidget(bind_text(QLabel(), "property_module.deed_no"), 0, 0)
         self.deed_no_input = QLineEdit()
         form.addWidget(self.deed_no_input, 0, 1)
         
         # Registration date
-        form.addWidget(QLabel(get_text("property_module.registration_date")), 0, 2)
+        form.addWidget(bind_text(QLabel(), "property_module.registration_date"), 0, 2)
         self.registration_date_input = QDateEdit()
         self.registration_date_input.setCalendarPopup(True)
         self.registration_date_input.setDate(QDate.currentDate())
         form.addWidget(self.registration_date_input, 0, 3)
         
         # Ownership type
-        form.addWidget(QLabel(get_text("property_module.ownership_type")), 1, 0)
+        form.addWidget(bind_text(QLabel(), "property_module.ownership_type"), 1, 0)
         self.ownership_type_combo = QComboBox()
         self.ownership_type_combo.addItems([ot.value for ot in OwnershipType])
         form.addWidget(self.ownership_type_combo, 1, 1)
         
         # Owner details
-        form.addWidget(QLabel(get_text("property_module.owner_name")), 1, 2)
+        form.addWidget(bind_text(QLabel(), "property_module.owner_name"), 1, 2)
         self.owner_name_input = QLineEdit()
         form.addWidget(self.owner_name_input, 1, 3)
         
-        form.addWidget(QLabel(get_text("property_module.owner_id")), 2, 0)
+        form.addWidget(bind_text(QLabel(), "property_module.owner_id"), 2, 0)
         self.owner_id_input = QLineEdit()
         form.addWidget(self.owner_id_input, 2, 1)
         
         # Share ratio
-        form.addWidget(QLabel(get_text("property_module.share_ratio")), 2, 2)
+        form.addWidget(bind_text(QLabel(), "property_module.share_ratio"), 2, 2)
         self.share_ratio_input = QDoubleSpinBox()
         self.share_ratio_input.setRange(0, 1)
         self.share_ratio_input.setDecimals(4)
@@ -283,14 +364,14 @@ class PropertyModule(QMainWindow):
         form.addWidget(self.share_ratio_input, 2, 3)
         
         # Purchase price
-        form.addWidget(QLabel(get_text("property_module.purchase_price")), 3, 0)
+        form.addWidget(bind_text(QLabel(), "property_module.purchase_price"), 3, 0)
         self.deed_purchase_price_input = QDoubleSpinBox()
         self.deed_purchase_price_input.setRange(0, 9999999999.99)
         self.deed_purchase_price_input.setDecimals(2)
         form.addWidget(self.deed_purchase_price_input, 3, 1)
         
         # Notes
-        form.addWidget(QLabel(get_text("property_module.notes")), 3, 2)
+        form.addWidget(bind_text(QLabel(), "property_module.notes"), 3, 2)
         self.deed_notes_input = QLineEdit()
         form.addWidget(self.deed_notes_input, 3, 3)
         
@@ -299,11 +380,11 @@ class PropertyModule(QMainWindow):
         # Buttons
         button_layout = QHBoxLayout()
         
-        save_deed_btn = QPushButton(get_text("property_module.save_deed"))
+        save_deed_btn = bind_text(QPushButton(), "property_module.save_deed")
         save_deed_btn.clicked.connect(self.save_deed)
         button_layout.addWidget(save_deed_btn)
         
-        clear_deed_btn = QPushButton(get_text("common.clear"))
+        clear_deed_btn = bind_text(QPushButton(), "common.clear")
         clear_deed_btn.clicked.connect(self.clear_deed_form)
         button_layout.addWidget(clear_deed_btn)
         
@@ -311,17 +392,18 @@ class PropertyModule(QMainWindow):
         
         # Table
         self.deed_table = QTableWidget()
-        self.deed_table.setColumnCount(8)
-        self.deed_table.setHorizontalHeaderLabels([
-            get_text("property_module.deed_no"),
-            get_text("property_module.registration_date"),
-            get_text("property_module.ownership_type"),
-            get_text("property_module.owner_name"),
-            get_text("property_module.share_ratio"),
-            get_text("property_module.purchase_price"),
-            get_text("property_module.notes"),
-            get_text("property_module.is_active")
-        ])
+        self.deed_table.setColumnCount(9)
+        bind_text(self.deed_table, [
+            "property_module.deed_no",
+            "property_module.registration_date",
+            "property_module.ownership_type",
+            "property_module.owner_name",
+            "property_module.share_ratio",
+            "property_module.purchase_price",
+            "property_module.notes",
+            "property_module.is_active",
+            "property_module.valid_to"
+        ], 'setHorizontalHeaderLabels')
         layout.addWidget(self.deed_table)
 
     def _setup_document_tab(self, tab):
@@ -330,7 +412,7 @@ class PropertyModule(QMainWindow):
         
         # Property selector
         selector_layout = QHBoxLayout()
-        selector_layout.addWidget(QLabel(get_text("property_module.select_property")))
+        selector_layout.addWidget(bind_text(QLabel(), "property_module.select_property"))
         self.doc_property_combo = QComboBox()
         selector_layout.addWidget(self.doc_property_combo)
         layout.addLayout(selector_layout)
@@ -339,32 +421,36 @@ class PropertyModule(QMainWindow):
         form = QGridLayout()
         
         # Document type
-        form.addWidget(QLabel(get_text("property_module.document_type")), 0, 0)
+        form.addWidget(bind_text(QLabel(), "property_module.document_type"), 0, 0)
         self.doc_type_combo = QComboBox()
         self.doc_type_combo.addItems([dt.value for dt in DocumentType])
         form.addWidget(self.doc_type_combo, 0, 1)
         
         # Title
-        form.addWidget(QLabel(get_text("property_module.document_title")), 0, 2)
+        form.addWidget(bind_text(QLabel(), "property_module.document_title"), 0, 2)
         self.doc_title_input = QLineEdit()
         form.addWidget(self.doc_title_input, 0, 3)
         
         # Description
-        form.addWidget(QLabel(get_text("property_module.description")), 1, 0)
+        form.addWidget(bind_text(QLabel(), "property_module.description"), 1, 0)
         self.doc_description_input = QLineEdit()
         form.addWidget(self.doc_description_input, 1, 1, 1, 3)
         
         # Dates
-        form.addWidget(QLabel(get_text("property_module.issue_date")), 2, 0)
+        form.addWidget(bind_text(QLabel(), "property_module.issue_date"), 2, 0)
         self.issue_date_input = QDateEdit()
         self.issue_date_input.setCalendarPopup(True)
         self.issue_date_input.setDate(QDate.currentDate())
         form.addWidget(self.issue_date_input, 2, 1)
         
-        form.addWidget(QLabel(get_text("property_module.expiry_date")), 2, 2)
+        # Most documents (e.g. deeds) never expire, so the expiry date is opt-in
+        self.has_expiry_check = bind_text(QCheckBox(), "property_module.expiry_date")
+        form.addWidget(self.has_expiry_check, 2, 2)
         self.expiry_date_input = QDateEdit()
         self.expiry_date_input.setCalendarPopup(True)
         self.expiry_date_input.setDate(QDate.currentDate())
+        self.expiry_date_input.setEnabled(False)
+        self.has_expiry_check.toggled.connect(self.expiry_date_input.setEnabled)
         form.addWidget(self.expiry_date_input, 2, 3)
         
         layout.addLayout(form)
@@ -372,11 +458,16 @@ class PropertyModule(QMainWindow):
         # Buttons
         button_layout = QHBoxLayout()
         
-        upload_btn = QPushButton(get_text("property_module.upload_document"))
-        upload_btn.clicked.connect(self.upload_document)
-        button_layout.addWidget(upload_btn)
+        self.upload_btn = bind_text(QPushButton(), "property_module.upload_document")
+        self.upload_btn.clicked.connect(self.upload_document)
+        button_layout.addWidget(self.upload_btn)
         
-        clear_doc_btn = QPushButton(get_text("common.clear"))
+        self.upload_progress = QProgressBar()
+        self.upload_progress.setRange(0, 100)
+        self.upload_progress.setVisible(False)
+        button_layout.addWidget(self.upload_progress)
+        
+        clear_doc_btn = bind_text(QPushButton(), "common.clear")
         clear_doc_btn.clicked.connect(self.clear_document_form)
         button_layout.addWidget(clear_doc_btn)
         
@@ -384,26 +475,58 @@ class PropertyModule(QMainWindow):
         
         # Table
         self.document_table = QTableWidget()
-        self.document_table.setColumnCount(6)
-        self.document_table.setHorizontalHeaderLabels([
-            get_text("property_module.document_type"),
-            get_text("property_module.document_title"),
-            get_text("property_module.description"),
-            get_text("property_module.issue_date"),
-            get_text("property_module.expiry_date"),
-            get_text("property_module.file_path")
-        ])
+        self.document_table.setColumnCount(7)
+        self.document_table.setIconSize(QSize(THUMBNAIL_SIZE[0] // 2, THUMBNAIL_SIZE[1] // 2))
+        self.document_table.verticalHeader().setDefaultSectionSize(THUMBNAIL_SIZE[1] // 2 + 8)
+        bind_text(self.document_table, [
+            "property_module.preview",
+            "property_module.document_type",
+            "property_module.document_title",
+            "property_module.description",
+            "property_module.issue_date",
+            "property_module.expiry_date",
+            "property_module.file_path"
+        ], 'setHorizontalHeaderLabels')
         layout.addWidget(self.document_table)
+        self.thumbnail_rows = {}
+        self.thumbnail_ready.connect(self.on_thumbnail_ready)
+
+    def load_tenants(self):
+        """Load customers into the tenant combo box"""
+        self.tenant_combo.clear()
+        self.tenant_combo.addItem("", None)
+        for customer in self.customer_service.get_customers(limit=None):
+            self.tenant_combo.addItem(f"{customer.name} ({customer.tax_number})", customer.id)
 
     def load_properties(self):
         """Load properties into tables and combo boxes"""
         self.property_table.setRowCount(0)
-        properties = self.property_service.get_all_properties()
-        
-        # Clear and reload combo boxes
-        self.deed_property_combo.clear()
-        self.doc_property_combo.clear()
-        
+        property_type = self.type_filter_combo.currentData()
+        status = self.status_filter_combo.currentData()
+        result = self.search_service.search({
+            'city': self.city_filter_combo.currentData(),
+            'type': PropertyType(property_type) if property_type else None,
+            'status': PropertyStatus(status) if status else None,
+            'features': [f for f in self.feature_filter_input.text().split(',') if f.strip()],
+            'min_area': self.min_area_filter.value() or None
+        }, page_size=PROPERTY_PAGE_SIZE)
+        properties = result['items']
+        self._fill_facet_combo(self.city_filter_combo, result['facets']['city'])
+        self._fill_facet_combo(self.type_filter_combo, result['facets']['type'])
+        self._fill_facet_combo(self.status_filter_combo, result['facets']['status'])
+        self.result_count = (len(properties), result['total'])
+        self.show_result_count()
+        # Deeds and documents can be added to any property, not only the listed ones
+        choices = self.search_service.property_choices()
+        if choices is not self.property_choices:
+            self.property_choices = choices
+            self._fill_property_combo(self.deed_property_combo, choices)
+            self._fill_property_combo(self.doc_property_combo, choices)
+        
+        fmt = get_formatter()
+        areas = fmt.numbers([p.area or None for p in properties])
+        values = fmt.numbers([p.current_value or None for p in properties])
+        rents = fmt.numbers([p.monthly_rent or None for p in properties])
         for row, property in enumerate(properties):
             self.property_table.insertRow(row)
             self.property_table.setItem(row, 0, QTableWidgetItem(property.property_no))
@@ -411,17 +534,47 @@ class PropertyModule(QMainWindow):
             self.property_table.setItem(row, 2, QTableWidgetItem(property.type.value))
             self.property_table.setItem(row, 3, QTableWidgetItem(property.status.value))
             self.property_table.setItem(row, 4, QTableWidgetItem(property.city))
-            self.property_table.setItem(row, 5, QTableWidgetItem(f"{property.area:.2f}" if property.area else ""))
-            self.property_table.setItem(row, 6, QTableWidgetItem(f"{property.current_value:.2f}" if property.current_value else ""))
-            self.property_table.setItem(row, 7, QTableWidgetItem(f"{property.monthly_rent:.2f}" if property.monthly_rent else ""))
-            
-            # Add to combo boxes
-            combo_text = f"{property.property_no} - {property.title}"
-            self.deed_property_combo.addItem(combo_text, property.id)
-            self.doc_property_combo.addItem(combo_text, property.id)
+            self.property_table.setItem(row, 5, QTableWidgetItem(areas[row]))
+            self.property_table.setItem(row, 6, QTableWidgetItem(values[row]))
+            self.property_table.setItem(row, 7, QTableWidgetItem(rents[row]))
         
         self.property_table.resizeColumnsToContents()
 
+    def _fill_property_combo(self, combo: QComboBox, choices):
+        """Replace a property picker's items, keeping the selected property"""
+        selected = combo.currentData()
+        combo.blockSignals(True)
+        combo.clear()
+        for property_id, property_no, title in choices:
+            combo.addItem(f"{property_no} - {title}", property_id)
+        index = combo.findData(selected) if selected is not None else -1
+        combo.setCurrentIndex(max(index, 0) if combo.count() else -1)
+        combo.blockSignals(False)
+
+    def show_result_count(self):
+        if self.result_count:
+            shown, total = self.result_count
+            self.result_count_label.setText(get_text("property_module.result_count").format(
+                shown=shown, total=total
+            ))
+
+    def _fill_facet_combo(self, combo: QComboBox, values):
+        """Replace a filter combo's values with the facet's, keeping the selection"""
+        selected = combo.currentData()
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItem(get_text("common.all"), None)
+        for facet in values:
+            value = getattr(facet['value'], 'value', facet['value'])
+            combo.addItem(f"{value} ({facet['count']})", value)
+        index = combo.findData(selected) if selected is not None else 0
+        if index < 0:
+            # Keep a selection that no longer matches anything
+            combo.addItem(f"{selected} (0)", selected)
+            index = combo.count() - 1
+        combo.setCurrentIndex(index)
+        combo.blockSignals(False)
+
     def clear_property_form(self):
         """Clear all property form fields"""
         self.property_no_input.clear()
@@ -437,6 +590,7 @@ class PropertyModule(QMainWindow):
         self.purchase_price_input.setValue(0)
         self.current_value_input.setValue(0)
         self.monthly_rent_input.setValue(0)
+        self.tenant_combo.setCurrentIndex(0)
         self.features_input.clear()
 
     def clear_deed_form(self):
@@ -456,23 +610,12 @@ class PropertyModule(QMainWindow):
         self.doc_title_input.clear()
         self.doc_description_input.clear()
         self.issue_date_input.setDate(QDate.currentDate())
+        self.has_expiry_check.setChecked(False)
         self.expiry_date_input.setDate(QDate.currentDate())
 
     def save_property(self):
         """Save or update property information"""
         try:
-            # Convert features text to JSON
-            features_text = self.features_input.toPlainText().strip()
-            features_dict = {}
-            if features_text:
-                try:
-                    # Try parsing as JSON
-                    features_dict = json.loads(features_text)
-                except json.JSONDecodeError:
-                    # If not valid JSON, treat as comma-separated list
-                    features = [f.strip() for f in features_text.split(',')]
-                    features_dict = {f"feature_{i+1}": f for i, f in enumerate(features)}
-
             property_data = {
                 'property_no': self.property_no_input.text(),
                 'title': self.title_input.text(),
@@ -484,10 +627,12 @@ class PropertyModule(QMainWindow):
                 'postal_code': self.postal_code_input.text(),
                 'area': self.area_input.value() or None,
                 'construction_year': self.year_input.value(),
-                'features': features_dict,
+                # JSON or a comma-separated list; the service normalizes it
+                'features': self.features_input.toPlainText().strip(),
                 'purchase_price': self.purchase_price_input.value() or None,
                 'current_value': self.current_value_input.value() or None,
-                'monthly_rent': self.monthly_rent_input.value() or None
+                'monthly_rent': self.monthly_rent_input.value() or None,
+                'tenant_id': self.tenant_combo.currentData()
             }
 
             if not all([property_data['property_no'], property_data['title'],
@@ -561,24 +706,47 @@ class PropertyModule(QMainWindow):
             if not file_path:
                 return
 
-            document = self.property_service.store_document(
-                property_id=property_id,
-                file_path=file_path,
-                doc_type=DocumentType(self.doc_type_combo.currentText()),
-                title=self.doc_title_input.text(),
-                description=self.doc_description_input.text(),
-                issue_date=self.issue_date_input.date().toPython(),
-                expiry_date=self.expiry_date_input.date().toPython()
-            )
-
-            self.clear_document_form()
-            self.load_documents(property_id)
-            QMessageBox.information(self, get_text("common.success"),
-                                  get_text("property_module.document_upload_success"))
+            # Hash and copy on a worker thread so large scans don't freeze the window
+            self.upload_thread = QThread(self)
+            self.upload_worker = DocumentUploadWorker(property_id, {
+                'file_path': file_path,
+                'doc_type': DocumentType(self.doc_type_combo.currentText()),
+                'title': self.doc_title_input.text(),
+                'description': self.doc_description_input.text(),
+                'issue_date': self.issue_date_input.date().toPython(),
+                'expiry_date': (self.expiry_date_input.date().toPython()
+                                if self.has_expiry_check.isChecked() else None)
+            })
+            self.upload_worker.moveToThread(self.upload_thread)
+            self.upload_thread.started.connect(self.upload_worker.run)
+            self.upload_worker.progress.connect(self.upload_progress.setValue)
+            self.upload_worker.finished.connect(self.on_document_uploaded)
+            self.upload_worker.failed.connect(self.on_document_upload_failed)
+            self.upload_worker.finished.connect(self.upload_thread.quit)
+            self.upload_worker.failed.connect(self.upload_thread.quit)
+            
+            self.upload_btn.setEnabled(False)
+            self.upload_progress.setValue(0)
+            self.upload_progress.setVisible(True)
+            self.upload_thread.start()
 
         except Exception as e:
             QMessageBox.critical(self, get_text("common.error"), str(e))
 
+    def on_document_uploaded(self, property_id: int):
+        """Refresh the document list once a background upload is stored"""
+        self.upload_btn.setEnabled(True)
+        self.upload_progress.setVisible(False)
+        self.clear_document_form()
+        self.load_documents(property_id)
+        QMessageBox.information(self, get_text("common.success"),
+                              get_text("property_module.document_upload_success"))
+
+    def on_document_upload_failed(self, message: str):
+        self.upload_btn.setEnabled(True)
+        self.upload_progress.setVisible(False)
+        QMessageBox.critical(self, get_text("common.error"), message)
+
     def on_property_selected(self):
         """Handle property selection in the table"""
         selected_items = self.property_table.selectedItems()
@@ -604,6 +772,7 @@ class PropertyModule(QMainWindow):
             self.purchase_price_input.setValue(property.purchase_price or 0)
             self.current_value_input.setValue(property.current_value or 0)
             self.monthly_rent_input.setValue(property.monthly_rent or 0)
+            self.tenant_combo.setCurrentIndex(max(self.tenant_combo.findData(property.tenant_id), 0))
             
             # Handle features JSON
             if property.features:
@@ -623,17 +792,23 @@ class PropertyModule(QMainWindow):
         """Load deeds for the selected property"""
         self.deed_table.setRowCount(0)
         deeds = self.property_service.get_property_deeds(property_id)
+        fmt = get_formatter()
+        registered = fmt.dates([d.registration_date for d in deeds])
+        shares = fmt.numbers([d.share_ratio for d in deeds], digits=4)
+        prices = fmt.numbers([d.purchase_price or None for d in deeds])
+        valid_to = fmt.dates([d.valid_to for d in deeds])
         
         for row, deed in enumerate(deeds):
             self.deed_table.insertRow(row)
             self.deed_table.setItem(row, 0, QTableWidgetItem(deed.deed_no))
-            self.deed_table.setItem(row, 1, QTableWidgetItem(str(deed.registration_date)))
+            self.deed_table.setItem(row, 1, QTableWidgetItem(registered[row]))
             self.deed_table.setItem(row, 2, QTableWidgetItem(deed.ownership_type.value))
             self.deed_table.setItem(row, 3, QTableWidgetItem(deed.owner_name))
-            self.deed_table.setItem(row, 4, QTableWidgetItem(f"{deed.share_ratio:.4f}"))
-            self.deed_table.setItem(row, 5, QTableWidgetItem(f"{deed.purchase_price:.2f}" if deed.purchase_price else ""))
+            self.deed_table.setItem(row, 4, QTableWidgetItem(shares[row]))
+            self.deed_table.setItem(row, 5, QTableWidgetItem(prices[row]))
             self.deed_table.setItem(row, 6, QTableWidgetItem(deed.notes or ""))
             self.deed_table.setItem(row, 7, QTableWidgetItem("Yes" if deed.is_active else "No"))
+            self.deed_table.setItem(row, 8, QTableWidgetItem(valid_to[row]))
         
         self.deed_table.resizeColumnsToContents()
 
@@ -641,20 +816,38 @@ class PropertyModule(QMainWindow):
         """Load documents for the selected property"""
         self.document_table.setRowCount(0)
         documents = self.property_service.get_property_documents(property_id)
+        thumbnails = get_thumbnail_generator()
+        self.thumbnail_rows = {}
         
         for row, doc in enumerate(documents):
             self.document_table.insertRow(row)
-            self.document_table.setItem(row, 0, QTableWidgetItem(doc.type.value))
-            self.document_table.setItem(row, 1, QTableWidgetItem(doc.title))
-            self.document_table.setItem(row, 2, QTableWidgetItem(doc.description or ""))
-            self.document_table.setItem(row, 3, QTableWidgetItem(str(doc.issue_date) if doc.issue_date else ""))
-            self.document_table.setItem(row, 4, QTableWidgetItem(str(doc.expiry_date) if doc.expiry_date else ""))
-            self.document_table.setItem(row, 5, QTableWidgetItem(doc.file_path))
+            preview = QTableWidgetItem()
+            if doc.content_hash:
+                # Cached thumbnails show right away; others appear once rendered
+                thumbnail = thumbnails.cache.get(doc.content_hash)
+                if thumbnail:
+                    preview.setIcon(QIcon(str(thumbnail)))
+                else:
+                    self.thumbnail_rows.setdefault(doc.content_hash, []).append(row)
+                    thumbnails.request(doc.content_hash, doc.file_path, self._emit_thumbnail_ready)
+            self.document_table.setItem(row, 0, preview)
+            self.document_table.setItem(row, 1, QTableWidgetItem(doc.type.value))
+            self.document_table.setItem(row, 2, QTableWidgetItem(doc.title))
+            self.document_table.setItem(row, 3, QTableWidgetItem(doc.description or ""))
+            self.document_table.setItem(row, 4, QTableWidgetItem(str(doc.issue_date) if doc.issue_date else ""))
+            self.document_table.setItem(row, 5, QTableWidgetItem(str(doc.expiry_date) if doc.expiry_date else ""))
+            self.document_table.setItem(row, 6, QTableWidgetItem(doc.file_path))
         
         self.document_table.resizeColumnsToContents()
-        self.setCentralWidget(central_widget)
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #ffffff;
-            }
-        """)
\ No newline at end of file
+
+    def _emit_thumbnail_ready(self, content_hash: str, path):
+        # Called on a pool thread; the signal hands it to the GUI thread
+        if path:
+            self.thumbnail_ready.emit(content_hash, str(path))
+
+    def on_thumbnail_ready(self, content_hash: str, path: str):
+        """Show a freshly rendered thumbnail in the rows using that content"""
+        for row in self.thumbnail_rows.pop(content_hash, []):
+            item = self.document_table.item(row, 0)
+            if item:
+                item.setIcon(QIcon(path))
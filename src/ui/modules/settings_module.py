@@ -1,11 +1,12 @@
 from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QPushButton, QLabel, QComboBox, QFormLayout
 from PySide6.QtCore import Qt
-from core.localization import set_language, LANGUAGES
+from core import localization
+from core.localization import set_language, bind_text, LANGUAGES
 
 class SettingsModule(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.setWindowTitle("Ayarlar")
+        bind_text(self, "menu.settings", 'setWindowTitle')
         self.setMinimumSize(800, 600)
         
         # Create central widget and main layout
@@ -20,6 +21,7 @@ class SettingsModule(QMainWindow):
         self.language_combo = QComboBox()
         for lang_code, lang_name in LANGUAGES.items():
             self.language_combo.addItem(lang_name, lang_code)
+        self.language_combo.setCurrentIndex(self.language_combo.findData(localization.current_language))
         self.language_combo.currentIndexChanged.connect(self.change_language)
         form_layout.addRow("Dil / Language:", self.language_combo)
         
@@ -53,5 +55,5 @@ class SettingsModule(QMainWindow):
     def change_language(self, index):
         lang_code = self.language_combo.currentData()
         if lang_code:
-            set_language(lang_code)
-            # Here you would typically emit a signal to update the UI language
\ No newline at end of file
+            # Retranslates the texts of every open window in place
+            set_language(lang_code)
\ No newline at end of file